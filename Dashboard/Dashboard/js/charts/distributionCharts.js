@@ -0,0 +1,182 @@
+// distributionCharts.js
+class DistributionCharts {
+    constructor() {
+        this.charts = {};
+        this.statistics = {};
+        this.runs = 0;
+        this.etag = null;
+    }
+
+    createCharts() {
+        this.createDistributionChart('distributionChart');
+    }
+
+    createDistributionChart(containerId) {
+        const container = document.getElementById(containerId);
+        if (!container) return;
+
+        // Clear the container
+        container.innerHTML = "";
+
+        // Create the SVG
+        const svg = d3.select(container)
+            .append("svg")
+            .attr("width", "100%")
+            .attr("height", "100%")
+            .attr("viewBox", "0 0 700 400")
+            .attr("preserveAspectRatio", "xMidYMid meet");
+
+        // Save chart reference
+        this.charts.distributionChart = {
+            svg: svg,
+            containerId: containerId
+        };
+
+        const metricSelect = document.getElementById('distributionMetric');
+        if (metricSelect) {
+            metricSelect.addEventListener('change', () => this.updateDistributionChart());
+        }
+
+        this.loadStatistics();
+    }
+
+    // Histograms are binned on the server, so the response size does not
+    // grow with the number of runs; an unchanged batch is answered with 304
+    async loadStatistics() {
+        try {
+            const headers = {};
+            if (this.etag) {
+                headers['If-None-Match'] = this.etag;
+            }
+            const response = await fetch('http://localhost:5000/statistics', { headers });
+            if (response.status !== 304) {
+                const result = await response.json();
+                this.statistics = result.success ? result.statistics : {};
+                this.runs = result.success ? result.runs : 0;
+                this.etag = result.success ? response.headers.get('ETag') : null;
+            }
+        } catch (error) {
+            console.error('Error loading statistics:', error);
+            this.statistics = {};
+            this.etag = null;
+        }
+        this.updateDistributionChart();
+    }
+
+    updateCharts() {
+        this.loadStatistics();
+    }
+
+    updateDistributionChart() {
+        if (!this.charts.distributionChart) return;
+
+        const svg = this.charts.distributionChart.svg;
+        svg.selectAll("*").remove();
+
+        const metricSelect = document.getElementById('distributionMetric');
+        const metric = metricSelect ? metricSelect.value : 'Total Production';
+        const stats = this.statistics[metric];
+
+        if (!stats) {
+            svg.append("text")
+                .attr("x", 350)
+                .attr("y", 200)
+                .attr("text-anchor", "middle")
+                .text("No statistics available for this metric");
+            return;
+        }
+
+        // One bar per histogram bin
+        const edges = stats.histogram.edges;
+        const data = stats.histogram.counts.map((count, i) => ({
+            x0: edges[i],
+            x1: edges[i + 1],
+            count: count
+        }));
+
+        // Configure dimensions and margins
+        const margin = {top: 40, right: 30, bottom: 60, left: 60};
+        const width = 700 - margin.left - margin.right;
+        const height = 400 - margin.top - margin.bottom;
+
+        // Create main container
+        const g = svg.append("g")
+            .attr("transform", `translate(${margin.left},${margin.top})`);
+
+        // Define scales
+        const x = d3.scaleLinear()
+            .domain([edges[0], edges[edges.length - 1]])
+            .range([0, width]);
+
+        const y = d3.scaleLinear()
+            .domain([0, d3.max(data, d => d.count) || 1])
+            .nice()
+            .range([height, 0]);
+
+        // Add axes
+        g.append("g")
+            .attr("transform", `translate(0,${height})`)
+            .call(d3.axisBottom(x));
+
+        g.append("g")
+            .call(d3.axisLeft(y));
+
+        // Bins, with their range and count as a tooltip
+        g.selectAll(".bin")
+            .data(data)
+            .enter()
+            .append("rect")
+            .attr("class", "bin")
+            .attr("x", d => x(d.x0) + 1)
+            .attr("y", d => y(d.count))
+            .attr("width", d => Math.max(0, x(d.x1) - x(d.x0) - 1))
+            .attr("height", d => height - y(d.count))
+            .attr("fill", "#007bff")
+            .attr("opacity", 0.7)
+            .append("title")
+            .text(d => `${d.x0.toFixed(3)} – ${d.x1.toFixed(3)}: ${d.count} runs`);
+
+        // Mean and 5th/95th percentile markers
+        const markers = [
+            {label: "P5", value: stats.p5, color: "#6c757d", dash: "4,4"},
+            {label: "Mean", value: stats.mean, color: "#dc3545", dash: null},
+            {label: "P95", value: stats.p95, color: "#6c757d", dash: "4,4"}
+        ];
+
+        markers.forEach(marker => {
+            g.append("line")
+                .attr("x1", x(marker.value))
+                .attr("x2", x(marker.value))
+                .attr("y1", 0)
+                .attr("y2", height)
+                .attr("stroke", marker.color)
+                .attr("stroke-width", 2)
+                .attr("stroke-dasharray", marker.dash);
+
+            g.append("text")
+                .attr("x", x(marker.value))
+                .attr("y", -5)
+                .attr("text-anchor", "middle")
+                .style("font-size", "11px")
+                .attr("fill", marker.color)
+                .text(marker.label);
+        });
+
+        // Add title
+        svg.append("text")
+            .attr("x", width / 2 + margin.left)
+            .attr("y", 20)
+            .attr("text-anchor", "middle")
+            .style("font-size", "16px")
+            .style("font-weight", "bold")
+            .text(`${metric} over ${this.runs} runs (σ = ${stats.std.toFixed(3)})`);
+
+        // Add X-axis title
+        svg.append("text")
+            .attr("x", width / 2 + margin.left)
+            .attr("y", 390)
+            .attr("text-anchor", "middle")
+            .style("font-size", "14px")
+            .text(metric);
+    }
+}
@@ -42,8 +42,10 @@ class ProductionCharts {
     updateProductionOverview() {
         if (!this.charts.productionOverview) return;
         
-        const svg = this.charts.productionOverview.svg;
+        const chart = this.charts.productionOverview;
+        const svg = chart.svg;
         svg.selectAll("*").remove();
+        chart.x = null;
         
         // Obtain data for the current period
         const data = this.getCurrentPeriodData();
@@ -68,18 +70,12 @@ class ProductionCharts {
             .attr("transform", `translate(${margin.left},${margin.top})`);
         
         // Process data for the chart
-        const productionData = data.map(run => {
-            return {
-                run: run.run,
-                totalProduction: run.metrics['Total Production'] || 0,
-                faultyProducts: run.metrics['Faulty Products'] || 0,
-                faultyRate: run.metrics['Faulty Rate'] || 0
-            };
-        });
+        const productionData = data.map(run => this.productionPoint(run));
         
-        // Define scales
+        // Define scales; while a batch streams in, the x axis spans the whole
+        // period so later runs are appended without moving the drawn bars
         const x = d3.scaleBand()
-            .domain(productionData.map(d => d.run))
+            .domain(batchStreaming ? periodRuns() : productionData.map(d => d.run))
             .range([0, width])
             .padding(0.2);
             
@@ -106,52 +102,21 @@ class ProductionCharts {
             .attr("transform", `translate(${width},0)`)
             .call(d3.axisRight(y2).ticks(5, "%"));
         
-        // Draw bars for total production
-        g.selectAll(".bar-total")
-            .data(productionData)
-            .enter()
-            .append("rect")
-            .attr("class", "bar-total")
-            .attr("x", d => x(d.run))
-            .attr("y", d => y(d.totalProduction))
-            .attr("width", x.bandwidth() * 0.6)
-            .attr("height", d => height - y(d.totalProduction))
-            .attr("fill", "#007bff");
-        
-        // Draw bars for faulty products
-        g.selectAll(".bar-faulty")
-            .data(productionData)
-            .enter()
-            .append("rect")
-            .attr("class", "bar-faulty")
-            .attr("x", d => x(d.run) + x.bandwidth() * 0.6)
-            .attr("y", d => y(d.faultyProducts))
-            .attr("width", x.bandwidth() * 0.4)
-            .attr("height", d => height - y(d.faultyProducts))
-            .attr("fill", "#dc3545");
-        
-        // Draw line for faulty rate
+        // Faulty rate line, redrawn from the period's points as runs arrive
         const line = d3.line()
             .x(d => x(d.run) + x.bandwidth() / 2)
             .y(d => y2(d.faultyRate));
             
-        g.append("path")
-            .datum(productionData)
+        const ratePath = g.append("path")
             .attr("fill", "none")
             .attr("stroke", "#ffc107")
-            .attr("stroke-width", 3)
-            .attr("d", line);
-            
-        // Add dots for faulty rate
-        g.selectAll(".dot")
-            .data(productionData)
-            .enter()
-            .append("circle")
-            .attr("class", "dot")
-            .attr("cx", d => x(d.run) + x.bandwidth() / 2)
-            .attr("cy", d => y2(d.faultyRate))
-            .attr("r", 4)
-            .attr("fill", "#ffc107");
+            .attr("stroke-width", 3);
+        
+        // Kept so appendRuns can add marks with the same scales
+        Object.assign(chart, {
+            g, x, y, y2, height, line, ratePath, points: []
+        });
+        this.drawProductionPoints(productionData);
         
         // Add labels for axes
         svg.append("text")
@@ -213,34 +178,104 @@ class ProductionCharts {
             .text("Faulty Rate");
     }
     
+    productionPoint(run) {
+        return {
+            run: run.run,
+            totalProduction: run.metrics['Total Production'] || 0,
+            faultyProducts: run.metrics['Faulty Products'] || 0,
+            faultyRate: run.metrics['Faulty Rate'] || 0
+        };
+    }
+    
+    // Add the bars and dots of new runs and extend the faulty rate line
+    drawProductionPoints(points) {
+        const { g, x, y, y2, height, line, ratePath } = this.charts.productionOverview;
+        
+        // Draw bars for total production
+        g.selectAll(null)
+            .data(points)
+            .enter()
+            .append("rect")
+            .attr("class", "bar-total")
+            .attr("x", d => x(d.run))
+            .attr("y", d => y(d.totalProduction))
+            .attr("width", x.bandwidth() * 0.6)
+            .attr("height", d => height - y(d.totalProduction))
+            .attr("fill", "#007bff");
+        
+        // Draw bars for faulty products
+        g.selectAll(null)
+            .data(points)
+            .enter()
+            .append("rect")
+            .attr("class", "bar-faulty")
+            .attr("x", d => x(d.run) + x.bandwidth() * 0.6)
+            .attr("y", d => y(d.faultyProducts))
+            .attr("width", x.bandwidth() * 0.4)
+            .attr("height", d => height - y(d.faultyProducts))
+            .attr("fill", "#dc3545");
+        
+        const chart = this.charts.productionOverview;
+        chart.points = chart.points.concat(points);
+        ratePath.attr("d", line(chart.points));
+        
+        // Add dots for faulty rate
+        g.selectAll(null)
+            .data(points)
+            .enter()
+            .append("circle")
+            .attr("class", "dot")
+            .attr("cx", d => x(d.run) + x.bandwidth() / 2)
+            .attr("cy", d => y2(d.faultyRate))
+            .attr("r", 4)
+            .attr("fill", "#ffc107");
+    }
+    
     updateKPIs() {
         // Obtain data for the current period
         const data = this.getCurrentPeriodData();
         
-        if (!data || data.length === 0) {
-            document.getElementById('totalProductionKPI').textContent = "0";
-            document.getElementById('faultyProductsKPI').textContent = "0";
-            document.getElementById('faultyRateKPI').textContent = "0%";
-            return;
-        }
-        
-        // Calculate KPIs
-        let totalProduction = 0;
-        let faultyProducts = 0;
-        let totalRate = 0;
-        
-        data.forEach(run => {
-            totalProduction += run.metrics['Total Production'] || 0;
-            faultyProducts += run.metrics['Faulty Products'] || 0;
-            totalRate += run.metrics['Faulty Rate'] || 0;
+        this.kpis = { runs: 0, totalProduction: 0, faultyProducts: 0, totalRate: 0 };
+        this.addToKPIs(data || []);
+    }
+    
+    // Running KPI totals, so streamed runs are added without a rescan
+    addToKPIs(runs) {
+        runs.forEach(run => {
+            this.kpis.runs += 1;
+            this.kpis.totalProduction += run.metrics['Total Production'] || 0;
+            this.kpis.faultyProducts += run.metrics['Faulty Products'] || 0;
+            this.kpis.totalRate += run.metrics['Faulty Rate'] || 0;
         });
         
-        const avgRate = totalRate / data.length;
+        const { runs: count, totalProduction, faultyProducts, totalRate } = this.kpis;
+        const avgRate = count ? totalRate / count : 0;
         
         // Update KPIs
         document.getElementById('totalProductionKPI').textContent = totalProduction.toFixed(0);
         document.getElementById('faultyProductsKPI').textContent = faultyProducts.toFixed(0);
-        document.getElementById('faultyRateKPI').textContent = (avgRate * 100).toFixed(2) + "%";
+        document.getElementById('faultyRateKPI').textContent = count
+            ? (avgRate * 100).toFixed(2) + "%"
+            : "0%";
+    }
+    
+    // Streamed runs of the visible period (see appendStreamedRuns in main.js):
+    // only their marks are added, unless they fall outside the drawn scales
+    appendRuns(runs) {
+        const chart = this.charts.productionOverview;
+        const points = runs.map(run => this.productionPoint(run));
+        const fits = chart && chart.x && points.every(d =>
+            chart.x(d.run) !== undefined &&
+            d.totalProduction <= chart.y.domain()[1] &&
+            d.faultyRate <= chart.y2.domain()[1]
+        );
+        
+        if (fits) {
+            this.drawProductionPoints(points);
+        } else {
+            this.updateProductionOverview();
+        }
+        this.addToKPIs(runs);
     }
     
     getCurrentPeriodData() {
@@ -0,0 +1,164 @@
+// sweepCharts.js
+class SweepCharts {
+    constructor() {
+        this.charts = {};
+        this.points = [];
+    }
+
+    createCharts() {
+        this.createSweepChart('sweepChart');
+    }
+
+    createSweepChart(containerId) {
+        const container = document.getElementById(containerId);
+        if (!container) return;
+
+        // Clear the container
+        container.innerHTML = "";
+
+        // Create the SVG
+        const svg = d3.select(container)
+            .append("svg")
+            .attr("width", "100%")
+            .attr("height", "100%")
+            .attr("viewBox", "0 0 700 400")
+            .attr("preserveAspectRatio", "xMidYMid meet");
+
+        // Save chart reference
+        this.charts.sweepChart = {
+            svg: svg,
+            containerId: containerId
+        };
+
+        const metricSelect = document.getElementById('sweepMetric');
+        if (metricSelect) {
+            metricSelect.addEventListener('change', () => this.updateSweepChart());
+        }
+        const refreshButton = document.getElementById('refreshSweep');
+        if (refreshButton) {
+            refreshButton.addEventListener('click', () => this.loadSweepResults());
+        }
+
+        this.loadSweepResults();
+    }
+
+    // Points are stored as soon as each one finishes, so refreshing during a
+    // sweep shows the points completed so far
+    async loadSweepResults() {
+        try {
+            const response = await fetch('http://localhost:5000/sweep-results');
+            const result = await response.json();
+            this.points = result.success ? result.points : [];
+        } catch (error) {
+            console.error('Error loading sweep results:', error);
+            this.points = [];
+        }
+        this.updateSweepChart();
+    }
+
+    updateCharts() {
+        this.updateSweepChart();
+    }
+
+    updateSweepChart() {
+        if (!this.charts.sweepChart) return;
+
+        const svg = this.charts.sweepChart.svg;
+        svg.selectAll("*").remove();
+
+        if (!this.points || this.points.length === 0) {
+            svg.append("text")
+                .attr("x", 350)
+                .attr("y", 200)
+                .attr("text-anchor", "middle")
+                .text("No parameter sweep has been run yet");
+            return;
+        }
+
+        const metricSelect = document.getElementById('sweepMetric');
+        const metric = metricSelect ? metricSelect.value : 'Total Production';
+
+        // Mean and 95% CI half-width of the metric at every design point
+        const data = this.points.map(point => ({
+            label: `P${point.point + 1}`,
+            params: Object.entries(point.params)
+                .map(([name, value]) => `${name}=${+value.toFixed(3)}`)
+                .join(', '),
+            mean: point.metrics[metric].mean,
+            ci: point.metrics[metric].ci || 0
+        }));
+
+        // Configure dimensions and margins
+        const margin = {top: 40, right: 30, bottom: 60, left: 60};
+        const width = 700 - margin.left - margin.right;
+        const height = 400 - margin.top - margin.bottom;
+
+        // Create main container
+        const g = svg.append("g")
+            .attr("transform", `translate(${margin.left},${margin.top})`);
+
+        // Define scales
+        const x = d3.scaleBand()
+            .domain(data.map(d => d.label))
+            .range([0, width])
+            .padding(0.3);
+
+        const low = d3.min(data, d => d.mean - d.ci);
+        const high = d3.max(data, d => d.mean + d.ci);
+        const pad = (high - low) * 0.1 || Math.abs(high) * 0.1 || 1;
+        const y = d3.scaleLinear()
+            .domain([low - pad, high + pad])
+            .range([height, 0]);
+
+        // Add axes
+        g.append("g")
+            .attr("transform", `translate(0,${height})`)
+            .call(d3.axisBottom(x));
+
+        g.append("g")
+            .call(d3.axisLeft(y));
+
+        // Confidence intervals
+        g.selectAll(".ci")
+            .data(data)
+            .enter()
+            .append("line")
+            .attr("class", "ci")
+            .attr("x1", d => x(d.label) + x.bandwidth() / 2)
+            .attr("x2", d => x(d.label) + x.bandwidth() / 2)
+            .attr("y1", d => y(d.mean - d.ci))
+            .attr("y2", d => y(d.mean + d.ci))
+            .attr("stroke", "#6c757d")
+            .attr("stroke-width", 2);
+
+        // Point means, with the parameters as a tooltip
+        g.selectAll(".dot")
+            .data(data)
+            .enter()
+            .append("circle")
+            .attr("class", "dot")
+            .attr("cx", d => x(d.label) + x.bandwidth() / 2)
+            .attr("cy", d => y(d.mean))
+            .attr("r", 5)
+            .attr("fill", "#007bff")
+            .append("title")
+            .text(d => `${d.params}\n${metric}: ${d.mean.toFixed(3)} ± ${d.ci.toFixed(3)}`);
+
+        // Add title
+        svg.append("text")
+            .attr("x", width / 2 + margin.left)
+            .attr("y", 20)
+            .attr("text-anchor", "middle")
+            .style("font-size", "16px")
+            .style("font-weight", "bold")
+            .text(`${metric} by Design Point (95% CI)`);
+
+        // Add X-axis title
+        svg.append("text")
+            .attr("x", width / 2 + margin.left)
+            .attr("y", 390)
+            .attr("text-anchor", "middle")
+            .style("font-size", "14px")
+            .text("Design point (hover for parameters)");
+    }
+}
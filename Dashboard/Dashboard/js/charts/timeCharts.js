@@ -2,11 +2,15 @@
 class TimeCharts {
     constructor() {
         this.charts = {};
+        // Sequence number of the latest /timeseries request; older responses
+        // arriving late are dropped
+        this.timelineRequest = 0;
     }
     
     createCharts() {
         this.createProductionTimeChart('productionTimeChart');
         this.createFixingTimeChart('fixingTimeChart');
+        this.createRunTimelineChart('runTimelineChart');
     }
     
     createProductionTimeChart(containerId) {
@@ -59,16 +63,170 @@ class TimeCharts {
         this.updateFixingTimeChart();
     }
     
+    createRunTimelineChart(containerId) {
+        const container = document.getElementById(containerId);
+        if (!container) return;
+        
+        // Clear the container
+        container.innerHTML = "";
+        
+        // Create the SVG
+        const svg = d3.select(container)
+            .append("svg")
+            .attr("width", "100%")
+            .attr("height", "100%")
+            .attr("viewBox", "0 0 700 400")
+            .attr("preserveAspectRatio", "xMidYMid meet");
+            
+        // Save chart reference
+        this.charts.runTimelineChart = {
+            svg: svg,
+            containerId: containerId
+        };
+        
+        ['timeseriesMetric', 'timeseriesMethod'].forEach(id => {
+            const select = document.getElementById(id);
+            if (select) {
+                select.addEventListener('change', () => this.updateRunTimelineChart());
+            }
+        });
+        
+        // Draw initial chart
+        this.updateRunTimelineChart();
+    }
+    
     updateCharts() {
         this.updateProductionTimeChart();
         this.updateFixingTimeChart();
+        this.updateRunTimelineChart();
+    }
+    
+    // Fetch the within-run series of the current period, already downsampled
+    // by the server to about the chart's pixel width
+    async updateRunTimelineChart() {
+        const chart = this.charts.runTimelineChart;
+        if (!chart) return;
+        
+        const metricSelect = document.getElementById('timeseriesMetric');
+        const methodSelect = document.getElementById('timeseriesMethod');
+        const container = document.getElementById(chart.containerId);
+        const params = new URLSearchParams({
+            metric: metricSelect ? metricSelect.value : 'production_time',
+            method: methodSelect ? methodSelect.value : 'lttb',
+            run_start: currentStartDate,
+            run_end: currentStartDate + getPeriodLength() - 1,
+            width: Math.round(container.clientWidth) || 700
+        });
+        
+        const requestId = ++this.timelineRequest;
+        let result = null;
+        try {
+            const response = await fetch(`http://localhost:5000/timeseries?${params}`);
+            result = await response.json();
+        } catch (error) {
+            console.error('Error loading time series:', error);
+        }
+        if (requestId !== this.timelineRequest) return;
+        
+        this.drawRunTimeline(result && result.success ? result.series : [],
+            metricSelect ? metricSelect.selectedOptions[0].text : 'Production Time');
+    }
+    
+    drawRunTimeline(series, label) {
+        const svg = this.charts.runTimelineChart.svg;
+        svg.selectAll("*").remove();
+        
+        // Check if there is data
+        if (!series || series.length === 0) {
+            svg.append("text")
+                .attr("x", 350)
+                .attr("y", 200)
+                .attr("text-anchor", "middle")
+                .text("No event trace available for this period");
+            return;
+        }
+        
+        // Configure dimensions and margins
+        const margin = {top: 40, right: 30, bottom: 50, left: 60};
+        const width = 700 - margin.left - margin.right;
+        const height = 400 - margin.top - margin.bottom;
+        
+        // Create main container
+        const g = svg.append("g")
+            .attr("transform", `translate(${margin.left},${margin.top})`);
+        
+        // Define scales
+        const x = d3.scaleLinear()
+            .domain([
+                d3.min(series, s => d3.min(s.t)),
+                d3.max(series, s => d3.max(s.t))
+            ])
+            .range([0, width]);
+            
+        const y = d3.scaleLinear()
+            .domain([0, d3.max(series, s => d3.max(s.v)) * 1.1 || 1])
+            .range([height, 0]);
+        
+        const color = d3.scaleOrdinal(d3.schemeCategory10)
+            .domain(series.map(s => s.run));
+        
+        // Add axes
+        g.append("g")
+            .attr("transform", `translate(0,${height})`)
+            .call(d3.axisBottom(x));
+            
+        g.append("g")
+            .call(d3.axisLeft(y));
+        
+        // One line per run
+        const line = d3.line()
+            .x(d => x(d[0]))
+            .y(d => y(d[1]));
+        
+        g.selectAll(".run-line")
+            .data(series)
+            .enter()
+            .append("path")
+            .attr("class", "run-line")
+            .attr("fill", "none")
+            .attr("stroke", s => color(s.run))
+            .attr("stroke-width", 1.5)
+            .attr("opacity", 0.8)
+            .attr("d", s => line(d3.zip(s.t, s.v)));
+        
+        // Add title
+        svg.append("text")
+            .attr("x", width / 2 + margin.left)
+            .attr("y", 20)
+            .attr("text-anchor", "middle")
+            .style("font-size", "16px")
+            .style("font-weight", "bold")
+            .text(`${label} within each run`);
+            
+        // Add axis titles
+        svg.append("text")
+            .attr("x", width / 2 + margin.left)
+            .attr("y", 395)
+            .attr("text-anchor", "middle")
+            .style("font-size", "14px")
+            .text("Simulation time (units)");
+            
+        svg.append("text")
+            .attr("transform", "rotate(-90)")
+            .attr("x", -(height / 2) - margin.top)
+            .attr("y", 20)
+            .attr("text-anchor", "middle")
+            .style("font-size", "14px")
+            .text(label);
     }
     
     updateProductionTimeChart() {
         if (!this.charts.productionTimeChart) return;
         
-        const svg = this.charts.productionTimeChart.svg;
+        const chart = this.charts.productionTimeChart;
+        const svg = chart.svg;
         svg.selectAll("*").remove();
+        chart.x = null;
         
         // Get filtered data for current period
         const data = this.getCurrentPeriodData();
@@ -83,11 +241,10 @@ class TimeCharts {
             return;
         }
         
-        // Extract production times
-        const timeData = data.map(run => ({
-            run: run.run,
-            productionTime: run.metrics['Production Time'] || 0
-        }));
+        // Extract production times and, when the batch recorded them, the
+        // per-run p50/p95/p99 of individual laptop production times
+        const timeData = data.map(run => this.productionTimePoint(run));
+        const hasPercentiles = timeData.every(d => d.p50 !== undefined && d.p99 !== undefined);
         
         // Configure dimensions and margins
         const margin = {top: 40, right: 30, bottom: 60, left: 60};
@@ -98,14 +255,17 @@ class TimeCharts {
         const g = svg.append("g")
             .attr("transform", `translate(${margin.left},${margin.top})`);
         
-        // Define scales
+        // Define scales; while a batch streams in, the x axis spans the whole
+        // period so later runs are appended without moving the drawn points
         const x = d3.scaleBand()
-            .domain(timeData.map(d => d.run))
+            .domain(batchStreaming ? periodRuns() : timeData.map(d => d.run))
             .range([0, width])
             .padding(0.2);
             
+        const yMin = d3.min(timeData, d => hasPercentiles ? Math.min(d.p50, d.productionTime) : d.productionTime);
+        const yMax = d3.max(timeData, d => hasPercentiles ? d.p99 : d.productionTime);
         const y = d3.scaleLinear()
-            .domain([d3.min(timeData, d => d.productionTime) * 0.9, d3.max(timeData, d => d.productionTime) * 1.1])
+            .domain([yMin * 0.9, yMax * 1.1])
             .range([height, 0]);
         
         // Add axes
@@ -115,34 +275,40 @@ class TimeCharts {
             .selectAll("text")
             .attr("transform", "translate(-10,0)rotate(-45)")
             .style("text-anchor", "end");
+        
+        const center = d => x(d.run) + x.bandwidth() / 2;
+        
+        // Percentile band: p50-p95 shaded, p99 as a dotted line
+        let band = null;
+        let p99Line = null;
+        let p99Label = null;
+        if (hasPercentiles) {
+            band = g.append("path")
+                .attr("fill", "#007bff")
+                .attr("opacity", 0.15);
+            
+            p99Line = g.append("path")
+                .attr("fill", "none")
+                .attr("stroke", "#6c757d")
+                .attr("stroke-width", 1.5)
+                .attr("stroke-dasharray", "2,3");
+            
+            p99Label = g.append("text")
+                .attr("x", width - 5)
+                .attr("text-anchor", "end")
+                .style("font-size", "12px")
+                .style("fill", "#6c757d")
+                .text("p99 (band: p50-p95)");
+        }
             
         g.append("g")
             .call(d3.axisLeft(y));
         
-        // Define the line
-        const line = d3.line()
-            .x(d => x(d.run) + x.bandwidth() / 2)
-            .y(d => y(d.productionTime))
-            .curve(d3.curveMonotoneX);
-        
         // Draw the line
-        g.append("path")
-            .datum(timeData)
+        const linePath = g.append("path")
             .attr("fill", "none")
             .attr("stroke", "#007bff")
-            .attr("stroke-width", 3)
-            .attr("d", line);
-        
-        // Draw points
-        g.selectAll(".dot")
-            .data(timeData)
-            .enter()
-            .append("circle")
-            .attr("class", "dot")
-            .attr("cx", d => x(d.run) + x.bandwidth() / 2)
-            .attr("cy", d => y(d.productionTime))
-            .attr("r", 5)
-            .attr("fill", "#007bff");
+            .attr("stroke-width", 3);
         
         // Add title
         svg.append("text")
@@ -162,24 +328,80 @@ class TimeCharts {
             .style("font-size", "14px")
             .text("Production Time (units)");
         
-        // Add average line
-        const avgProductionTime = d3.mean(timeData, d => d.productionTime);
-        
-        g.append("line")
+        // Average line, moved as runs arrive
+        const avgLine = g.append("line")
             .attr("x1", 0)
-            .attr("y1", y(avgProductionTime))
             .attr("x2", width)
-            .attr("y2", y(avgProductionTime))
             .attr("stroke", "#dc3545")
             .attr("stroke-width", 2)
             .attr("stroke-dasharray", "5,5");
             
-        g.append("text")
+        const avgLabel = g.append("text")
             .attr("x", width - 5)
-            .attr("y", y(avgProductionTime) - 5)
             .attr("text-anchor", "end")
             .style("font-size", "12px")
-            .style("fill", "#dc3545")
+            .style("fill", "#dc3545");
+        
+        // Kept so appendRuns can add points with the same scales
+        Object.assign(chart, {
+            g, x, y, center, hasPercentiles, band, p99Line, p99Label,
+            linePath, avgLine, avgLabel, points: []
+        });
+        this.drawProductionTimePoints(timeData);
+    }
+    
+    productionTimePoint(run) {
+        return {
+            run: run.run,
+            productionTime: run.metrics['Production Time'] || 0,
+            p50: run.metrics['Production Time P50'],
+            p95: run.metrics['Production Time P95'],
+            p99: run.metrics['Production Time P99']
+        };
+    }
+    
+    // Add the dots of new runs and extend the lines, band and average
+    drawProductionTimePoints(points) {
+        const chart = this.charts.productionTimeChart;
+        const { g, y, center } = chart;
+        chart.points = chart.points.concat(points);
+        const all = chart.points;
+        
+        if (chart.hasPercentiles) {
+            chart.band.attr("d", d3.area()
+                .x(center)
+                .y0(d => y(d.p50))
+                .y1(d => y(d.p95))
+                .curve(d3.curveMonotoneX)(all));
+            chart.p99Line.attr("d", d3.line()
+                .x(center)
+                .y(d => y(d.p99))
+                .curve(d3.curveMonotoneX)(all));
+            chart.p99Label.attr("y", y(all[all.length - 1].p99) - 5);
+        }
+        
+        chart.linePath.attr("d", d3.line()
+            .x(center)
+            .y(d => y(d.productionTime))
+            .curve(d3.curveMonotoneX)(all));
+        
+        // Draw points
+        g.selectAll(null)
+            .data(points)
+            .enter()
+            .append("circle")
+            .attr("class", "dot")
+            .attr("cx", center)
+            .attr("cy", d => y(d.productionTime))
+            .attr("r", 5)
+            .attr("fill", "#007bff");
+        
+        const avgProductionTime = d3.mean(all, d => d.productionTime);
+        chart.avgLine
+            .attr("y1", y(avgProductionTime))
+            .attr("y2", y(avgProductionTime));
+        chart.avgLabel
+            .attr("y", y(avgProductionTime) - 5)
             .text(`Average: ${avgProductionTime.toFixed(2)}`);
     }
     
@@ -307,6 +529,28 @@ class TimeCharts {
             .text("Repair Time (units)");
     }
     
+    // Streamed runs of the visible period (see appendStreamedRuns in main.js):
+    // only their points are added, unless they fall outside the drawn scales.
+    // The within-run timeline is loaded once the batch is done
+    appendRuns(runs) {
+        const chart = this.charts.productionTimeChart;
+        const points = runs.map(run => this.productionTimePoint(run));
+        const [low, high] = chart && chart.x ? chart.y.domain() : [0, 0];
+        const fits = chart && chart.x && points.every(d => {
+            const values = chart.hasPercentiles
+                ? [d.productionTime, d.p50, d.p95, d.p99]
+                : [d.productionTime];
+            return chart.x(d.run) !== undefined &&
+                values.every(v => v !== undefined && v >= low && v <= high);
+        });
+        
+        if (fits) {
+            this.drawProductionTimePoints(points);
+        } else {
+            this.updateProductionTimeChart();
+        }
+    }
+    
     getCurrentPeriodData() {
         // Get data according to selected period and date
         const period = currentPeriod;
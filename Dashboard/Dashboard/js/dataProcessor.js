@@ -1,7 +1,68 @@
 // dataProcessor.js
+
+// Metrics the dashboard charts read from each run; the server sends only these
+const DASHBOARD_METRICS = [
+    'Total Production', 'Faulty Products', 'Faulty Rate',
+    ...[1, 2, 3, 4, 5, 6].flatMap(i => [
+        `Station ${i} Occupancy Rate`, `Station ${i} Wait Time`, `Station ${i} Downtime`
+    ]),
+    'Production Time', 'Fixing Time', 'Supplier Occupancy',
+    'Production Time P50', 'Production Time P95', 'Production Time P99'
+];
+
+// Binary results (format=columns): the magic "LFC1", a little-endian uint32
+// header length, a JSON header padded to 8 bytes, then one Float64 column of
+// header.runs values per name in header.columns
+const COLUMNS_MAGIC = 'LFC1';
+
+// Views each column in place as a Float64Array (every column starts 8-byte
+// aligned; browsers are little-endian). Runs keep the usual {run, metrics}
+// shape, but metrics is a view whose getters read from the columns, so no
+// value is copied or parsed per run.
+function decodeColumns(buffer) {
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== COLUMNS_MAGIC) {
+        throw new Error('Unexpected results format');
+    }
+    const headerLength = new DataView(buffer).getUint32(4, true);
+    const header = JSON.parse(
+        new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength))
+    );
+
+    const columns = {};
+    let offset = 8 + headerLength;
+    header.columns.forEach(name => {
+        columns[name] = new Float64Array(buffer, offset, header.runs);
+        offset += header.runs * Float64Array.BYTES_PER_ELEMENT;
+    });
+
+    const index = Symbol('index');
+    class RunMetrics {
+        constructor(i) {
+            this[index] = i;
+        }
+    }
+    header.columns.slice(1).forEach(name => {
+        const column = columns[name];
+        Object.defineProperty(RunMetrics.prototype, name, {
+            get() { return column[this[index]]; },
+            enumerable: true
+        });
+    });
+
+    const runNumbers = columns.run;
+    const runs = new Array(header.runs);
+    for (let i = 0; i < header.runs; i++) {
+        runs[i] = { run: runNumbers[i], metrics: new RunMetrics(i) };
+    }
+    return { ...header, columns, runs };
+}
+
 class DataProcessor {
     constructor() {
         this.simulationData = null;
+        // Validator of the last response, sent back as If-None-Match
+        this.etag = null;
         this.processedData = {
             production: {},
             stations: {},
@@ -9,18 +70,45 @@ class DataProcessor {
         };
     }
 
+    // Conditional GET: the server answers 304 when the batch has not changed
+    async fetchSimulationResults() {
+        const headers = {};
+        if (this.etag && this.simulationData) {
+            headers['If-None-Match'] = this.etag;
+        }
+        
+        // Per-metric statistics are loaded separately by the distribution chart
+        const params = new URLSearchParams({
+            metrics: DASHBOARD_METRICS.join(','),
+            statistics: 'false',
+            format: 'columns'
+        });
+        const response = await fetch(
+            `http://localhost:5000/get-simulation-results?${params}`, { headers }
+        );
+        
+        if (response.status === 304) {
+            return this.simulationData;
+        }
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error: ${response.status}`);
+        }
+        
+        const data = decodeColumns(await response.arrayBuffer());
+        
+        if (data.success) {
+            this.simulationData = data;
+            this.etag = response.headers.get('ETag');
+        }
+        return data;
+    }
+
     async loadData() {
         try {
-            const response = await fetch('http://localhost:5000/get-simulation-results');
-            
-            if (!response.ok) {
-                throw new Error(`HTTP error: ${response.status}`);
-            }
-            
-            const data = await response.json();
+            const data = await this.fetchSimulationResults();
             
             if (data.success) {
-                this.simulationData = data;
                 this.processData();
                 return this.processedData;
             } else {
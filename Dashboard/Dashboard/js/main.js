@@ -4,6 +4,8 @@
 let productionCharts;
 let stationCharts;
 let timeCharts;
+let sweepCharts;
+let distributionCharts;
 
 document.addEventListener('DOMContentLoaded', async () => {
     // Initialize UI elements
@@ -52,42 +54,75 @@ function initUI() {
             
             console.log("Starting simulation...");
             
-            // Call server endpoint to run simulation
+            // Queue the simulation job; the server answers immediately with its id.
+            // The same seed reproduces the same batch, read back from the result cache
+            const seed = parseInt(document.getElementById('simulationSeed').value, 10);
             const response = await fetch('http://localhost:5000/run-simulation', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
-                }
+                },
+                body: JSON.stringify(Number.isInteger(seed) && seed >= 0 ? { seed } : {})
             });
             
-            const data = await response.json();
+            const submitted = await response.json();
+            
+            if (!submitted.success) {
+                throw new Error(submitted.error);
+            }
             
-            if (data.success) {
+            // Follow the job until it finishes, streaming runs when the browser can
+            const streaming = !!window.EventSource;
+            const job = streaming
+                ? await streamSimulationJob(submitted.job, simulationStatus)
+                : await pollSimulationJob(submitted.job_id, simulationStatus);
+            
+            if (job.status === 'completed') {
                 // Show output in browser console
                 console.log("Simulation result:");
-                console.log(data.output);
+                console.log(job.output);
                 
                 if (simulationStatus) {
+                    // Sequential sampling reports how many runs it needed
+                    const precision = job.result && job.result.precision;
+                    const detail = precision
+                        ? ` Used ${job.result.runs} of ${job.progress.total_runs} runs ` +
+                          `(${precision.converged ? 'precision target met' : 'run cap reached'}).`
+                        : '';
                     simulationStatus.innerHTML = `
                         <div class="alert alert-success">
-                            <strong>Simulation completed successfully.</strong>
+                            <strong>Simulation completed successfully.</strong>${detail}
                         </div>
                     `;
                 }
                 
-                // Reload data and update charts
-                await loadSimulationResults();
+                // Streamed runs are already loaded; otherwise reload the results
+                if (!streaming) {
+                    await loadSimulationResults();
+                }
                 updateAllCharts();
                 
                 console.log("Visualizations updated with new data");
+            } else if (job.status === 'cancelled') {
+                // Show the runs that finished before the cancel
+                if (streaming) {
+                    updateAllCharts();
+                }
+                if (simulationStatus) {
+                    simulationStatus.innerHTML = `
+                        <div class="alert alert-warning">
+                            <strong>Simulation cancelled.</strong>
+                        </div>
+                    `;
+                }
             } else {
-                console.error("Error running simulation:", data.error);
+                console.error("Error running simulation:", job.error);
                 
                 if (simulationStatus) {
                     simulationStatus.innerHTML = `
                         <div class="alert alert-danger">
                             <strong>Error running simulation.</strong>
-                            <p>${data.error}</p>
+                            <p>${job.error}</p>
                         </div>
                     `;
                 }
@@ -114,6 +149,154 @@ function initUI() {
     });
 }
 
+// Poll a simulation job until it completes, fails or is cancelled
+async function pollSimulationJob(jobId, simulationStatus, interval = 1000) {
+    while (true) {
+        const response = await fetch(`http://localhost:5000/jobs/${jobId}`);
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error: ${response.status}`);
+        }
+        
+        const data = await response.json();
+        const job = data.job;
+        
+        if (['completed', 'failed', 'cancelled'].includes(job.status)) {
+            return job;
+        }
+        
+        // Show progress with a cancel option while the batch runs
+        renderJobProgress(jobId, simulationStatus, job.progress);
+        
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+}
+
+// Follow a simulation job over Server-Sent Events, drawing each run as it arrives
+function streamSimulationJob(job, simulationStatus) {
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`http://localhost:5000/jobs/${job.id}/stream`);
+        const progress = { completed_runs: 0, total_runs: job.progress.total_runs };
+        
+        // Start the new batch empty; the charts fill in run by run
+        window.simulationData = { success: true, runs: [], summary: {} };
+        batchStreaming = true;
+        drawStreamedCharts();
+        let pendingRuns = [];
+        let frameRequested = false;
+        
+        // Runs arriving within one frame are drawn together
+        const flushRuns = () => {
+            frameRequested = false;
+            const runs = pendingRuns;
+            pendingRuns = [];
+            
+            window.simulationData.runs.push(...runs);
+            appendStreamedRuns(runs);
+            
+            progress.completed_runs = window.simulationData.runs.length;
+            renderJobProgress(job.id, simulationStatus, progress);
+        };
+        
+        source.addEventListener('run', (event) => {
+            pendingRuns.push(JSON.parse(event.data));
+            if (!frameRequested) {
+                frameRequested = true;
+                requestAnimationFrame(flushRuns);
+            }
+        });
+        
+        source.addEventListener('done', (event) => {
+            source.close();
+            if (pendingRuns.length > 0) {
+                flushRuns();
+            }
+            batchStreaming = false;
+            resolve(JSON.parse(event.data));
+        });
+        
+        source.onerror = () => {
+            // EventSource reconnects by itself unless the connection was closed
+            if (source.readyState === EventSource.CLOSED) {
+                batchStreaming = false;
+                reject(new Error('Lost connection to the simulation stream'));
+            }
+        };
+    });
+}
+
+// Per-station averages are redrawn at most this often (ms) while streaming
+const STREAM_REDRAW_INTERVAL = 1000;
+let lastStreamRedraw = 0;
+
+// Redraw the charts that streamed runs feed, from the runs received so far
+function drawStreamedCharts() {
+    lastStreamRedraw = performance.now();
+    if (productionCharts) {
+        productionCharts.updateCharts();
+    }
+    if (stationCharts) {
+        stationCharts.updateCharts();
+    }
+    if (timeCharts) {
+        timeCharts.updateProductionTimeChart();
+        timeCharts.updateFixingTimeChart();
+    }
+}
+
+// Streaming hook: charts with one mark per run append the new runs of the
+// visible period in place; charts of per-station averages are redrawn at most
+// every STREAM_REDRAW_INTERVAL. The within-run timeline and the distributions
+// are loaded by updateAllCharts once the job is done
+function appendStreamedRuns(runs) {
+    const [first, last] = d3.extent(periodRuns());
+    const visible = runs.filter(run => run.run >= first && run.run <= last);
+    if (visible.length === 0) return;
+    
+    if (productionCharts) {
+        productionCharts.appendRuns(visible);
+    }
+    if (timeCharts) {
+        timeCharts.appendRuns(visible);
+    }
+    
+    if (performance.now() - lastStreamRedraw >= STREAM_REDRAW_INTERVAL) {
+        lastStreamRedraw = performance.now();
+        if (stationCharts) {
+            stationCharts.updateCharts();
+        }
+        if (timeCharts) {
+            timeCharts.updateFixingTimeChart();
+        }
+    }
+}
+
+// Show job progress with a cancel button in the simulation status area
+function renderJobProgress(jobId, simulationStatus, progress) {
+    if (!simulationStatus) return;
+    
+    const percent = progress.total_runs
+        ? Math.round(progress.completed_runs / progress.total_runs * 100)
+        : 0;
+    simulationStatus.innerHTML = `
+        <div class="alert alert-info">
+            <div class="d-flex align-items-center">
+                <div class="spinner-border spinner-border-sm mr-2" role="status">
+                    <span class="sr-only">Running...</span>
+                </div>
+                <div>Running simulation... run ${progress.completed_runs} of ${progress.total_runs}</div>
+            </div>
+            <div class="progress mt-2">
+                <div class="progress-bar" role="progressbar" style="width: ${percent}%"></div>
+            </div>
+            <button id="cancelSimulation" class="btn btn-sm btn-outline-danger mt-2">Cancel</button>
+        </div>
+    `;
+    document.getElementById('cancelSimulation').addEventListener('click', () => {
+        fetch(`http://localhost:5000/jobs/${jobId}/cancel`, { method: 'POST' });
+    });
+}
+
 function setupDateControls() {
     // Initialize calendar visualizer
     updateDateVisualizer();
@@ -166,13 +349,8 @@ async function loadSimulationResults() {
     try {
         console.log("Loading simulation results...");
         
-        const response = await fetch('http://localhost:5000/get-simulation-results');
-        
-        if (!response.ok) {
-            throw new Error(`HTTP error: ${response.status}`);
-        }
-        
-        const data = await response.json();
+        // Unchanged results are revalidated with the server instead of re-downloaded
+        const data = await dataProcessor.fetchSimulationResults();
         
         if (data.success) {
             // Store data for use in visualizations
@@ -245,11 +423,15 @@ function initCharts() {
     productionCharts = new ProductionCharts();
     stationCharts = new StationCharts();
     timeCharts = new TimeCharts();
+    sweepCharts = new SweepCharts();
+    distributionCharts = new DistributionCharts();
     
     // Initialize all charts
     productionCharts.createCharts();
     stationCharts.createCharts();
     timeCharts.createCharts();
+    sweepCharts.createCharts();
+    distributionCharts.createCharts();
     
     console.log("Charts initialized successfully");
 }
@@ -268,6 +450,10 @@ function updateAllCharts() {
     if (timeCharts) {
         timeCharts.updateCharts();
     }
+
+    if (distributionCharts) {
+        distributionCharts.updateCharts();
+    }
     
     // Update optimization controls
     updateOptimizationControls();
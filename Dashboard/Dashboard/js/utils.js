@@ -2,6 +2,8 @@
 let currentPeriod = 'day';
 let currentStartDate = 1;
 const MAX_RUN = 100; // Total available runs/days
+// True while a batch streams in run by run (see streamSimulationJob)
+let batchStreaming = false;
 
 // Function to get the length of the selected period
 function getPeriodLength() {
@@ -14,6 +16,11 @@ function getPeriodLength() {
     }
 }
 
+// Run numbers of the selected period
+function periodRuns() {
+    return d3.range(currentStartDate, currentStartDate + getPeriodLength());
+}
+
 // Function to format numbers
 function formatNumber(number, decimals = 2) {
     return number.toFixed(decimals);
@@ -0,0 +1,364 @@
+# aggregation.py
+import math
+from functools import lru_cache
+from statistics import NormalDist
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from resultsStore import METRIC_NAMES, flatten_run_metrics
+
+
+# Above this many degrees of freedom the Cornish-Fisher expansion is used; its
+# error there is below 1e-8
+T_SERIES_MAX_DF = 100
+
+
+def _t_coverage(t: float, df: int) -> float:
+    """P(|T| < t) for Student's t with integer df (Abramowitz & Stegun 26.7.3-4)"""
+    theta = math.atan(t / math.sqrt(df))
+    sin, cos2 = math.sin(theta), math.cos(theta) ** 2
+    if df % 2:
+        # 2/pi * (theta + sin cos (1 + 2/3 cos^2 + 2*4/(3*5) cos^4 + ...))
+        term, total = 1.0, 1.0
+        for k in range(1, (df - 1) // 2):
+            term *= cos2 * 2 * k / (2 * k + 1)
+            total += term
+        series = sin * math.cos(theta) * total if df > 1 else 0.0
+        return 2 / math.pi * (theta + series)
+    # sin (1 + 1/2 cos^2 + 1*3/(2*4) cos^4 + ...)
+    term, total = 1.0, 1.0
+    for k in range(1, df // 2):
+        term *= cos2 * (2 * k - 1) / (2 * k)
+        total += term
+    return sin * total
+
+
+@lru_cache(maxsize=1024)
+def t_critical(df: int, confidence: float = 0.95) -> float:
+    """Two-sided Student t critical value
+
+    Exact (to float precision) for df <= T_SERIES_MAX_DF: the closed-form
+    coverage is inverted by bisection. Larger df use the Cornish-Fisher
+    expansion, which converges to the normal quantile.
+    """
+    if df <= 0:
+        return math.inf
+    if df <= T_SERIES_MAX_DF:
+        # Coverage grows with theta = atan(t / sqrt(df)) on (0, pi/2)
+        low, high = 0.0, math.pi / 2
+        for _ in range(100):
+            middle = (low + high) / 2
+            t = math.sqrt(df) * math.tan(middle)
+            if _t_coverage(t, df) < confidence:
+                low = middle
+            else:
+                high = middle
+        return math.sqrt(df) * math.tan((low + high) / 2)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return (
+        z
+        + (z**3 + z) / (4 * df)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * df**3)
+    )
+
+
+class RunningStats:
+    """Welford running mean and variance that can be merged across workers"""
+
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "RunningStats"):
+        """Combine with another accumulator (Chan et al. parallel update)"""
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def state(self) -> Dict:
+        """Exact JSON-serializable state, restored by from_state"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RunningStats":
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, state[name])
+        return stats
+
+    @property
+    def variance(self) -> float:
+        """Population variance (same convention as np.var)"""
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def sample_variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def ci_half_width(self, confidence: float = 0.95) -> float:
+        """Half-width of the t confidence interval for the mean"""
+        if self.n < 2:
+            return math.inf
+        return t_critical(self.n - 1, confidence) * math.sqrt(
+            self.sample_variance / self.n
+        )
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch)
+
+    Values are counted in logarithmic buckets, so any quantile is returned
+    within relative_accuracy of the true value and memory depends only on the
+    range of the data, not on how many values were added.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket in relative terms
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float):
+        self.count += 1
+        if value > 1e-12:
+            key = self._key(value)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif value < -1e-12:
+            key = self._key(-value)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zero_count += 1
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def state(self) -> Dict:
+        """Exact JSON-serializable state, restored by from_state"""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            # JSON object keys are strings, so buckets are kept as pairs
+            "positive": sorted(self.positive.items()),
+            "negative": sorted(self.negative.items()),
+            "zero_count": self.zero_count,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"])
+        sketch.positive = {key: count for key, count in state["positive"]}
+        sketch.negative = {key: count for key, count in state["negative"]}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        return sketch
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive))
+
+
+class MetricsAggregator:
+    """Online summary of every per-run metric
+
+    Each finished run updates a running mean/variance and a quantile sketch
+    per metric; the per-run values themselves are never kept. Aggregators
+    built by different workers can be merged.
+    """
+
+    def __init__(self):
+        self.stats = {name: RunningStats() for name in METRIC_NAMES}
+        self.sketches = {name: QuantileSketch() for name in METRIC_NAMES}
+
+    @property
+    def runs(self) -> int:
+        return self.stats[METRIC_NAMES[0]].n
+
+    def update(self, run_metrics: Dict):
+        """Add one run's get_metrics dictionary"""
+        self.update_row(flatten_run_metrics(run_metrics))
+
+    def update_row(self, row: Dict[str, float]):
+        """Add one observation that is already flattened to metric columns"""
+        for name, value in row.items():
+            self.stats[name].update(value)
+            self.sketches[name].add(value)
+
+    def merge(self, other: "MetricsAggregator"):
+        for name in METRIC_NAMES:
+            self.stats[name].merge(other.stats[name])
+            self.sketches[name].merge(other.sketches[name])
+
+    def state(self) -> Dict:
+        """Exact JSON-serializable state, e.g. for a batch checkpoint
+
+        Restoring it with from_state and adding the remaining runs gives
+        bit-for-bit the same aggregates as never having stopped.
+        """
+        return {
+            name: {
+                "stats": self.stats[name].state(),
+                "sketch": self.sketches[name].state(),
+            }
+            for name in METRIC_NAMES
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "MetricsAggregator":
+        aggregator = cls()
+        for name in METRIC_NAMES:
+            aggregator.stats[name] = RunningStats.from_state(state[name]["stats"])
+            aggregator.sketches[name] = QuantileSketch.from_state(
+                state[name]["sketch"]
+            )
+        return aggregator
+
+    def mean(self, name: str) -> float:
+        return self.stats[name].mean
+
+    def relative_half_width(self, name: str, confidence: float = 0.95) -> float:
+        """CI half-width of a metric's mean as a fraction of the mean"""
+        stats = self.stats[name]
+        half_width = stats.ci_half_width(confidence)
+        if half_width == 0:
+            return 0.0
+        return half_width / abs(stats.mean) if stats.mean else math.inf
+
+    def converged(
+        self, names, precision: float, confidence: float = 0.95
+    ) -> bool:
+        """Whether every named metric's relative half-width is within precision"""
+        return all(
+            self.relative_half_width(name, confidence) <= precision for name in names
+        )
+
+    def summary(self, confidence: float = 0.95) -> Dict:
+        """Mean, std, confidence interval and p5/p50/p95 for every metric"""
+        summary = {}
+        for name in METRIC_NAMES:
+            stats = self.stats[name]
+            sketch = self.sketches[name]
+            half_width = stats.ci_half_width(confidence)
+            summary[name] = {
+                "n": stats.n,
+                "mean": stats.mean,
+                "std": math.sqrt(stats.sample_variance),
+                "ci95": (
+                    [stats.mean - half_width, stats.mean + half_width]
+                    if stats.n > 1
+                    else None
+                ),
+                "min": stats.min,
+                "max": stats.max,
+                "p5": sketch.quantile(0.05),
+                "p50": sketch.quantile(0.50),
+                "p95": sketch.quantile(0.95),
+            }
+        return summary
+
+
+# Quantiles reported by matrix_summary, as percentages
+SUMMARY_PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 20
+
+
+def matrix_summary(
+    columns: List[str],
+    values: np.ndarray,
+    bins: int = HISTOGRAM_BINS,
+    percentiles: Sequence[float] = SUMMARY_PERCENTILES,
+) -> Dict:
+    """Statistics and histograms of every column of a runs x metrics matrix
+
+    Everything is computed with whole-matrix NumPy operations: one call per
+    statistic across all metrics, and a single bincount for every histogram.
+    Each metric gets bins equal-width bins between its minimum and maximum.
+    """
+    runs = values.shape[0]
+    if runs == 0:
+        return {}
+
+    means = values.mean(axis=0)
+    stds = values.std(axis=0, ddof=1) if runs > 1 else np.zeros(len(columns))
+    lows = values.min(axis=0)
+    highs = values.max(axis=0)
+    quantiles = np.percentile(values, percentiles, axis=0)
+
+    # Bin index of every value, offset per column so one bincount does all
+    spans = np.where(highs > lows, highs - lows, 1.0)
+    indices = np.floor((values - lows) / spans * bins).astype(int)
+    np.clip(indices, 0, bins - 1, out=indices)
+    indices += np.arange(len(columns)) * bins
+    counts = np.bincount(indices.ravel(), minlength=len(columns) * bins)
+    counts = counts.reshape(len(columns), bins)
+    edges = lows[:, None] + spans[:, None] * np.linspace(0, 1, bins + 1)
+
+    summary = {}
+    for column, name in enumerate(columns):
+        stats = {
+            "n": runs,
+            "mean": float(means[column]),
+            "std": float(stds[column]),
+            "min": float(lows[column]),
+            "max": float(highs[column]),
+        }
+        for row, p in enumerate(percentiles):
+            stats[f"p{p}"] = float(quantiles[row, column])
+        stats["histogram"] = {
+            "edges": edges[column].tolist(),
+            "counts": counts[column].tolist(),
+        }
+        summary[name] = stats
+    return summary
@@ -0,0 +1,321 @@
+# batchHistory.py
+import json
+import math
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+from aggregation import t_critical
+from resultsStore import METRIC_NAMES, flatten_run_metrics
+
+HISTORY_DB = "./Results/history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    started_at TEXT,
+    finished_at TEXT,
+    status TEXT,
+    seed TEXT,
+    params TEXT,
+    runs INTEGER
+);
+CREATE INDEX IF NOT EXISTS batches_started ON batches (started_at);
+CREATE TABLE IF NOT EXISTS batch_runs (
+    batch_id TEXT,
+    metric TEXT,
+    run INTEGER,
+    value REAL,
+    PRIMARY KEY (batch_id, metric, run)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS batch_runs_metric ON batch_runs (metric, batch_id);
+CREATE TABLE IF NOT EXISTS batch_stats (
+    batch_id TEXT,
+    metric TEXT,
+    n INTEGER,
+    mean REAL,
+    std REAL,
+    min REAL,
+    max REAL,
+    PRIMARY KEY (batch_id, metric)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS batch_stats_metric ON batch_stats (metric);
+"""
+
+BATCH_FIELDS = (
+    "batch_id",
+    "started_at",
+    "finished_at",
+    "status",
+    "seed",
+    "params",
+    "runs",
+)
+
+
+def _timestamp() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class HistoryWriter:
+    """Record one batch, its per-run metrics and its aggregates in the history
+
+    Unlike the results table, which only ever holds the latest batch, the
+    history keeps every batch under its id. Runs are stored as one row per
+    metric, indexed by batch and by metric. finish() stores the batch's
+    per-metric aggregates, so listing and comparing batches never has to
+    scan their runs. With resume_from, the record of an interrupted batch is
+    reopened, keeping its first resume_from runs.
+    """
+
+    def __init__(
+        self,
+        batch_id: str,
+        params: Dict,
+        seed: Optional[int] = None,
+        path: str = HISTORY_DB,
+        resume_from: int = None,
+    ):
+        self.batch_id = batch_id
+        self.conn = _connect(path)
+        self.runs = 0
+        if resume_from is not None and _batch(self.conn, batch_id) is not None:
+            # An interrupted batch keeps its record and its first runs
+            self.runs = resume_from
+            with self.conn:
+                self.conn.execute(
+                    "UPDATE batches SET status = 'running', finished_at = NULL "
+                    "WHERE batch_id = ?",
+                    (batch_id,),
+                )
+                self.conn.execute(
+                    "DELETE FROM batch_runs WHERE batch_id = ? AND run > ?",
+                    (batch_id, resume_from),
+                )
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO batches "
+                "VALUES (?, ?, NULL, 'running', ?, ?, 0)",
+                (
+                    batch_id,
+                    _timestamp(),
+                    None if seed is None else str(seed),
+                    json.dumps(params),
+                ),
+            )
+
+    def append(self, run: int, metrics: Dict):
+        """Store one finished run (run numbers are 1-based)"""
+        row = flatten_run_metrics(metrics)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO batch_runs VALUES (?, ?, ?, ?)",
+                [(self.batch_id, name, run, row[name]) for name in METRIC_NAMES],
+            )
+        self.runs += 1
+
+    def finish(self, status: str = "completed"):
+        """Mark the batch finished and store its per-metric aggregates"""
+        # Two passes (mean, then squared deviations) keep the variance exact
+        rows = self.conn.execute(
+            """
+            SELECT runs.metric, COUNT(*), means.mean,
+                SUM((runs.value - means.mean) * (runs.value - means.mean)),
+                MIN(runs.value), MAX(runs.value)
+            FROM batch_runs AS runs
+            JOIN (
+                SELECT metric, AVG(value) AS mean FROM batch_runs
+                WHERE batch_id = ? GROUP BY metric
+            ) AS means USING (metric)
+            WHERE runs.batch_id = ?
+            GROUP BY runs.metric
+            """,
+            (self.batch_id, self.batch_id),
+        ).fetchall()
+        stats = [
+            (
+                self.batch_id,
+                metric,
+                n,
+                mean,
+                math.sqrt(squares / (n - 1)) if n > 1 else 0.0,
+                low,
+                high,
+            )
+            for metric, n, mean, squares, low, high in rows
+        ]
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM batch_stats WHERE batch_id = ?", (self.batch_id,)
+            )
+            self.conn.executemany(
+                "INSERT INTO batch_stats VALUES (?, ?, ?, ?, ?, ?, ?)", stats
+            )
+            self.conn.execute(
+                "UPDATE batches SET finished_at = ?, status = ?, runs = ? "
+                "WHERE batch_id = ?",
+                (_timestamp(), status, self.runs, self.batch_id),
+            )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _batch(conn: sqlite3.Connection, batch_id: str) -> Optional[Dict]:
+    row = conn.execute(
+        f"SELECT {', '.join(BATCH_FIELDS)} FROM batches WHERE batch_id = ?",
+        (batch_id,),
+    ).fetchone()
+    return None if row is None else _batch_dict(row)
+
+
+def _batch_dict(row) -> Dict:
+    batch = dict(zip(BATCH_FIELDS, row))
+    batch["params"] = json.loads(batch["params"])
+    return batch
+
+
+def list_batches(
+    path: str = HISTORY_DB, limit: int = 50, offset: int = 0, status: str = None
+) -> Dict:
+    """One page of recorded batches, newest first, and the total count"""
+    if not os.path.exists(path):
+        return {"total": 0, "batches": []}
+    conn = _connect(path)
+    try:
+        where, args = ("WHERE status = ?", [status]) if status else ("", [])
+        total = conn.execute(f"SELECT COUNT(*) FROM batches {where}", args)
+        total = total.fetchone()[0]
+        rows = conn.execute(
+            f"SELECT {', '.join(BATCH_FIELDS)} FROM batches {where} "
+            "ORDER BY started_at DESC, rowid DESC LIMIT ? OFFSET ?",
+            args + [limit, offset],
+        ).fetchall()
+    finally:
+        conn.close()
+    return {"total": total, "batches": [_batch_dict(row) for row in rows]}
+
+
+def _statistics(conn: sqlite3.Connection, batch_id: str) -> Dict[str, Dict]:
+    rows = conn.execute(
+        "SELECT metric, n, mean, std, min, max FROM batch_stats WHERE batch_id = ?",
+        (batch_id,),
+    ).fetchall()
+    return {
+        metric: {"n": n, "mean": mean, "std": std, "min": low, "max": high}
+        for metric, n, mean, std, low, high in rows
+    }
+
+
+def get_batch(
+    batch_id: str,
+    path: str = HISTORY_DB,
+    include_runs: bool = False,
+    metrics: List[str] = None,
+) -> Optional[Dict]:
+    """A recorded batch with its aggregates, and optionally its runs"""
+    if not os.path.exists(path):
+        return None
+    conn = _connect(path)
+    try:
+        batch = _batch(conn, batch_id)
+        if batch is None:
+            return None
+        statistics = _statistics(conn, batch_id)
+        names = [name for name in metrics or [] if name in METRIC_NAMES]
+        if names:
+            statistics = {
+                name: statistics[name] for name in names if name in statistics
+            }
+        batch["statistics"] = statistics
+
+        if include_runs:
+            query = "SELECT run, metric, value FROM batch_runs WHERE batch_id = ?"
+            args = [batch_id]
+            if names:
+                query += f" AND metric IN ({', '.join('?' for _ in names)})"
+                args += names
+            runs = {}
+            for run, metric, value in conn.execute(query + " ORDER BY run", args):
+                runs.setdefault(run, {})[metric] = value
+            batch["runs"] = [
+                {"run": run, "metrics": values} for run, values in runs.items()
+            ]
+    finally:
+        conn.close()
+    return batch
+
+
+def diff_batches(
+    first_id: str, second_id: str, path: str = HISTORY_DB, confidence: float = 0.95
+) -> Optional[Dict]:
+    """Per-metric difference of two batches' means (second - first)
+
+    Computed from the stored aggregates only. The confidence interval is
+    Welch's, which treats the batches as independent samples; batches run
+    with the same seed share random numbers, so their interval is
+    conservative.
+    """
+    if not os.path.exists(path):
+        return None
+    conn = _connect(path)
+    try:
+        batches = [_batch(conn, batch_id) for batch_id in (first_id, second_id)]
+        if None in batches:
+            return None
+        first = _statistics(conn, first_id)
+        second = _statistics(conn, second_id)
+    finally:
+        conn.close()
+
+    metrics = {}
+    for name in METRIC_NAMES:
+        if name not in first or name not in second:
+            continue
+        a, b = first[name], second[name]
+        difference = b["mean"] - a["mean"]
+        ci = None
+        if a["n"] > 1 and b["n"] > 1:
+            va, vb = a["std"] ** 2 / a["n"], b["std"] ** 2 / b["n"]
+            if va + vb > 0:
+                # Welch-Satterthwaite degrees of freedom
+                df = (va + vb) ** 2 / (
+                    va**2 / (a["n"] - 1) + vb**2 / (b["n"] - 1)
+                )
+                half_width = t_critical(max(1, int(df)), confidence) * math.sqrt(
+                    va + vb
+                )
+                ci = [difference - half_width, difference + half_width]
+            else:
+                ci = [difference, difference]
+        metrics[name] = {
+            "first": a["mean"],
+            "second": b["mean"],
+            "difference": difference,
+            "relative": difference / a["mean"] if a["mean"] else None,
+            "ci95": ci,
+        }
+    return {
+        "first": batches[0],
+        "second": batches[1],
+        "same_seed": batches[0]["seed"] is not None
+        and batches[0]["seed"] == batches[1]["seed"],
+        "metrics": metrics,
+    }
@@ -0,0 +1,71 @@
+# checkpoint.py
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+CHECKPOINT_PATH = "./Results/checkpoint.json"
+
+# Manifests are rewritten at most this often (seconds) while runs finish; a
+# resumed batch recomputes the runs finished since the last one
+CHECKPOINT_INTERVAL = 1.0
+
+CHECKPOINT_FORMAT = 1
+
+
+class Checkpoint:
+    """Durable progress manifest of one batch
+
+    The manifest holds the batch id, its parameters and seed entropy (from
+    which every run's random streams derive, so it is the RNG state of every
+    run still to do), the number of completed runs (runs 1 to "completed";
+    results arrive in run order) and the exact aggregator state after them.
+    It is replaced atomically: a crash leaves either the previous manifest or
+    the new one, never a torn file.
+    """
+
+    def __init__(
+        self, path: str = CHECKPOINT_PATH, interval: float = CHECKPOINT_INTERVAL
+    ):
+        self.path = path
+        self.interval = interval
+        self.saved_at = -float("inf")
+
+    def due(self) -> bool:
+        """Whether interval has passed since the manifest was last written"""
+        return time.monotonic() - self.saved_at >= self.interval
+
+    def save(self, manifest: Dict):
+        """Atomically replace the manifest"""
+        folder = os.path.dirname(self.path) or "."
+        os.makedirs(folder, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(handle, "w") as file:
+                stamp = {"format": CHECKPOINT_FORMAT, "saved_at": time.time()}
+                json.dump({**stamp, **manifest}, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self.path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        self.saved_at = time.monotonic()
+
+    def remove(self):
+        """Drop the manifest once its batch has completed"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def load_checkpoint(path: str = CHECKPOINT_PATH) -> Optional[Dict]:
+    """The manifest stored at path, or None when there is nothing to resume"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        manifest = json.load(file)
+    if manifest.get("format") != CHECKPOINT_FORMAT:
+        raise ValueError(f"Unsupported checkpoint format in {path}")
+    return manifest
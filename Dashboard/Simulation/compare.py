@@ -0,0 +1,215 @@
+# compare.py
+import argparse
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from aggregation import RunningStats, t_critical
+from main import SimulationCancelled, replicate
+from resultCache import ResultCache
+from resultsStore import METRIC_NAMES, flatten_run_metrics
+from sweep import point_config
+
+
+def _interval(mean: float, half_width: float):
+    if not math.isfinite(half_width):
+        return None
+    return [mean - half_width, mean + half_width]
+
+
+def compare_scenarios(
+    baseline: Dict[str, float],
+    alternative: Dict[str, float],
+    runs: int = 20,
+    sim_time: int = 5000,
+    workers: int = 1,
+    seed: int = None,
+    executor: Executor = None,
+    on_run: Callable[[int, Dict], None] = None,
+    should_stop: Callable[[], bool] = None,
+    cache_dir: str = None,
+    antithetic: bool = False,
+    confidence: float = 0.95,
+) -> Dict:
+    """Paired comparison of two scenarios under common random numbers
+
+    baseline and alternative are parameter settings in sweep notation (e.g.
+    {"failure_probs[3]": 0.05}; {} is the default factory). Replication r of
+    both scenarios draws from the same per-purpose streams, so the difference
+    of their metrics varies far less than the difference of independent runs,
+    and its confidence interval is estimated from the per-replication
+    differences. With antithetic, replications come in antithetic pairs and
+    each pair's average difference is one observation (runs must be even).
+
+    For every metric the result holds both scenario means, the mean
+    difference (alternative - baseline) with its CI, the CI independent runs
+    would have given, and the variance reduction: how many times more runs
+    independent sampling would need for the same CI width.
+    """
+    if antithetic and runs % 2:
+        raise ValueError("Antithetic runs come in pairs; runs must be even")
+
+    entropy = np.random.SeedSequence(seed).entropy
+    configs = [point_config(baseline), point_config(alternative)]
+    cache = ResultCache(cache_dir) if cache_dir else None
+
+    owns_executor = executor is None and workers > 1
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    # Both scenarios of a replication are adjacent, so differences can be
+    # taken as results arrive
+    run_ids = [run for run in range(runs) for _ in configs]
+    results = replicate(
+        run_ids,
+        configs * runs,
+        sim_time,
+        entropy,
+        executor,
+        workers,
+        cache=cache,
+        antithetic=antithetic,
+    )
+
+    per_run = [{name: RunningStats() for name in METRIC_NAMES} for _ in configs]
+    differences = {name: RunningStats() for name in METRIC_NAMES}
+    unit = 2 if antithetic else 1
+    pending = {name: 0.0 for name in METRIC_NAMES}
+    try:
+        for task, run_metrics in enumerate(results):
+            if should_stop is not None and should_stop():
+                raise SimulationCancelled(f"Cancelled after {task} runs")
+
+            run, scenario = divmod(task, len(configs))
+            row = flatten_run_metrics(run_metrics)
+            sign = 1 if scenario else -1
+            for name, value in row.items():
+                per_run[scenario][name].update(value)
+                pending[name] += sign * value / unit
+
+            if scenario and (run + 1) % unit == 0:
+                for name in METRIC_NAMES:
+                    differences[name].update(pending[name])
+                    pending[name] = 0.0
+            if on_run is not None:
+                on_run(task + 1, run_metrics)
+    finally:
+        results.close()
+        if cache is not None:
+            cache.close()
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+    comparison = {}
+    for name in METRIC_NAMES:
+        first, second = per_run[0][name], per_run[1][name]
+        difference = differences[name]
+        # Independent runs: the difference of two means of runs values each
+        independent_variance = first.sample_variance + second.sample_variance
+        independent = t_critical(2 * runs - 2, confidence) * math.sqrt(
+            independent_variance / runs
+        )
+        # Each observation of the paired estimator costs unit runs per scenario
+        paired_variance = difference.sample_variance * unit
+        comparison[name] = {
+            "baseline": first.mean,
+            "alternative": second.mean,
+            "difference": difference.mean,
+            "ci95": _interval(
+                difference.mean, difference.ci_half_width(confidence)
+            ),
+            "independent_ci95": _interval(difference.mean, independent),
+            "variance_reduction": (
+                independent_variance / paired_variance if paired_variance else None
+            ),
+        }
+    return {
+        "baseline": baseline,
+        "alternative": alternative,
+        "runs": runs,
+        "antithetic": antithetic,
+        "observations": differences[METRIC_NAMES[0]].n,
+        "metrics": comparison,
+    }
+
+
+def _parse_setting(spec: str) -> Dict[str, float]:
+    name, _, value = spec.partition("=")
+    return {name: float(value)}
+
+
+def _merge_settings(specs: List[str]) -> Dict[str, float]:
+    settings = {}
+    for spec in specs:
+        settings.update(_parse_setting(spec))
+    return settings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare two factory scenarios with paired replications"
+    )
+    parser.add_argument(
+        "--baseline",
+        action="append",
+        default=[],
+        metavar="PARAM=VALUE",
+        help="baseline setting (repeatable; default: the default factory)",
+    )
+    parser.add_argument(
+        "--alternative",
+        action="append",
+        default=[],
+        metavar="PARAM=VALUE",
+        help='alternative setting, e.g. "failure_probs[3]=0.05" (repeatable)',
+    )
+    parser.add_argument("--runs", type=int, default=20, help="runs per scenario")
+    parser.add_argument("--sim-time", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--cache-dir", default=None, help="reuse replications cached here"
+    )
+    parser.add_argument(
+        "--antithetic",
+        action="store_true",
+        help="run antithetic pairs (--runs must be even)",
+    )
+    parser.add_argument(
+        "--metric",
+        action="append",
+        default=None,
+        help="metric to report (repeatable; default: total production)",
+    )
+    args = parser.parse_args()
+
+    comparison = compare_scenarios(
+        _merge_settings(args.baseline),
+        _merge_settings(args.alternative),
+        runs=args.runs,
+        sim_time=args.sim_time,
+        workers=args.workers,
+        seed=args.seed,
+        cache_dir=args.cache_dir,
+        antithetic=args.antithetic,
+    )
+
+    print(
+        f"\nAlternative - baseline over {args.runs} paired runs "
+        f"({comparison['observations']} observations):"
+    )
+    for name in args.metric or ["Total Production"]:
+        stats = comparison["metrics"][name]
+        print(f"{name}: {stats['baseline']:.3f} -> {stats['alternative']:.3f}")
+        for label, key in (("paired", "ci95"), ("independent", "independent_ci95")):
+            if stats[key] is not None:
+                low, high = stats[key]
+                print(f"  {label} 95% CI of the difference: [{low:.3f}, {high:.3f}]")
+        if stats["variance_reduction"] is not None:
+            print(
+                f"  independent runs would need {stats['variance_reduction']:.1f}x "
+                "as many replications"
+            )
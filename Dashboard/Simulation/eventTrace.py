@@ -0,0 +1,162 @@
+# eventTrace.py
+import struct
+from typing import Optional
+
+import numpy as np
+
+# Header: 8-byte magic (with format version) followed by the record count
+MAGIC = b"LFTRACE1"
+HEADER = struct.Struct("<8sQ")
+HEADER_SIZE = HEADER.size
+
+# Record kinds
+WORK, REPAIR, RESUPPLY, LAPTOP, REJECTED = range(5)
+KIND_NAMES = ("work", "repair", "resupply", "laptop", "rejected")
+
+# Materials named by RESUPPLY records, in LaptopFactory.materials order
+MATERIALS = (
+    "motherboard_circuits",
+    "cpus",
+    "gpus",
+    "ram",
+    "hdd",
+    "m2",
+    "screens",
+    "metal",
+    "plastic",
+    "boxes",
+)
+
+# One fixed-width record per event. Station and material are -1 when they do
+# not apply (laptop records have no station, only resupplies have a material).
+RECORD_DTYPE = np.dtype(
+    [
+        ("laptop", "<u4"),
+        ("station", "<i1"),
+        ("kind", "<u1"),
+        ("material", "<i1"),
+        ("pad", "<u1"),
+        ("request", "<f8"),
+        ("start", "<f8"),
+        ("end", "<f8"),
+    ]
+)
+
+# Records are buffered in memory and copied into the map in blocks
+FLUSH_EVERY = 1024
+
+
+class TraceWriter:
+    """Append-only event trace of one replication in a memory-mapped file
+
+    Records are appended when their event ends, so the file is sorted by end
+    time and readers can binary-search it. The file grows by doubling and
+    the header count is only updated after the records it covers are
+    written, so a concurrent reader never sees a partial record.
+    """
+
+    def __init__(self, path: str, capacity: int = 4096):
+        self.path = path
+        self.count = 0
+        self.buffer = []
+        self.file = open(path, "w+b")
+        self.records = None
+        self._map(capacity)
+        self._write_header()
+
+    def _map(self, capacity: int):
+        # No msync: the shared mapping is already visible to readers through
+        # the page cache, and the kernel writes it back on its own
+        self.records = None
+        self.capacity = capacity
+        self.file.truncate(HEADER_SIZE + capacity * RECORD_DTYPE.itemsize)
+        self.records = np.memmap(
+            self.file,
+            dtype=RECORD_DTYPE,
+            mode="r+",
+            offset=HEADER_SIZE,
+            shape=(capacity,),
+        )
+
+    def _write_header(self):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.count))
+        self.file.flush()
+
+    def append(
+        self,
+        laptop: int,
+        station: int,
+        kind: int,
+        request: float,
+        start: float,
+        end: float,
+        material: int = -1,
+    ):
+        self.buffer.append((laptop, station, kind, material, 0, request, start, end))
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Copy buffered records into the map and publish the new count"""
+        if not self.buffer:
+            return
+        end = self.count + len(self.buffer)
+        if end > self.capacity:
+            self._map(max(2 * self.capacity, end))
+        self.records[self.count : end] = self.buffer
+        self.count = end
+        self.buffer.clear()
+        self._write_header()
+
+    def close(self):
+        self.flush()
+        self.records = None
+        # Drop the unused tail of the last growth step
+        self.file.truncate(HEADER_SIZE + self.count * RECORD_DTYPE.itemsize)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TraceReader:
+    """Read-only view of a trace file; nothing is loaded until it is sliced"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            magic, count = HEADER.unpack(file.read(HEADER_SIZE))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        self.count = count
+        self.records = (
+            np.memmap(
+                path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,)
+            )
+            if count
+            else np.empty(0, dtype=RECORD_DTYPE)
+        )
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def duration(self) -> float:
+        """End time of the last recorded event"""
+        return float(self.records["end"][-1]) if self.count else 0.0
+
+    def between(
+        self, start: float, end: float, kind: Optional[int] = None
+    ) -> np.ndarray:
+        """Records whose event ended in [start, end), optionally of one kind"""
+        ends = self.records["end"]
+        low = np.searchsorted(ends, start, side="left")
+        high = np.searchsorted(ends, end, side="left")
+        records = np.array(self.records[low:high])
+        if kind is not None:
+            records = records[records["kind"] == kind]
+        return records
@@ -0,0 +1,331 @@
+# fastEngine.py
+import argparse
+import math
+from typing import Dict, List
+
+import numpy as np
+
+from resultsStore import TIME_PERCENTILES
+from simulation import DEFAULT_CONFIG
+
+# Model constants, taken from LaptopFactory's default configuration. The
+# engine assumes every station shares one process-time distribution.
+FAILURE_PROBS = np.array(DEFAULT_CONFIG["failure_probs"])
+FAILURE_CHECK_EVERY = 5
+REPAIR_MEAN = float(DEFAULT_CONFIG["repair_mean"])
+PROCESS_TIME = tuple(map(float, DEFAULT_CONFIG["process_times"][0]))
+START_DELAY = tuple(map(float, DEFAULT_CONFIG["start_delay"]))
+RESUPPLY_TIME = tuple(map(float, DEFAULT_CONFIG["resupply_time"]))
+MIN_TIME = 0.1
+REJECTION_RATE = 0.05
+RESUPPLY_AMOUNT = (20, 30)
+COMPONENT_BATCH = 25
+METAL_WEIGHT = 0.6
+INITIAL_STOCK = {
+    "motherboard_circuits": 25,
+    "metal": 15,
+    "plastic": 10,
+    "screens": 25,
+}
+
+# Each station contributes a (resupply, repair, process) segment to a laptop;
+# stations 2-4 run in a shuffled order and the laptop is followed by the delay
+# before the next one starts
+SEGMENTS_PER_STATION = 3
+RESUPPLY, REPAIR, PROCESS = range(SEGMENTS_PER_STATION)
+SEGMENTS = 6 * SEGMENTS_PER_STATION
+
+# Upper bound on array elements held per chunk of replications
+CHUNK_ELEMENTS = 4_000_000
+
+
+def _clamped_normal(rng: np.random.Generator, params, size) -> np.ndarray:
+    return np.maximum(MIN_TIME, rng.normal(params[0], params[1], size))
+
+
+def _refill_mask(
+    rng: np.random.Generator, rows: int, initial: int, uses: int
+) -> np.ndarray:
+    """Mark the uses of a material that find its stock empty
+
+    mask[r, n] is True when the n-th use (1-based) triggers a resupply. The
+    first refill happens on use initial + 1 and each refill of k units (drawn
+    like LaptopFactory's randint) lasts for k more uses.
+    """
+    max_refills = max(1, (uses - initial) // RESUPPLY_AMOUNT[0] + 2)
+    amounts = rng.integers(
+        RESUPPLY_AMOUNT[0], RESUPPLY_AMOUNT[1] + 1, size=(rows, max_refills)
+    )
+    positions = initial + 1 + np.cumsum(amounts, axis=1) - amounts
+    mask = np.zeros((rows, uses + 1), dtype=bool)
+    row, col = np.nonzero(positions <= uses)
+    mask[row, positions[row, col]] = True
+    return mask
+
+
+def _row_percentiles(values: np.ndarray, valid: np.ndarray) -> Dict[int, np.ndarray]:
+    """Per-row TIME_PERCENTILES of the valid entries (0 for empty rows)
+
+    Uses the lower order statistic, like MetricsCollector's quantile sketch.
+    """
+    ordered = np.sort(np.where(valid, values, np.inf), axis=1)
+    counts = valid.sum(axis=1)
+    percentiles = {}
+    for p in TIME_PERCENTILES:
+        rank = np.maximum(0, np.floor(p / 100 * (counts - 1)).astype(int))
+        value = np.take_along_axis(ordered, rank[:, None], axis=1)[:, 0]
+        percentiles[p] = np.where(counts > 0, value, 0.0)
+    return percentiles
+
+
+def _simulate_chunk(
+    rng: np.random.Generator, rows: int, laptops: int, sim_time: float
+) -> Dict[str, np.ndarray]:
+    """Simulate rows replications of up to laptops laptops each"""
+    index = np.arange(1, laptops + 1)
+    shape = (rows, laptops, 6)
+
+    # Resupplies: which laptops find a station's material empty
+    refill = np.zeros(shape, dtype=bool)
+    refill[:, :, 0] = _refill_mask(
+        rng, rows, INITIAL_STOCK["motherboard_circuits"], laptops
+    )[:, 1:]
+    # CPU and GPU stock is regenerated as a batch of 25 by the laptop that
+    # finds it empty, which itself consumes nothing, so refills are periodic
+    refill[:, :, 1] = index % (COMPONENT_BATCH + 1) == 0
+    refill[:, :, 2] = index % (COMPONENT_BATCH + 1) == 0
+    # RAM is refilled once as a plain count and is never checked again
+    refill[:, :, 3] = index == COMPONENT_BATCH + 1
+    refill[:, :, 5] = _refill_mask(rng, rows, INITIAL_STOCK["screens"], laptops)[
+        :, 1:
+    ]
+
+    # The case uses metal or plastic, each with its own stock
+    is_metal = rng.random((rows, laptops)) < METAL_WEIGHT
+    for material, chosen in (("metal", is_metal), ("plastic", ~is_metal)):
+        uses = np.cumsum(chosen, axis=1)
+        mask = _refill_mask(rng, rows, INITIAL_STOCK[material], laptops)
+        refill[:, :, 4] |= chosen & np.take_along_axis(mask, uses, axis=1)
+
+    durations = np.empty((rows, laptops, 6, SEGMENTS_PER_STATION))
+    durations[..., RESUPPLY] = _clamped_normal(rng, RESUPPLY_TIME, shape) * refill
+
+    # Each station checks for failure on every fifth product
+    checked = (index % FAILURE_CHECK_EVERY == 0)[None, :, None]
+    failed = checked & (rng.random(shape) < FAILURE_PROBS)
+    durations[..., REPAIR] = rng.exponential(REPAIR_MEAN, shape) * failed
+
+    durations[..., PROCESS] = _clamped_normal(rng, PROCESS_TIME, shape)
+    delay = _clamped_normal(rng, START_DELAY, (rows, laptops))
+
+    # Laptops run back to back, so start times are one cumulative sum
+    busy = durations.sum(axis=(2, 3))
+    cycle_ends = np.cumsum(busy + delay, axis=1)
+    laptop_starts = cycle_ends - busy - delay
+
+    # Laptops whose whole cycle fits in the horizon count in full; the one in
+    # progress at sim_time is resolved segment by segment below. Rows that
+    # never reach sim_time are discarded by the caller.
+    full_count = (cycle_ends <= sim_time).sum(axis=1)
+    reached_end = full_count < laptops
+    full = index[None, :] <= full_count[:, None]
+    current = np.minimum(full_count, laptops - 1)
+    rows_index = np.arange(rows)
+    partial = durations[rows_index, current]
+
+    # Only the order of the in-progress laptop matters: shuffle CPU/GPU/RAM
+    order = np.argsort(rng.random((rows, 3)), axis=1) + 1
+    station_order = np.concatenate(
+        [np.zeros((rows, 1), dtype=int), order, np.full((rows, 2), [4, 5])], axis=1
+    )
+    timeline = np.take_along_axis(partial, station_order[..., None], axis=1)
+    segment_ends = laptop_starts[rows_index, current][:, None] + np.cumsum(
+        timeline.reshape(rows, -1), axis=1
+    )
+    # Back to station order for per-station accounting
+    inverse = np.argsort(station_order, axis=1)
+    partial_ends = np.take_along_axis(
+        segment_ends.reshape(rows, 6, SEGMENTS_PER_STATION),
+        inverse[..., None],
+        axis=1,
+    )
+    partial_starts = partial_ends - partial
+
+    # Work and supply time are recorded when their timeout completes; repairs
+    # are recorded as soon as the failure is detected
+    worked = partial_ends[..., PROCESS] <= sim_time
+    supplied = partial_ends[..., RESUPPLY] <= sim_time
+    repaired = failed & full[..., None]
+    repaired[rows_index, current] |= failed[rows_index, current] & (
+        partial_starts[..., REPAIR] < sim_time
+    )
+
+    completed = full.copy()
+    completed[rows_index, current] |= worked[:, 5]
+    faulty = completed & (rng.random((rows, laptops)) < REJECTION_RATE)
+
+    full_durations = durations * full[..., None, None]
+    production_percentiles = _row_percentiles(busy, completed)
+    fixing_percentiles = _row_percentiles(
+        durations[..., REPAIR].reshape(rows, -1), repaired.reshape(rows, -1)
+    )
+    return {
+        "reached_end": reached_end,
+        "completed": completed.sum(axis=1),
+        "faulty": faulty.sum(axis=1),
+        "work": full_durations[..., PROCESS].sum(axis=1)
+        + partial[..., PROCESS] * worked,
+        "downtime": (durations[..., REPAIR] * repaired).sum(axis=1),
+        "repairs": repaired.sum(axis=(1, 2)),
+        "supply": full_durations[..., RESUPPLY].sum(axis=(1, 2))
+        + (partial[..., RESUPPLY] * supplied).sum(axis=1),
+        # A laptop's production time is its busy time (resupply, repair, work)
+        "production_time": (busy * completed).sum(axis=1),
+        "production_percentiles": production_percentiles,
+        "fixing_percentiles": fixing_percentiles,
+    }
+
+
+def _run_metrics(chunk: Dict[str, np.ndarray], row: int, sim_time: float) -> Dict:
+    """Build the same dictionary as MetricsCollector.get_metrics"""
+    completed = int(chunk["completed"][row])
+    faulty = int(chunk["faulty"][row])
+    production = completed - faulty
+    downtimes = chunk["downtime"][row]
+    repairs = int(chunk["repairs"][row])
+
+    time_metrics = {
+        "avg_production_time": (
+            chunk["production_time"][row] / completed if completed else 0
+        ),
+        "avg_fixing_time": downtimes.sum() / repairs if repairs else 0,
+        "supplier_occupancy": chunk["supply"][row] / sim_time,
+    }
+    for p in TIME_PERCENTILES:
+        time_metrics[f"production_time_p{p}"] = chunk["production_percentiles"][p][row]
+        time_metrics[f"fixing_time_p{p}"] = chunk["fixing_percentiles"][p][row]
+
+    return {
+        "production": {
+            "total": production,
+            "faulty": faulty,
+            "faulty_rate": faulty / completed if production > 0 else 0,
+        },
+        "station_metrics": {
+            "occupancy_rates": (chunk["work"][row] / sim_time).tolist(),
+            # Only one laptop is ever in the line, so stations never queue
+            "wait_times": [0.0] * 6,
+            "downtimes": downtimes.tolist(),
+        },
+        "time_metrics": time_metrics,
+        "material_metrics": {
+            "materials_used": {
+                "motherboard_circuits": 0,
+                "cpus": {"intel": 0, "amd": 0},
+                "gpus": {"nvidia": 0, "amd": 0, "intel": 0},
+                "ram": {"8GB": 0, "16GB": 0, "32GB": 0},
+                "hdd": 0,
+                "m2": 0,
+                "screens": 0,
+                "metal": 0,
+                "plastic": 0,
+                "boxes": 0,
+            },
+            "resupply_counts": {
+                material: 0
+                for material in [
+                    "motherboard_circuits",
+                    "cpus",
+                    "gpus",
+                    "ram",
+                    "hdd",
+                    "m2",
+                    "screens",
+                    "metal",
+                    "plastic",
+                    "boxes",
+                ]
+            },
+        },
+    }
+
+
+def simulate_batch(runs: int, sim_time: float, seed: int = None) -> List[Dict]:
+    """Simulate many replications at once as NumPy arrays
+
+    The factory starts a laptop only after the previous one is finished, so
+    every station sees at most one job and the line reduces to cumulative
+    sums over per-laptop segment durations. Returns one get_metrics
+    dictionary per replication, in run order.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Size the arrays from the mean laptop cycle (six stations plus the start
+    # delay) with a wide margin, and grow them if a run falls short
+    mean_cycle = 7 * PROCESS_TIME[0]
+    laptops = int(sim_time / mean_cycle * 1.2) + 20
+
+    results = []
+    done = 0
+    while done < runs:
+        rows = max(1, min(runs - done, CHUNK_ELEMENTS // (laptops * SEGMENTS)))
+        chunk = _simulate_chunk(rng, rows, laptops, sim_time)
+        if not chunk["reached_end"].all():
+            laptops *= 2
+            continue
+        results.extend(_run_metrics(chunk, row, sim_time) for row in range(rows))
+        done += rows
+    return results
+
+
+def validate_against_simpy(
+    runs: int = 200, sim_time: int = 5000, seed: int = 0, threshold: float = 4.0
+) -> Dict:
+    """Compare every per-run metric of both engines with a Welch t-test"""
+    from main import run_replication
+    from resultsStore import METRIC_NAMES, flatten_run_metrics
+
+    entropy = np.random.SeedSequence(seed).entropy
+    simpy_rows = [
+        flatten_run_metrics(run_replication(run, sim_time, entropy))
+        for run in range(runs)
+    ]
+    numpy_rows = [flatten_run_metrics(m) for m in simulate_batch(runs, sim_time, seed)]
+
+    report = {}
+    for name in METRIC_NAMES:
+        a = np.array([row[name] for row in simpy_rows])
+        b = np.array([row[name] for row in numpy_rows])
+        standard_error = math.sqrt(a.var(ddof=1) / runs + b.var(ddof=1) / runs)
+        if standard_error > 0:
+            t = (a.mean() - b.mean()) / standard_error
+        else:
+            t = 0.0 if a.mean() == b.mean() else math.inf
+        report[name] = {
+            "simpy_mean": float(a.mean()),
+            "numpy_mean": float(b.mean()),
+            "t": float(t),
+            "ok": abs(t) < threshold,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Validate the NumPy engine against the SimPy model"
+    )
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--sim-time", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = validate_against_simpy(args.runs, args.sim_time, args.seed)
+    print(f"{'Metric':<28}{'SimPy':>12}{'NumPy':>12}{'t':>8}")
+    for name, row in report.items():
+        flag = "" if row["ok"] else "  <-- differs"
+        print(
+            f"{name:<28}{row['simpy_mean']:>12.4f}{row['numpy_mean']:>12.4f}"
+            f"{row['t']:>8.2f}{flag}"
+        )
+    failures = sum(not row["ok"] for row in report.values())
+    print(f"\n{len(report) - failures}/{len(report)} metrics agree")
@@ -0,0 +1,188 @@
+# instrumentation.py
+import contextlib
+import time
+from typing import Dict, Generator, Iterable, Iterator
+
+import simpy
+
+
+_UNTIMED = contextlib.nullcontext()
+
+
+def untimed(name: str) -> contextlib.AbstractContextManager:
+    """Stand-in for BatchProfile.phase when profiling is off"""
+    return _UNTIMED
+
+
+class MethodStats:
+    """Call count and execution time of one generator method"""
+
+    __slots__ = ("calls", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+
+class InstrumentedEnvironment(simpy.Environment):
+    """SimPy environment that counts events and processes and times generators
+
+    Every process started through env.process is wrapped so that the wall
+    time spent inside its generator, between being resumed and yielding its
+    next event, is added to the generator method's total. Time spent in child
+    processes is counted for the child, so each method's time is its own.
+    A plain simpy.Environment runs the same model with no instrumentation
+    cost at all. With time_methods=False only the counters are kept.
+    """
+
+    def __init__(self, initial_time: float = 0, time_methods: bool = True):
+        super().__init__(initial_time)
+        self.time_methods = time_methods
+        self.events_processed = 0
+        self.events_scheduled = 0
+        self.processes: Dict[str, int] = {}
+        self.methods: Dict[str, MethodStats] = {}
+
+    def step(self):
+        self.events_processed += 1
+        super().step()
+
+    def schedule(self, event, priority=simpy.core.NORMAL, delay=0):
+        self.events_scheduled += 1
+        super().schedule(event, priority, delay)
+
+    def process(self, generator: Generator) -> simpy.Process:
+        name = generator.__qualname__
+        self.processes[name] = self.processes.get(name, 0) + 1
+        if self.time_methods:
+            stats = self.methods.get(name)
+            if stats is None:
+                stats = self.methods[name] = MethodStats()
+            generator = self._timed(generator, stats)
+        return simpy.Process(self, generator)
+
+    @staticmethod
+    def _timed(generator: Generator, stats: MethodStats) -> Generator:
+        # Forwards sent values and thrown exceptions (e.g. simpy.Interrupt)
+        # exactly as SimPy would deliver them to the generator itself
+        stats.calls += 1
+        clock = time.perf_counter
+        value, error = None, None
+        while True:
+            start = clock()
+            try:
+                if error is None:
+                    event = generator.send(value)
+                else:
+                    event = generator.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                stats.seconds += clock() - start
+            try:
+                value, error = (yield event), None
+            except GeneratorExit:
+                generator.close()
+                raise
+            except BaseException as exc:
+                value, error = None, exc
+
+    def report(self) -> Dict:
+        """Counters and method timings of everything run so far"""
+        return {
+            "events_processed": self.events_processed,
+            "events_scheduled": self.events_scheduled,
+            "processes": dict(self.processes),
+            "methods": {
+                name: {"calls": stats.calls, "seconds": stats.seconds}
+                for name, stats in self.methods.items()
+            },
+        }
+
+
+class BatchProfile:
+    """Phase timings of a batch plus the merged reports of its replications"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.replications = 0
+        self.replication_seconds = 0.0
+        self.events_processed = 0
+        self.events_scheduled = 0
+        self.processes: Dict[str, int] = {}
+        self.methods: Dict[str, MethodStats] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def timed(self, name: str, items: Iterable) -> Iterator:
+        """Iterate over items, counting the wait for each one as phase name"""
+        iterator = iter(items)
+        try:
+            while True:
+                with self.phase(name):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+        finally:
+            # Closing this iterator closes (and so cancels) the wrapped one
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def add_replication(self, report: Dict):
+        """Merge one replication's InstrumentedEnvironment report"""
+        self.replications += 1
+        self.replication_seconds += report["wall_seconds"]
+        self.events_processed += report["events_processed"]
+        self.events_scheduled += report["events_scheduled"]
+        for name, count in report["processes"].items():
+            self.processes[name] = self.processes.get(name, 0) + count
+        for name, method in report["methods"].items():
+            stats = self.methods.setdefault(name, MethodStats())
+            stats.calls += method["calls"]
+            stats.seconds += method["seconds"]
+
+    def report(self, **batch) -> Dict:
+        """JSON-serializable profile; batch holds extra batch-level fields"""
+        wall = time.perf_counter() - self.started
+        methods = sorted(
+            self.methods.items(), key=lambda item: item[1].seconds, reverse=True
+        )
+        return {
+            "batch": {"wall_seconds": wall, "phases": dict(self.phases), **batch},
+            "replications": {
+                "count": self.replications,
+                "wall_seconds": self.replication_seconds,
+                "events_processed": self.events_processed,
+                "events_scheduled": self.events_scheduled,
+                "events_per_second": (
+                    self.events_processed / self.replication_seconds
+                    if self.replication_seconds
+                    else 0.0
+                ),
+                "processes": self.processes,
+            },
+            # Own time of every generator method, most expensive first
+            "methods": {
+                name: {
+                    "calls": stats.calls,
+                    "seconds": stats.seconds,
+                    "mean_us": stats.seconds / stats.calls * 1e6,
+                    "share": (
+                        stats.seconds / self.replication_seconds
+                        if self.replication_seconds
+                        else 0.0
+                    ),
+                }
+                for name, stats in methods
+            },
+        }
@@ -1,139 +1,798 @@
 # main.py
+import argparse
+import cProfile
+import glob
+import json
+import math
 import os
-import random
-from typing import Dict, List
+import pstats
+import shutil
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Dict, Iterable, Iterator, List
 
 import numpy as np
 import simpy
 
+from aggregation import MetricsAggregator
+from batchHistory import HISTORY_DB, HistoryWriter
+from checkpoint import CHECKPOINT_PATH, Checkpoint, load_checkpoint
+from eventTrace import TraceWriter
+from fastEngine import simulate_batch
+from instrumentation import BatchProfile, InstrumentedEnvironment, untimed
 from metrics import MetricsCollector
-from saveSimulation import *
+from resultCache import ResultCache
+from resultsStore import (
+    RESULTS_DB,
+    TIME_PERCENTILES,
+    ResultsWriter,
+    flatten_run_metrics,
+)
+from saveSimulation import render_graphs_in_background
 from simulation import LaptopFactory
+from steadyState import SnapshotRecorder, batch_means, truncated_metrics
+from variates import VariateSupply
 
 
-def run_simulation(sim_time: int = 5000, runs: int = 100) -> Dict:
-    """Run multiple simulation instances and collect results"""
-    all_metrics = []
+def replication_rng(
+    entropy: int, run: int, antithetic: bool = False
+) -> VariateSupply:
+    """Build the independent random stream for one replication
 
-    for run in range(runs):
-        # Initialize simulation environment
-        env = simpy.Environment()
-        metrics = MetricsCollector()
-        factory = LaptopFactory(env, metrics)
+    With antithetic, runs 2k and 2k + 1 form a pair: both use the seed of
+    pair k and the odd run mirrors every draw of the even one.
+    """
+    # Each run gets its own child of the batch seed, so the stream depends only
+    # on (entropy, run) and never on which worker executes it
+    if antithetic:
+        seed_seq = np.random.SeedSequence(entropy, spawn_key=(run // 2,))
+        return VariateSupply(seed_seq, antithetic=run % 2 == 1)
+    seed_seq = np.random.SeedSequence(entropy, spawn_key=(run,))
+    return VariateSupply(seed_seq)
 
-        # Run simulation
+
+def trace_path(trace_dir: str, run: int) -> str:
+    """Trace file of a replication (run numbers are 0-based here)"""
+    return os.path.join(trace_dir, f"run_{run + 1}.trace")
+
+
+def run_replication(
+    run: int,
+    sim_time: int,
+    entropy: int,
+    trace_dir: str = None,
+    config: Dict = None,
+    antithetic: bool = False,
+    profile: bool = False,
+    cprofile_dir: str = None,
+    warmup: bool = False,
+) -> Dict:
+    """Run a single simulation replication and return its metrics
+
+    config overrides entries of simulation.DEFAULT_CONFIG. With profile, the
+    metrics carry an extra "profile" entry with the replication's event and
+    process counts and generator method timings. With cprofile_dir, the run
+    is profiled with cProfile and its stats are written there. With warmup,
+    the MSER-5 warm-up period is cut from the metrics (see steadyState).
+    """
+    # Initialize simulation environment
+    env = InstrumentedEnvironment() if profile else simpy.Environment()
+    metrics = MetricsCollector(keep_samples=warmup)
+    trace = TraceWriter(trace_path(trace_dir, run)) if trace_dir else None
+    rng = replication_rng(entropy, run, antithetic)
+    factory = LaptopFactory(env, metrics, rng=rng, trace=trace, config=config)
+    recorder = SnapshotRecorder(env, metrics) if warmup else None
+
+    # Run simulation
+    profiler = cProfile.Profile() if cprofile_dir else None
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
         env.run(until=sim_time)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            handle, stats_path = tempfile.mkstemp(suffix=".prof", dir=cprofile_dir)
+            os.close(handle)
+            profiler.dump_stats(stats_path)
+        if trace is not None:
+            trace.close()
+    wall = time.perf_counter() - start
 
-        # Collect metrics
+    # Collect metrics
+    if recorder is not None:
+        run_metrics = truncated_metrics(metrics, recorder, sim_time)
+    else:
         run_metrics = metrics.get_metrics(sim_time)
-        all_metrics.append(run_metrics)
+    if profile:
+        run_metrics["profile"] = {**env.report(), "wall_seconds": wall}
+    return run_metrics
+
+
+def replicate(
+    runs: List[int],
+    configs: List[Dict],
+    sim_time: int,
+    entropy: int,
+    executor: Executor = None,
+    workers: int = 1,
+    trace_dir: str = None,
+    cache: ResultCache = None,
+    antithetic: bool = False,
+    profile: bool = False,
+    cprofile_dir: str = None,
+    warmup: bool = False,
+) -> Iterator[Dict]:
+    """Yield the metrics of each (run, config) task, in task order
+
+    Tasks found in the cache are not simulated again (their traces are
+    restored when trace_dir is set); the rest run on the executor, if any, and
+    are added to the cache as they arrive. profile, cprofile_dir and warmup
+    are passed on to run_replication.
+    """
+    keys = [None] * len(runs)
+    cached = {}
+    if cache is not None:
+        keys = [
+            cache.key(config, sim_time, run, entropy, antithetic, warmup)
+            for run, config in zip(runs, configs)
+        ]
+        cached = cache.get_many(keys, with_trace=bool(trace_dir))
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    if cached:
+        print(f"{len(cached)} of {len(runs)} runs found in the result cache")
+
+    if executor is not None:
+        # Hand out runs in chunks so IPC overhead stays small for short runs
+        chunksize = max(1, len(missing) // (max(workers, 1) * 4))
+        computed = executor.map(
+            run_replication,
+            [runs[i] for i in missing],
+            repeat(sim_time),
+            repeat(entropy),
+            repeat(trace_dir),
+            [configs[i] for i in missing],
+            repeat(antithetic),
+            repeat(profile),
+            repeat(cprofile_dir),
+            repeat(warmup),
+            chunksize=chunksize,
+        )
+    else:
+        computed = (
+            run_replication(
+                runs[i],
+                sim_time,
+                entropy,
+                trace_dir,
+                configs[i],
+                antithetic,
+                profile,
+                cprofile_dir,
+                warmup,
+            )
+            for i in missing
+        )
+    computed = iter(computed)
+
+    try:
+        for run, key in zip(runs, keys):
+            if key in cached:
+                if trace_dir:
+                    cache.restore_trace(key, trace_path(trace_dir, run))
+                yield cached[key]
+                continue
+
+            run_metrics = next(computed)
+            if cache is not None:
+                trace = trace_path(trace_dir, run) if trace_dir else None
+                cache.put(key, run_metrics, trace)
+            yield run_metrics
+    finally:
+        # Cancels replications that have not started yet
+        if hasattr(computed, "close"):
+            computed.close()
+
+
+# Metrics checked by sequential sampling unless others are requested
+PRECISION_METRICS = ["Total Production"] + [
+    f"Station {i} Occupancy Rate" for i in range(1, 7)
+]
+
+
+class SimulationCancelled(Exception):
+    """Raised when a batch is stopped before all replications finish"""
+
+
+def run_simulation(
+    sim_time: int = 5000,
+    runs: int = 100,
+    workers: int = 1,
+    seed: int = None,
+    executor: Executor = None,
+    on_run: Callable[[int, Dict], None] = None,
+    should_stop: Callable[[], bool] = None,
+    results_path: str = RESULTS_DB,
+    engine: str = "simpy",
+    trace_dir: str = None,
+    cache_dir: str = None,
+    precision: float = None,
+    precision_metrics: List[str] = None,
+    min_runs: int = 10,
+    wave_size: int = None,
+    antithetic: bool = False,
+    profile: bool = False,
+    cprofile_path: str = None,
+    render_graphs: bool = False,
+    history_path: str = HISTORY_DB,
+    warmup: bool = False,
+    checkpoint_path: str = None,
+    resume: bool = False,
+) -> Dict:
+    """Run multiple simulation instances and collect results
+
+    With workers > 1 each replication runs in its own process. Every run draws
+    from a stream derived from the batch seed and its run index, so results are
+    identical whatever the worker count. A long-lived executor can be passed in
+    to reuse warm worker processes across batches. engine="numpy" computes the
+    whole batch at once with the vectorized fast-path engine instead.
+    trace_dir, if given, receives one event trace file per run (SimPy only).
+    With cache_dir, SimPy replications already computed for the same model,
+    configuration, sim_time, run and seed are read back instead of rerun.
+
+    With precision (e.g. 0.01 for 1%), runs becomes a cap: replications are
+    launched in waves and the batch stops after the first wave, at or past
+    min_runs, where the 95% CI half-width of every precision_metrics mean is
+    within precision of the mean. The result reports the runs used.
+
+    With antithetic (SimPy only), runs are antithetic pairs: the second run
+    of each pair mirrors the random draws of the first. The two runs are not
+    independent, so confidence intervals (and the precision check) are built
+    from the pair averages and reported under "antithetic".
 
-        # Save individual run results
-        os.makedirs("./Results", exist_ok=True)
-        save_single_run_metrics_to_csv(run_metrics, f"./Results/single_run_{run+1}.csv")
-        # save_single_run_metrics_to_graph(run_metrics, f"./Results/", {run + 1})
+    With profile, the result gets a "profile" report: wall time per batch
+    phase, and the event and process counts and per-generator-method times of
+    all replications (bypassing the result cache). cprofile_path receives
+    cProfile stats of the batch, including every worker's replications.
+    Neither costs anything when off.
 
+    With render_graphs, the summary charts are drawn on a background thread
+    once the batch is stored; matplotlib is not even imported otherwise.
+
+    With warmup (SimPy only), every replication drops its MSER-5 warm-up
+    period; extensive metrics are rescaled to sim_time (see steadyState).
+
+    Besides the results table, which holds only this batch, the batch is
+    recorded with its parameters, seed, runs and aggregates in the batch
+    history at history_path (None to skip), under the same batch id.
+
+    With checkpoint_path (SimPy only), a progress manifest (see checkpoint)
+    is kept there while the batch runs and removed once it completes. With
+    resume, the batch recorded in that manifest is continued instead: its
+    parameters and seed replace the ones passed in, only the runs after its
+    last checkpoint are simulated, and the results are identical to those of
+    an uninterrupted batch. Once a later batch has replaced its results, it
+    can no longer be resumed and its manifest is discarded.
+    """
+    manifest = None
+    if resume:
+        manifest = load_checkpoint(checkpoint_path or CHECKPOINT_PATH)
+        if manifest is None:
+            raise ValueError("There is no interrupted batch to resume")
+        checkpoint_path = checkpoint_path or CHECKPOINT_PATH
+        params = manifest["params"]
+        sim_time, runs, engine = params["sim_time"], params["runs"], "simpy"
+        precision = params["precision"]
+        precision_metrics = params["precision_metrics"]
+        min_runs, wave_size = params["min_runs"], params["wave_size"]
+        antithetic, warmup = params["antithetic"], params["warmup"]
         print(
-            f"Run {run + 1} completed: Produced {run_metrics['production']['total']} laptops "
-            f"({run_metrics['production']['faulty']} faulty)"
+            f"Resuming batch {manifest['batch_id']} after "
+            f"{manifest['completed']} of {runs} runs"
         )
+    start = manifest["completed"] if manifest else 0
 
-    return analyze_results(all_metrics)
+    if trace_dir:
+        # Traces of the previous batch would no longer match the results; a
+        # resumed batch keeps those of its completed runs
+        os.makedirs(trace_dir, exist_ok=True)
+        if manifest is None:
+            for stale in glob.glob(os.path.join(trace_dir, "run_*.trace")):
+                os.remove(stale)
+        if engine != "simpy":
+            print("Event traces are only recorded by the SimPy engine")
+            trace_dir = None
 
+    if checkpoint_path and engine != "simpy":
+        print("Checkpoints are only written for the SimPy engine")
+        checkpoint_path = None
+    if warmup and engine != "simpy":
+        print("Warm-up truncation is only done by the SimPy engine")
+        warmup = False
+    if antithetic and engine != "simpy":
+        print("Antithetic pairs are only drawn by the SimPy engine")
+        antithetic = False
+    if antithetic and runs % 2:
+        raise ValueError("Antithetic runs come in pairs; runs must be even")
 
-def analyze_results(metrics_list: List[Dict]) -> Dict:
-    """Analyze metrics from multiple runs"""
-    # Initialize aggregation structure
-    aggregated = {
-        "production": {"total": [], "faulty": [], "faulty_rate": []},
-        "station_metrics": {
-            "occupancy_rates": [[] for _ in range(6)],
-            "wait_times": [[] for _ in range(6)],
-            "downtimes": [[] for _ in range(6)],
-        },
-        "time_metrics": {
-            "avg_production_time": [],
-            "avg_fixing_time": [],
-            "supplier_occupancy": [],
-        },
-    }
+    entropy = np.random.SeedSequence(seed).entropy
+    aggregator = MetricsAggregator()
+    # Averages of antithetic pairs, the independent observations of the batch
+    pairs = MetricsAggregator()
+    # First run of a pair whose second run has not finished yet
+    first = None
+    batch_id = None
+    if manifest is not None:
+        entropy = manifest["entropy"]
+        aggregator = MetricsAggregator.from_state(manifest["aggregator"])
+        pairs = MetricsAggregator.from_state(manifest["pairs"])
+        first = manifest["pair_first"]
+        batch_id = manifest["batch_id"]
+    estimates = pairs if antithetic else aggregator
 
-    # Aggregate metrics from all runs
-    for metrics in metrics_list:
-        # Production metrics
-        aggregated["production"]["total"].append(metrics["production"]["total"])
-        aggregated["production"]["faulty"].append(metrics["production"]["faulty"])
-        aggregated["production"]["faulty_rate"].append(
-            metrics["production"]["faulty_rate"]
+    # Runs are appended to the batch's results table as they finish
+    try:
+        writer = ResultsWriter(results_path, batch_id, start if manifest else None)
+    except ValueError:
+        # The manifest's results are gone, so there is nothing left to resume
+        Checkpoint(checkpoint_path).remove()
+        raise
+    history = None
+    if history_path:
+        history = HistoryWriter(
+            writer.batch_id,
+            {
+                "sim_time": sim_time,
+                "runs": runs,
+                "engine": engine,
+                "precision": precision,
+                "antithetic": antithetic,
+                "warmup": warmup,
+            },
+            entropy,
+            history_path,
+            start if manifest else None,
         )
+    status = "failed"
 
-        # Station metrics
-        for i in range(6):
-            aggregated["station_metrics"]["occupancy_rates"][i].append(
-                metrics["station_metrics"]["occupancy_rates"][i]
-            )
-            aggregated["station_metrics"]["wait_times"][i].append(
-                metrics["station_metrics"]["wait_times"][i]
-            )
-            aggregated["station_metrics"]["downtimes"][i].append(
-                metrics["station_metrics"]["downtimes"][i]
+    owns_executor = engine == "simpy" and executor is None and workers > 1
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    cache = ResultCache(cache_dir) if cache_dir and engine == "simpy" else None
+
+    profiler = BatchProfile() if profile else None
+    phase = profiler.phase if profiler is not None else untimed
+    if profile and cache is not None:
+        # Cached runs would not be profiled
+        cache.close()
+        cache = None
+
+    # Replications in worker processes write their own stats, merged below
+    main_cprofile = cProfile.Profile() if cprofile_path else None
+    cprofile_dir = None
+    if main_cprofile is not None and executor is not None:
+        cprofile_dir = tempfile.mkdtemp(prefix="cprofile-")
+
+    if precision is not None:
+        precision_metrics = precision_metrics or PRECISION_METRICS
+        wave_size = wave_size or max(min_runs, 2 * max(workers, 1))
+        if antithetic:
+            wave_size += wave_size % 2
+
+    checkpoint = Checkpoint(checkpoint_path) if checkpoint_path else None
+    completed = start
+    batch_params = {
+        "sim_time": sim_time,
+        "runs": runs,
+        "precision": precision,
+        "precision_metrics": precision_metrics,
+        "min_runs": min_runs,
+        "wave_size": wave_size,
+        "antithetic": antithetic,
+        "warmup": warmup,
+    }
+
+    def progress() -> Dict:
+        # Everything needed to continue exactly after the completed runs
+        return {
+            "batch_id": writer.batch_id,
+            "entropy": entropy,
+            "params": batch_params,
+            "completed": completed,
+            "aggregator": aggregator.state(),
+            "pairs": pairs.state(),
+            "pair_first": first if antithetic and completed % 2 else None,
+        }
+
+    def waves():
+        # Each wave is dispatched whole to the pool; the loop below has
+        # aggregated every run of the previous wave before the next starts.
+        # Wave boundaries fall on multiples of wave_size, so a resumed batch
+        # checks for convergence exactly where an uninterrupted one would
+        done = start
+        while done < runs:
+            if (
+                precision is not None
+                and done >= min_runs
+                and done % wave_size == 0
+                and estimates.converged(precision_metrics, precision)
+            ):
+                return
+            size = runs - done
+            if precision is not None:
+                size = min(wave_size - done % wave_size, size)
+            if engine == "numpy":
+                # Later waves draw from their own child of the batch seed
+                wave_seed = entropy
+                if done:
+                    wave_seed = np.random.SeedSequence(entropy, spawn_key=(done,))
+                yield from simulate_batch(size, sim_time, wave_seed)
+            else:
+                yield from replicate(
+                    list(range(done, done + size)),
+                    [None] * size,
+                    sim_time,
+                    entropy,
+                    executor,
+                    workers,
+                    trace_dir,
+                    cache,
+                    antithetic,
+                    profile,
+                    cprofile_dir,
+                    warmup,
+                )
+            done += size
+
+    results = waves()
+    if profiler is not None:
+        results = profiler.timed("simulate", results)
+
+    if main_cprofile is not None:
+        main_cprofile.enable()
+    try:
+        # Results arrive in run order regardless of which worker finished first
+        for run, run_metrics in enumerate(results, start):
+            if should_stop is not None and should_stop():
+                raise SimulationCancelled(f"Cancelled after {run} runs")
+
+            if profiler is not None and "profile" in run_metrics:
+                profiler.add_replication(run_metrics.pop("profile"))
+
+            with phase("aggregate"):
+                aggregator.update(run_metrics)
+                if antithetic:
+                    row = flatten_run_metrics(run_metrics)
+                    if run % 2:
+                        pairs.update_row(
+                            {name: (first[name] + row[name]) / 2 for name in row}
+                        )
+                    first = row
+
+            # Save individual run results
+            with phase("store"):
+                writer.append(run + 1, run_metrics)
+                if history is not None:
+                    history.append(run + 1, run_metrics)
+            # save_single_run_metrics_to_graph(run_metrics, f"./Results/", {run + 1})
+
+            # Warm-up truncation rescales counts, which are then fractional
+            production = run_metrics["production"]
+            print(
+                f"Run {run + 1} completed: Produced {production['total']:.0f} laptops "
+                f"({production['faulty']:.0f} faulty)"
             )
+            completed = run + 1
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save(progress())
+            if on_run is not None:
+                on_run(run + 1, run_metrics)
+        status = "completed"
+        if checkpoint is not None:
+            checkpoint.remove()
+    except SimulationCancelled:
+        status = "cancelled"
+        # Raised between runs, so the state matches the completed runs
+        if checkpoint is not None:
+            checkpoint.save(progress())
+        raise
+    finally:
+        if main_cprofile is not None:
+            main_cprofile.disable()
+        writer.close()
+        if history is not None:
+            history.finish(status)
+            history.close()
+        # Closing the iterator cancels replications that have not started yet
+        if hasattr(results, "close"):
+            results.close()
+        if cache is not None:
+            cache.close()
+        if owns_executor:
+            executor.shutdown()
 
-        # Time metrics
-        aggregated["time_metrics"]["avg_production_time"].append(
-            metrics["time_metrics"]["avg_production_time"]
-        )
-        aggregated["time_metrics"]["avg_fixing_time"].append(
-            metrics["time_metrics"]["avg_fixing_time"]
+    print(f"Batch seed: {entropy}")
+    with phase("summarize"):
+        if main_cprofile is not None:
+            results = main_cprofile.runcall(summarize_results, aggregator)
+        else:
+            results = summarize_results(aggregator)
+    results["batch_id"] = writer.batch_id
+    if main_cprofile is not None:
+        stats = pstats.Stats(main_cprofile)
+        if cprofile_dir is not None:
+            for worker_stats in glob.glob(os.path.join(cprofile_dir, "*.prof")):
+                stats.add(worker_stats)
+            shutil.rmtree(cprofile_dir, ignore_errors=True)
+        stats.dump_stats(cprofile_path)
+        print(f"cProfile stats written to {cprofile_path}")
+    if antithetic:
+        results["antithetic"] = {
+            "pairs": pairs.runs,
+            "statistics": {
+                name: {"mean": stats["mean"], "ci95": stats["ci95"]}
+                for name, stats in pairs.summary().items()
+            },
+        }
+    if precision is not None:
+        results["precision"] = {
+            "target": precision,
+            "converged": estimates.converged(precision_metrics, precision),
+            "relative_half_widths": {
+                name: estimates.relative_half_width(name)
+                for name in precision_metrics
+            },
+        }
+        outcome = "target met" if results["precision"]["converged"] else "cap reached"
+        print(
+            f"Sequential sampling used {aggregator.runs} of at most {runs} runs "
+            f"({outcome})"
         )
-        aggregated["time_metrics"]["supplier_occupancy"].append(
-            metrics["time_metrics"]["supplier_occupancy"]
+    if profiler is not None:
+        results["profile"] = profiler.report(
+            runs=aggregator.runs, workers=workers, engine=engine
         )
+    if render_graphs:
+        render_graphs_in_background(results)
+    return results
+
+
+def analyze_results(metrics_list: Iterable[Dict]) -> Dict:
+    """Analyze metrics from multiple runs"""
+    aggregator = MetricsAggregator()
+    for metrics in metrics_list:
+        aggregator.update(metrics)
+    return summarize_results(aggregator)
+
+
+def summarize_results(aggregator: MetricsAggregator) -> Dict:
+    """Build the batch results from the streaming aggregates"""
+    mean = aggregator.mean
+    stations = range(1, 7)
 
     # Calculate final statistics
     results = {
         "production": {
-            "avg_total": np.mean(aggregated["production"]["total"]),
-            "std_total": np.std(aggregated["production"]["total"]),
-            "avg_faulty": np.mean(aggregated["production"]["faulty"]),
-            "avg_faulty_rate": np.mean(aggregated["production"]["faulty_rate"]),
+            "avg_total": mean("Total Production"),
+            "std_total": math.sqrt(aggregator.stats["Total Production"].variance),
+            "avg_faulty": mean("Faulty Products"),
+            "avg_faulty_rate": mean("Faulty Rate"),
         },
         "station_metrics": {
             "avg_occupancy_rates": [
-                np.mean(rates)
-                for rates in aggregated["station_metrics"]["occupancy_rates"]
-            ],
-            "avg_wait_times": [
-                np.mean(times) for times in aggregated["station_metrics"]["wait_times"]
-            ],
-            "avg_downtimes": [
-                np.mean(times) for times in aggregated["station_metrics"]["downtimes"]
+                mean(f"Station {i} Occupancy Rate") for i in stations
             ],
+            "avg_wait_times": [mean(f"Station {i} Wait Time") for i in stations],
+            "avg_downtimes": [mean(f"Station {i} Downtime") for i in stations],
         },
         "time_metrics": {
-            "avg_production_time": np.mean(
-                aggregated["time_metrics"]["avg_production_time"]
-            ),
-            "avg_fixing_time": np.mean(aggregated["time_metrics"]["avg_fixing_time"]),
-            "avg_supplier_occupancy": np.mean(
-                aggregated["time_metrics"]["supplier_occupancy"]
-            ),
+            "avg_production_time": mean("Production Time"),
+            "avg_fixing_time": mean("Fixing Time"),
+            "avg_supplier_occupancy": mean("Supplier Occupancy"),
+            # Per-run percentiles, averaged over the batch
+            **{
+                f"avg_{name.lower()}_time_p{p}": mean(f"{name} Time P{p}")
+                for name in ("Production", "Fixing")
+                for p in TIME_PERCENTILES
+            },
         },
+        # Mean, std, 95% CI and p5/p50/p95 for every per-run metric
+        "statistics": aggregator.summary(),
+        "runs": aggregator.runs,
     }
-    save_simulation_results_to_graph(results)
+    return results
+
+
+def run_batch_means(
+    sim_time: int = 100000,
+    batches: int = 20,
+    seed: int = None,
+    config: Dict = None,
+    horizon: int = 5000,
+    warmup: bool = True,
+) -> Dict:
+    """Steady-state estimates from one long SimPy run by batch means
+
+    The run's MSER-5 warm-up is discarded (with warmup) and the remainder is
+    split into batches whose metrics, rescaled to horizon, serve as the
+    observations (see steadyState.batch_means). One run of sim_time costs
+    about as much as sim_time / horizon replications, but pays the warm-up
+    once instead of in every replication.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    env = simpy.Environment()
+    metrics = MetricsCollector(keep_samples=True)
+    LaptopFactory(env, metrics, rng=replication_rng(entropy, 0), config=config)
+    recorder = SnapshotRecorder(env, metrics)
+    env.run(until=sim_time)
+
+    results = batch_means(metrics, recorder, batches, horizon, warmup)
+    results["sim_time"] = sim_time
+    print(f"Batch seed: {entropy}")
     return results
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Laptop factory simulation")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--sim-time", type=int, default=5000)
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="parallel processes"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="batch seed")
+    parser.add_argument(
+        "--engine",
+        choices=["simpy", "numpy"],
+        default="simpy",
+        help="numpy runs the vectorized fast-path engine",
+    )
+    parser.add_argument(
+        "--trace-dir", default=None, help="write a per-run event trace here"
+    )
+    parser.add_argument(
+        "--cache-dir", default=None, help="reuse replications cached here"
+    )
+    parser.add_argument(
+        "--precision",
+        type=float,
+        default=None,
+        help="stop once the relative 95%% CI half-width is below this "
+        "(--runs becomes a cap)",
+    )
+    parser.add_argument(
+        "--precision-metric",
+        action="append",
+        default=None,
+        help="metric checked by --precision (repeatable; default: total "
+        "production and station occupancy rates)",
+    )
+    parser.add_argument("--wave-size", type=int, default=None)
+    parser.add_argument(
+        "--antithetic",
+        action="store_true",
+        help="run antithetic pairs (--runs must be even)",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="PATH",
+        help="write a JSON report of batch phases, event counts and generator "
+        "method times",
+    )
+    parser.add_argument(
+        "--cprofile",
+        default=None,
+        metavar="PATH",
+        help="write cProfile stats (.prof, readable by pstats, snakeviz or "
+        "flameprof) covering every worker",
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="cut each run's MSER-5 warm-up period from its metrics",
+    )
+    parser.add_argument(
+        "--batch-means",
+        type=int,
+        default=None,
+        metavar="BATCHES",
+        help="estimate steady state from one run of --sim-time split into "
+        "this many batches, instead of --runs replications",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        nargs="?",
+        const=CHECKPOINT_PATH,
+        default=None,
+        metavar="PATH",
+        help=f"keep a progress manifest while the batch runs, so it can be "
+        f"resumed (default path {CHECKPOINT_PATH}; SimPy only)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the interrupted batch recorded in --checkpoint",
+    )
+    parser.add_argument(
+        "--no-graphs",
+        action="store_true",
+        help="headless: skip the summary charts (and the matplotlib import)",
+    )
+    args = parser.parse_args()
+
+    if args.batch_means:
+        steady = run_batch_means(args.sim_time, args.batch_means, args.seed)
+        print(
+            f"\nBatch means over {steady['batches']} batches of "
+            f"{steady['batch_length']:.0f} time units after a warm-up of "
+            f"{steady['warmup']['time']:.0f} (extensive metrics per "
+            f"{steady['horizon']} time units):"
+        )
+        for name in PRECISION_METRICS:
+            stats = steady["statistics"][name]
+            low, high = stats["ci95"]
+            print(
+                f"{name}: {stats['mean']:.3f} [{low:.3f}, {high:.3f}] "
+                f"(lag-1 autocorrelation "
+                f"{steady['lag1_autocorrelation'][name]:+.2f})"
+            )
+        raise SystemExit
+
     # Run simulation and get results
-    results = run_simulation()
-    save_simulation_results_to_graph(results, "/")
+    results = run_simulation(
+        sim_time=args.sim_time,
+        runs=args.runs,
+        workers=args.workers,
+        seed=args.seed,
+        engine=args.engine,
+        trace_dir=args.trace_dir,
+        cache_dir=args.cache_dir,
+        precision=args.precision,
+        precision_metrics=args.precision_metric,
+        wave_size=args.wave_size,
+        antithetic=args.antithetic,
+        profile=bool(args.profile),
+        cprofile_path=args.cprofile,
+        render_graphs=not args.no_graphs,
+        warmup=args.warmup,
+        checkpoint_path=args.checkpoint,
+        resume=args.resume,
+    )
+    if args.profile:
+        with open(args.profile, "w") as file:
+            json.dump(results["profile"], file, indent=2)
+        print(f"Profile report written to {args.profile}")
+        for name, method in list(results["profile"]["methods"].items())[:5]:
+            print(
+                f"  {name}: {method['seconds']:.3f} s in {method['calls']} calls "
+                f"({method['share']:.1%} of replication time)"
+            )
 
     # Print detailed results
     print("\nSimulation Results:")
     print(f"\nProduction Metrics:")
     print(f"Average Production: {results['production']['avg_total']:.2f} laptops")
     print(f"Production Standard Deviation: {results['production']['std_total']:.2f}")
+    production_stats = results["statistics"]["Total Production"]
+    if production_stats["ci95"] is not None:
+        low, high = production_stats["ci95"]
+        print(f"Production 95% Confidence Interval: [{low:.2f}, {high:.2f}]")
+    if "antithetic" in results:
+        pair_ci = results["antithetic"]["statistics"]["Total Production"]["ci95"]
+        if pair_ci is not None:
+            low, high = pair_ci
+            print(
+                f"Production 95% CI from {results['antithetic']['pairs']} "
+                f"antithetic pairs: [{low:.2f}, {high:.2f}]"
+            )
+    print(
+        f"Production p5 / p50 / p95: {production_stats['p5']:.1f} / "
+        f"{production_stats['p50']:.1f} / {production_stats['p95']:.1f}"
+    )
     print(f"Average Faulty Products: {results['production']['avg_faulty']:.2f}")
     print(f"Average Faulty Rate: {results['production']['avg_faulty_rate']:.2%}")
 
@@ -154,3 +813,10 @@ if __name__ == "__main__":
     print(
         f"Average Supplier Occupancy: {results['time_metrics']['avg_supplier_occupancy']:.2%}"
     )
+    for name in ("production", "fixing"):
+        percentiles = " / ".join(
+            f"{results['time_metrics'][f'avg_{name}_time_p{p}']:.2f}"
+            for p in TIME_PERCENTILES
+        )
+        labels = " / ".join(f"p{p}" for p in TIME_PERCENTILES)
+        print(f"{name.capitalize()} Time {labels}: {percentiles} units")
@@ -1,9 +1,40 @@
 # metrics.py
-import numpy as np
+from array import array
 from typing import Dict, List
 
+from aggregation import QuantileSketch
+from resultsStore import TIME_PERCENTILES
+
+# Cumulative counters captured by MetricsCollector.snapshot, in order
+SNAPSHOT_FIELDS = (
+    ['time', 'production_count', 'faulty_products',
+     'production_time_total', 'production_time_count',
+     'fixing_time_total', 'fixing_time_count', 'supplier_occupancy_time']
+    + [f'station_work_time_{i}' for i in range(6)]
+    + [f'station_wait_time_{i}' for i in range(6)]
+    + [f'station_downtime_{i}' for i in range(6)]
+)
+
+
 class MetricsCollector:
-    def __init__(self):
+    """Per-replication counters
+
+    Production and fixing times are kept as running sums plus a quantile
+    sketch, so memory stays constant however long the horizon is. Pass
+    keep_samples=True to also keep every value in a compact float array.
+    """
+
+    __slots__ = (
+        'production_count', 'faulty_products',
+        'station_work_times', 'station_wait_times', 'station_downtimes',
+        'supplier_occupancy_time',
+        'production_time_total', 'production_time_count', 'production_time_sketch',
+        'fixing_time_total', 'fixing_time_count', 'fixing_time_sketch',
+        'production_times', 'fixing_times',
+        'materials_used', 'resupply_counts',
+    )
+
+    def __init__(self, keep_samples: bool = False):
         # Production metrics
         self.production_count = 0
         self.faulty_products = 0
@@ -13,8 +44,16 @@ class MetricsCollector:
         self.station_wait_times = [0] * 6
         self.station_downtimes = [0] * 6
         self.supplier_occupancy_time = 0
-        self.production_times = []
-        self.fixing_times = []
+        self.production_time_total = 0.0
+        self.production_time_count = 0
+        self.production_time_sketch = QuantileSketch()
+        self.fixing_time_total = 0.0
+        self.fixing_time_count = 0
+        self.fixing_time_sketch = QuantileSketch()
+
+        # Raw samples, only when asked for
+        self.production_times = array('d') if keep_samples else None
+        self.fixing_times = array('d') if keep_samples else None
         
         # Material metrics
         self.materials_used = {
@@ -57,14 +96,22 @@ class MetricsCollector:
         self.station_wait_times[station_id] += time
         
     def record_fixing_time(self, station_id: int, time: float):
-        self.fixing_times.append(time)
+        self.fixing_time_total += time
+        self.fixing_time_count += 1
+        self.fixing_time_sketch.add(time)
+        if self.fixing_times is not None:
+            self.fixing_times.append(time)
         self.station_downtimes[station_id] += time
         
     def record_supply_time(self, time: float):
         self.supplier_occupancy_time += time
         
     def record_production_time(self, time: float):
-        self.production_times.append(time)
+        self.production_time_total += time
+        self.production_time_count += 1
+        self.production_time_sketch.add(time)
+        if self.production_times is not None:
+            self.production_times.append(time)
 
     
 
@@ -76,9 +123,33 @@ class MetricsCollector:
     
     def record_resupply(self, material: str):
         self.resupply_counts[material] += 1
+
+    def snapshot(self, now: float) -> List[float]:
+        """Cumulative counters at time now, in SNAPSHOT_FIELDS order
+
+        The metrics of any window are the difference of two snapshots.
+        """
+        return (
+            [now, self.production_count, self.faulty_products,
+             self.production_time_total, self.production_time_count,
+             self.fixing_time_total, self.fixing_time_count,
+             self.supplier_occupancy_time]
+            + self.station_work_times
+            + self.station_wait_times
+            + self.station_downtimes
+        )
         
     def get_metrics(self, total_time: float) -> Dict:
         """Return comprehensive metrics"""
+        time_metrics = {
+            'avg_production_time': self.production_time_total/self.production_time_count if self.production_time_count else 0,
+            'avg_fixing_time': self.fixing_time_total/self.fixing_time_count if self.fixing_time_count else 0,
+            'supplier_occupancy': self.supplier_occupancy_time/total_time
+        }
+        for p in TIME_PERCENTILES:
+            time_metrics[f'production_time_p{p}'] = self.production_time_sketch.quantile(p / 100)
+            time_metrics[f'fixing_time_p{p}'] = self.fixing_time_sketch.quantile(p / 100)
+
         return {
             'production': {
                 'total': self.production_count,
@@ -90,11 +161,7 @@ class MetricsCollector:
                 'wait_times': [wait/self.production_count if self.production_count > 0 else 0 for wait in self.station_wait_times],
                 'downtimes': self.station_downtimes
             },
-            'time_metrics': {
-                'avg_production_time': np.mean(self.production_times) if self.production_times else 0,
-                'avg_fixing_time': np.mean(self.fixing_times) if self.fixing_times else 0,
-                'supplier_occupancy': self.supplier_occupancy_time/total_time
-            },
+            'time_metrics': time_metrics,
             'material_metrics': {
                 'materials_used': self.materials_used,
                 'resupply_counts': self.resupply_counts
@@ -0,0 +1,186 @@
+# resultCache.py
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional
+
+from simulation import factory_config
+
+CACHE_DIR = "./Results/cache"
+MAX_BYTES = 256 * 1024 * 1024
+
+# Sources whose changes can change a replication's metrics or trace; any edit
+# gives every key a new prefix, so stale entries are never returned
+MODEL_FILES = (
+    "simulation.py",
+    "metrics.py",
+    "variates.py",
+    "aggregation.py",
+    "eventTrace.py",
+    "steadyState.py",
+)
+CACHE_FORMAT = 1
+
+
+def _code_version() -> str:
+    digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_FILES:
+        with open(os.path.join(here, name), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def _link_or_copy(source: str, destination: str):
+    # Hard links cost nothing; both names survive the other being removed
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+class ResultCache:
+    """Content-addressed store of per-replication metrics (and traces)
+
+    An entry's key is a hash of the model code version, the full factory
+    configuration, sim_time, the run index, the batch entropy, whether runs
+    are antithetic pairs and whether the warm-up is truncated, which together
+    determine the replication exactly. Entries live in a small SQLite index
+    with their metrics as JSON; traces, when recorded, are kept as files named
+    by key. The least recently used entries are evicted once the cache grows
+    past max_bytes.
+    """
+
+    def __init__(self, path: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.trace_dir = os.path.join(path, "traces")
+        os.makedirs(self.trace_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(path, "index.db"), timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+                "metrics TEXT, has_trace INTEGER, size INTEGER, last_used REAL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used)"
+            )
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    @staticmethod
+    def key(
+        config: Optional[Dict],
+        sim_time: float,
+        run: int,
+        entropy: int,
+        antithetic: bool = False,
+        warmup: bool = False,
+    ) -> str:
+        payload = json.dumps(
+            {
+                "version": CODE_VERSION,
+                "config": factory_config(config),
+                "sim_time": sim_time,
+                "run": run,
+                "entropy": entropy,
+                "antithetic": antithetic,
+                "warmup": warmup,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _trace_file(self, key: str) -> str:
+        return os.path.join(self.trace_dir, f"{key}.trace")
+
+    def get_many(self, keys: Iterable[str], with_trace: bool = False) -> Dict:
+        """Cached metrics for the keys that are present
+
+        With with_trace, only entries that also have a stored trace count.
+        """
+        keys = list(keys)
+        found = {}
+        # Stay below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                f"SELECT key, metrics, has_trace FROM entries "
+                f"WHERE key IN ({placeholders})",
+                chunk,
+            ).fetchall()
+            for key, metrics, has_trace in rows:
+                if has_trace or not with_trace:
+                    found[key] = json.loads(metrics)
+
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+        return found
+
+    def restore_trace(self, key: str, destination: str):
+        """Place the cached trace of an entry at destination"""
+        _link_or_copy(self._trace_file(key), destination)
+
+    def put(self, key: str, metrics: Dict, trace_path: str = None):
+        """Store one replication, along with its trace file if given"""
+        data = json.dumps(metrics)
+        size = len(data)
+        if trace_path is not None:
+            cached_trace = self._trace_file(key)
+            if os.path.exists(cached_trace):
+                os.remove(cached_trace)
+            _link_or_copy(trace_path, cached_trace)
+            size += os.path.getsize(cached_trace)
+
+        with self.conn:
+            previous = self.conn.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, data, trace_path is not None, size, time.time()),
+            )
+        self.total_bytes += size - (previous[0] if previous else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of max_bytes"""
+        target = self.max_bytes * 0.9
+        removed = []
+        for key, size, has_trace in self.conn.execute(
+            "SELECT key, size, has_trace FROM entries ORDER BY last_used"
+        ).fetchall():
+            if self.total_bytes <= target:
+                break
+            removed.append((key,))
+            self.total_bytes -= size
+            if has_trace and os.path.exists(self._trace_file(key)):
+                os.remove(self._trace_file(key))
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", removed)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,253 @@
+# resultsStore.py
+import json
+import os
+import sqlite3
+import uuid
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+RESULTS_DB = "./Results/results.db"
+
+# Percentiles of production and fixing times reported for every run
+TIME_PERCENTILES = (50, 95, 99)
+
+# One column per metric, in the order the dashboard has always used
+METRIC_NAMES = (
+    ["Total Production", "Faulty Products", "Faulty Rate"]
+    + [
+        f"Station {i+1} {name}"
+        for i in range(6)
+        for name in ("Occupancy Rate", "Wait Time", "Downtime")
+    ]
+    + ["Production Time", "Fixing Time", "Supplier Occupancy"]
+    + [
+        f"{name} Time P{p}"
+        for name in ("Production", "Fixing")
+        for p in TIME_PERCENTILES
+    ]
+)
+
+
+def flatten_run_metrics(metrics: Dict) -> Dict[str, float]:
+    """Flatten a get_metrics dictionary into the per-run metric columns"""
+    row = {
+        "Total Production": metrics["production"]["total"],
+        "Faulty Products": metrics["production"]["faulty"],
+        "Faulty Rate": metrics["production"]["faulty_rate"],
+    }
+    for i in range(6):
+        station = metrics["station_metrics"]
+        row[f"Station {i+1} Occupancy Rate"] = station["occupancy_rates"][i]
+        row[f"Station {i+1} Wait Time"] = station["wait_times"][i]
+        row[f"Station {i+1} Downtime"] = station["downtimes"][i]
+    row["Production Time"] = metrics["time_metrics"]["avg_production_time"]
+    row["Fixing Time"] = metrics["time_metrics"]["avg_fixing_time"]
+    row["Supplier Occupancy"] = metrics["time_metrics"]["supplier_occupancy"]
+    time_metrics = metrics["time_metrics"]
+    for p in TIME_PERCENTILES:
+        row[f"Production Time P{p}"] = time_metrics[f"production_time_p{p}"]
+        row[f"Fixing Time P{p}"] = time_metrics[f"fixing_time_p{p}"]
+    return {name: float(value) for name, value in row.items()}
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    # WAL lets the dashboard read the table while a batch is still appending
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,)
+        ).fetchone()
+        is not None
+    )
+
+
+class ResultsWriter:
+    """Append each run's metrics as one row of the batch results table
+
+    The table holds a single batch: opening a writer clears the previous
+    batch, so runs from different batches are never mixed. Every write bumps
+    a generation counter so readers can tell when the batch has changed.
+
+    To resume an interrupted batch, pass its batch_id and resume_from, the
+    number of runs to keep; later runs are dropped, as they will be rerun.
+    If another batch has replaced it since, ValueError is raised instead.
+    """
+
+    def __init__(
+        self, path: str = RESULTS_DB, batch_id: str = None, resume_from: int = None
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = _connect(path)
+
+        columns = ", ".join(f'"{name}" REAL' for name in METRIC_NAMES)
+        self.batch_id = batch_id or uuid.uuid4().hex
+        self.generation = 0
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        if resume_from is not None and meta.get("batch_id") != self.batch_id:
+            self.conn.close()
+            raise ValueError(
+                f"Batch {self.batch_id} can no longer be resumed: its results "
+                "were replaced by a later batch"
+            )
+
+        with self.conn:
+            if resume_from is not None:
+                self.generation = int(meta["generation"])
+                self.conn.execute("DELETE FROM runs WHERE run > ?", (resume_from,))
+            else:
+                self.conn.execute("DROP TABLE IF EXISTS runs")
+                self.conn.execute(
+                    f"CREATE TABLE runs (run INTEGER PRIMARY KEY, {columns})"
+                )
+            self._bump_generation()
+
+        placeholders = ", ".join("?" for _ in range(len(METRIC_NAMES) + 1))
+        self.insert_sql = f"INSERT OR REPLACE INTO runs VALUES ({placeholders})"
+
+    def append(self, run: int, metrics: Dict):
+        """Store one finished run (run numbers are 1-based)"""
+        row = flatten_run_metrics(metrics)
+        with self.conn:
+            self.conn.execute(
+                self.insert_sql, [run] + [row[name] for name in METRIC_NAMES]
+            )
+            self._bump_generation()
+
+    def _bump_generation(self):
+        # Runs inside the caller's transaction, so the version and rows agree
+        self.generation += 1
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("batch_id", self.batch_id), ("generation", str(self.generation))],
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def batch_version(path: str = RESULTS_DB) -> str:
+    """Return an identifier that changes whenever the stored batch changes
+
+    A database without a batch (e.g. one holding only a sweep) is "none".
+    """
+    conn = sqlite3.connect(path)
+    try:
+        meta = {}
+        if _has_table(conn, "meta"):
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    finally:
+        conn.close()
+    if "batch_id" not in meta:
+        return "none"
+    return f"{meta['batch_id']}-{meta['generation']}"
+
+
+def load_runs(path: str = RESULTS_DB) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """Load the whole batch with one query
+
+    Returns the run numbers, the metric column names and a runs x metrics
+    float matrix. A database without a batch has no runs.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        if not _has_table(conn, "runs"):
+            empty = np.zeros((0, len(METRIC_NAMES)))
+            return np.zeros(0, dtype=int), list(METRIC_NAMES), empty
+        cursor = conn.execute("SELECT * FROM runs ORDER BY run")
+        columns = [description[0] for description in cursor.description][1:]
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+
+    table = np.array(rows, dtype=float).reshape(len(rows), len(columns) + 1)
+    return table[:, 0].astype(int), columns, table[:, 1:]
+
+
+class SweepWriter:
+    """Store one row of aggregates per design point of a parameter sweep
+
+    Lives in the same database as the batch table. Each row holds the point's
+    parameters (JSON), its number of runs, and the mean and 95% CI half-width
+    of every metric. Opening a writer replaces the previous sweep.
+    """
+
+    def __init__(self, path: str = RESULTS_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = _connect(path)
+
+        columns = ", ".join(
+            f'"{name}" REAL, "{name} CI" REAL' for name in METRIC_NAMES
+        )
+        with self.conn:
+            self.conn.execute("DROP TABLE IF EXISTS sweep")
+            self.conn.execute(
+                "CREATE TABLE sweep (point INTEGER PRIMARY KEY, params TEXT, "
+                f"runs INTEGER, {columns})"
+            )
+
+        placeholders = ", ".join("?" for _ in range(2 * len(METRIC_NAMES) + 3))
+        self.insert_sql = f"INSERT OR REPLACE INTO sweep VALUES ({placeholders})"
+
+    def append(self, point: int, params: Dict, runs: int, summary: Dict):
+        """Store a finished point from its MetricsAggregator summary"""
+        row = [point, json.dumps(params), runs]
+        for name in METRIC_NAMES:
+            ci = summary[name]["ci95"]
+            row += [summary[name]["mean"], (ci[1] - ci[0]) / 2 if ci else None]
+        with self.conn:
+            self.conn.execute(self.insert_sql, row)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_sweep(path: str = RESULTS_DB) -> List[Dict]:
+    """Load the stored sweep as one dictionary per design point"""
+    conn = sqlite3.connect(path)
+    try:
+        rows = []
+        if _has_table(conn, "sweep"):
+            rows = conn.execute("SELECT * FROM sweep ORDER BY point").fetchall()
+    finally:
+        conn.close()
+
+    points = []
+    for row in rows:
+        point, params, runs = row[:3]
+        values = row[3:]
+        points.append(
+            {
+                "point": point,
+                "params": json.loads(params),
+                "runs": runs,
+                "metrics": {
+                    name: {"mean": values[2 * i], "ci": values[2 * i + 1]}
+                    for i, name in enumerate(METRIC_NAMES)
+                },
+            }
+        )
+    return points
@@ -1,8 +1,21 @@
 import csv
+from concurrent.futures import Future, ThreadPoolExecutor
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+# Single background thread that renders charts after a batch is stored
+_render_pool = None
+
+
+def _pyplot():
+    """Import pyplot on first use, on the headless Agg backend"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
 
 def save_simulation_results_to_csv(metrics, filename="simulation_resultsSummary.csv"):
     """Saves simulation metrics to a CSV file."""
@@ -84,6 +97,7 @@ def save_simulation_results_to_graph(metrics, folder="./Results"):
     if not isinstance(metrics, dict) or "production" not in metrics:
         print("ERROR: Invalid metrics format.")
         return
+    plt = _pyplot()
 
     # Production Metrics
     labels = ["Avg Production", "Avg Faulty", "Faulty Rate"]
@@ -138,74 +152,23 @@ def save_simulation_results_to_graph(metrics, folder="./Results"):
     ) """
 
 
-def save_single_run_metrics_to_csv(metrics, filename="single_run_results.csv"):
-    """Saves a single simulation run's metrics to a CSV file."""
-
-    # Convert JSON string to dictionary if needed
-    if isinstance(metrics, str):
-        try:
-            metrics = json.loads(metrics)
-        except json.JSONDecodeError:
-            print("ERROR: Invalid JSON format for metrics.")
-            return
-
-    # Validate data structure
-    if not isinstance(metrics, dict):
-        print("ERROR: Metrics is not a dictionary.")
-        return
-
-    if (
-        "production" not in metrics
-        or "station_metrics" not in metrics
-        or "time_metrics" not in metrics
-    ):
-        print("ERROR: Missing expected keys in metrics.")
-        return
-
+def _render_safely(metrics, folder):
     try:
-        with open(filename, mode="w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(["Metric", "Value"])
-
-            # Save production metrics
-            writer.writerow(["Total Production", metrics["production"]["total"]])
-            writer.writerow(["Faulty Products", metrics["production"]["faulty"]])
-            writer.writerow(["Faulty Rate", metrics["production"]["faulty_rate"]])
-
-            # Save station metrics
-            for i in range(6):
-                writer.writerow(
-                    [
-                        f"Station {i+1} Occupancy Rate",
-                        metrics["station_metrics"]["occupancy_rates"][i],
-                    ]
-                )
-                writer.writerow(
-                    [
-                        f"Station {i+1} Wait Time",
-                        metrics["station_metrics"]["wait_times"][i],
-                    ]
-                )
-                writer.writerow(
-                    [
-                        f"Station {i+1} Downtime",
-                        metrics["station_metrics"]["downtimes"][i],
-                    ]
-                )
+        save_simulation_results_to_graph(metrics, folder)
+    except Exception as e:
+        print("ERROR rendering graphs:", e)
 
-            # Save time metrics
-            writer.writerow(
-                ["Production Time", metrics["time_metrics"]["avg_production_time"]]
-            )
-            writer.writerow(["Fixing Time", metrics["time_metrics"]["avg_fixing_time"]])
-            writer.writerow(
-                ["Supplier Occupancy", metrics["time_metrics"]["supplier_occupancy"]]
-            )
 
-        # print(f"✅ Single run results saved to {filename}")
+def render_graphs_in_background(metrics, folder="./Results") -> Future:
+    """Queue save_simulation_results_to_graph on the background render thread
 
-    except Exception as e:
-        print("ERROR writing to CSV:", e)
+    The caller carries on at once; the interpreter waits for queued charts
+    before it exits.
+    """
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="render")
+    return _render_pool.submit(_render_safely, metrics, folder)
 
 
 def save_single_run_metrics_to_graph(metrics, folder="/Results", iteration=0):
@@ -213,6 +176,7 @@ def save_single_run_metrics_to_graph(metrics, folder="/Results", iteration=0):
     if not isinstance(metrics, dict) or "production" not in metrics:
         print("ERROR: Invalid metrics format.")
         return
+    plt = _pyplot()
 
     # Single Run Production Metrics
     labels = ["Total Production", "Faulty Products", "Faulty Rate"]
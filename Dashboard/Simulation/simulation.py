@@ -1,17 +1,72 @@
 import simpy
-import random
 import numpy as np
+import eventTrace
 from metrics import MetricsCollector
+from variates import VariateSupply
+
+# Factory parameters; LaptopFactory takes overrides for any of them
+DEFAULT_CONFIG = {
+    # Probability that a station fails on one of its every-fifth-product checks
+    "failure_probs": [0.02, 0.01, 0.05, 0.15, 0.07, 0.06],
+    "station_capacities": [1, 1, 1, 1, 1, 1],
+    "supply_devices": 3,
+    # (mean, standard deviation) of the clamped normal process time per station
+    "process_times": [(4, 2)] * 6,
+    "start_delay": (4, 2),
+    "resupply_time": (2, 0.5),
+    "repair_mean": 3,
+}
+
+
+def factory_config(overrides: dict = None) -> dict:
+    """DEFAULT_CONFIG with the given overrides applied"""
+    config = dict(DEFAULT_CONFIG)
+    for key, value in (overrides or {}).items():
+        if key not in DEFAULT_CONFIG:
+            raise ValueError(f"Unknown factory parameter: {key}")
+        config[key] = value
+    return config
 
 
 class LaptopFactory:
-    def __init__(self, env: simpy.Environment, metrics: MetricsCollector):
+    def __init__(
+        self,
+        env: simpy.Environment,
+        metrics: MetricsCollector,
+        rng: VariateSupply = None,
+        trace: eventTrace.TraceWriter = None,
+        config: dict = None,
+    ):
         self.env = env
         self.metrics = metrics
+        self.config = factory_config(config)
+
+        # Optional per-event trace; None keeps tracing off
+        self.trace = trace
+        self.current_laptop = 0
+
+        # Independent random stream for this replication, split into one
+        # synchronized substream per purpose: a scenario that draws more often
+        # for one purpose (say, more failures at a station) leaves the values
+        # every other purpose sees unchanged, so paired scenarios share them
+        self.rng = rng if rng is not None else VariateSupply()
+        self.calendar_rng = self.rng.substream("calendar")
+        self.arrival_rng = self.rng.substream("arrivals")
+        self.process_rngs = [self.rng.substream("process", i) for i in range(6)]
+        self.failure_rngs = [self.rng.substream("failures", i) for i in range(6)]
+        self.repair_rngs = [self.rng.substream("repairs", i) for i in range(6)]
+        self.quality_rng = self.rng.substream("quality")
+        self.assembly_rng = self.rng.substream("assembly")
+        self.supply_rng = self.rng.substream("supply")
 
         # Resources
-        self.stations = [simpy.Resource(env, capacity=1) for _ in range(6)]
-        self.supply_devices = simpy.Resource(env, capacity=3)
+        self.stations = [
+            simpy.Resource(env, capacity=capacity)
+            for capacity in self.config["station_capacities"]
+        ]
+        self.supply_devices = simpy.Resource(
+            env, capacity=self.config["supply_devices"]
+        )
 
         # Materials storage with more nuanced initial distribution
         self.materials = {
@@ -28,7 +83,8 @@ class LaptopFactory:
         }
 
         # Enhanced failure probabilities with more variation
-        self.failure_probs = [0.02, 0.01, 0.05, 0.15, 0.07, 0.06]
+        self.failure_probs = list(self.config["failure_probs"])
+        self.process_times = [tuple(p) for p in self.config["process_times"]]
 
         # Tracking product count per station for error checks
         self.station_product_counts = [0] * 6
@@ -41,14 +97,14 @@ class LaptopFactory:
         """Control daily operations and accidents with more realistic randomness"""
         while True:
             # Variable day length with some randomness
-            day_length = random.normalvariate(24, 2)
-            yield self.env.timeout(max(1, day_length))
+            day_length = self.calendar_rng.clamped_normal(24, 2, 1)
+            yield self.env.timeout(day_length)
 
             # Accident probability with slight variation
-            if random.random() < 0.01:
+            if self.calendar_rng.random() < 0.01:
                 # print(f"Accident occurred at time {self.env.now}")
-                accident_duration = random.normalvariate(24, 4)
-                yield self.env.timeout(max(1, accident_duration))
+                accident_duration = self.calendar_rng.clamped_normal(24, 4, 1)
+                yield self.env.timeout(accident_duration)
 
     def run_manufacturing(self):
         """Main manufacturing process with more dynamic processing"""
@@ -58,7 +114,9 @@ class LaptopFactory:
                 yield self.env.process(self.create_laptop())
 
                 # Variable delay between laptop starts
-                delay = max(0.1, random.normalvariate(4, 2))
+                delay = self.arrival_rng.clamped_normal(
+                    *self.config["start_delay"], 0.1
+                )
                 yield self.env.timeout(delay)
 
             except simpy.Interrupt:
@@ -71,17 +129,39 @@ class LaptopFactory:
         # Check for errors every 5 products
         if self.station_product_counts[station_id] % 5 == 0:
             failure_prob = self.failure_probs[station_id]
-            if random.random() < failure_prob:
+            if self.failure_rngs[station_id].random() < failure_prob:
                 # Simulate repair with exponential distribution
-                repair_time = random.expovariate(1 / 3)
+                repair_time = self.repair_rngs[station_id].expovariate(
+                    1 / self.config["repair_mean"]
+                )
                 # print(f"Station {station_id} failed, repair time: {repair_time:.2f}")
                 self.metrics.record_fixing_time(station_id, repair_time)
                 return repair_time
         return 0
 
+    def draw_process_time(self, station_id):
+        """Process time of one product at a station"""
+        mean, std = self.process_times[station_id]
+        return self.process_rngs[station_id].clamped_normal(mean, std, 0.1)
+
+    def trace_event(self, station, kind, request, duration, material=-1):
+        """Record an event of the current laptop that ends now"""
+        if self.trace is not None:
+            now = self.env.now
+            self.trace.append(
+                self.current_laptop,
+                station,
+                kind,
+                request,
+                now - duration,
+                now,
+                material,
+            )
+
     def create_laptop(self):
         """Complete laptop creation process with enhanced randomness"""
         start_time = self.env.now
+        self.current_laptop += 1
 
         try:
             # 1. Create motherboard
@@ -97,15 +177,18 @@ class LaptopFactory:
             yield self.env.process(self.final_assembly())
 
             # Quality check with more nuanced rejection
-            quality_score = random.random()
+            quality_score = self.quality_rng.random()
             if quality_score < 0.05:  # 5% rejection rate
                 self.metrics.record_faulty()
+                kind = eventTrace.REJECTED
                 # print(f"Laptop rejected at quality check (score: {quality_score:.4f})")
             else:
                 self.metrics.record_production()
+                kind = eventTrace.LAPTOP
 
             # Record total production time
             self.metrics.record_production_time(self.env.now - start_time)
+            self.trace_event(-1, kind, start_time, self.env.now - start_time)
 
         except simpy.Interrupt:
             print(f"Production interrupted at {self.env.now}")
@@ -118,21 +201,24 @@ class LaptopFactory:
         with self.stations[0].request() as req:
             wait_start = self.env.now
             yield req
+            granted = self.env.now
 
             # Record waiting time
-            self.metrics.record_waiting_time(0, self.env.now - wait_start)
+            self.metrics.record_waiting_time(0, granted - wait_start)
 
             # Check for potential station failure
             failure_time = self.check_station_failure(0)
             if failure_time > 0:
                 yield self.env.timeout(failure_time)
+                self.trace_event(0, eventTrace.REPAIR, wait_start, failure_time)
 
             # Process time with increased variance
-            process_time = max(0.1, random.normalvariate(4, 2))
+            process_time = self.draw_process_time(0)
             yield self.env.timeout(process_time)
 
             # Record work time
             self.metrics.record_work_time(0, process_time)
+            self.trace_event(0, eventTrace.WORK, wait_start, self.env.now - granted)
 
             self.materials["motherboard_circuits"] -= 1
 
@@ -146,7 +232,7 @@ class LaptopFactory:
         ]
 
         # Randomize order and process
-        random.shuffle(components)
+        self.assembly_rng.shuffle(components)
 
         for station_id, component_type, component_stock, weights in components:
             # Check and resupply if needed
@@ -156,21 +242,26 @@ class LaptopFactory:
             with self.stations[station_id].request() as req:
                 wait_start = self.env.now
                 yield req
+                granted = self.env.now
 
                 # Record waiting time
-                self.metrics.record_waiting_time(station_id, self.env.now - wait_start)
+                self.metrics.record_waiting_time(station_id, granted - wait_start)
 
                 # Check for potential station failure
                 failure_time = self.check_station_failure(station_id)
                 if failure_time > 0:
                     yield self.env.timeout(failure_time)
+                    self.trace_event(station_id, eventTrace.REPAIR, wait_start, failure_time)
 
                 # Process time with increased variance
-                process_time = max(0.1, random.normalvariate(4, 2))
+                process_time = self.draw_process_time(station_id)
                 yield self.env.timeout(process_time)
 
                 # Record work time
                 self.metrics.record_work_time(station_id, process_time)
+                self.trace_event(
+                    station_id, eventTrace.WORK, wait_start, self.env.now - granted
+                )
 
                 # Dynamic component selection with weights
                 if isinstance(component_stock, dict):
@@ -180,13 +271,13 @@ class LaptopFactory:
                         adjusted_weights = [
                             weights[available.index(k)] for k in available
                         ]
-                        choice = random.choices(available, weights=adjusted_weights)[0]
+                        choice = self.assembly_rng.choice(available, adjusted_weights)
                         component_stock[choice] -= 1
 
     def assemble_case(self):
         """Assemble case with more nuanced material selection"""
         # Weighted selection of case material
-        case_material = random.choices(["metal", "plastic"], weights=[0.6, 0.4])[0]
+        case_material = self.assembly_rng.choice(["metal", "plastic"], [0.6, 0.4])
 
         if self.materials[case_material] <= 0:
             yield self.env.process(self.resupply_materials(case_material))
@@ -194,21 +285,24 @@ class LaptopFactory:
         with self.stations[4].request() as req:
             wait_start = self.env.now
             yield req
+            granted = self.env.now
 
             # Record waiting time
-            self.metrics.record_waiting_time(4, self.env.now - wait_start)
+            self.metrics.record_waiting_time(4, granted - wait_start)
 
             # Check for potential station failure
             failure_time = self.check_station_failure(4)
             if failure_time > 0:
                 yield self.env.timeout(failure_time)
+                self.trace_event(4, eventTrace.REPAIR, wait_start, failure_time)
 
             # Process time with increased variance
-            process_time = max(0.1, random.normalvariate(4, 2))
+            process_time = self.draw_process_time(4)
             yield self.env.timeout(process_time)
 
             # Record work time
             self.metrics.record_work_time(4, process_time)
+            self.trace_event(4, eventTrace.WORK, wait_start, self.env.now - granted)
 
             self.materials[case_material] -= 1
 
@@ -220,21 +314,24 @@ class LaptopFactory:
         with self.stations[5].request() as req:
             wait_start = self.env.now
             yield req
+            granted = self.env.now
 
             # Record waiting time
-            self.metrics.record_waiting_time(5, self.env.now - wait_start)
+            self.metrics.record_waiting_time(5, granted - wait_start)
 
             # Check for potential station failure
             failure_time = self.check_station_failure(5)
             if failure_time > 0:
                 yield self.env.timeout(failure_time)
+                self.trace_event(5, eventTrace.REPAIR, wait_start, failure_time)
 
             # Process time with increased variance
-            process_time = max(0.1, random.normalvariate(4, 2))
+            process_time = self.draw_process_time(5)
             yield self.env.timeout(process_time)
 
             # Record work time
             self.metrics.record_work_time(5, process_time)
+            self.trace_event(5, eventTrace.WORK, wait_start, self.env.now - granted)
 
             self.materials["screens"] -= 1
 
@@ -245,28 +342,37 @@ class LaptopFactory:
             yield req
 
             # Resupply time with more variance
-            resupply_time = max(0.1, random.normalvariate(2, 0.5))
+            resupply_time = self.supply_rng.clamped_normal(
+                *self.config["resupply_time"], 0.1
+            )
             yield self.env.timeout(resupply_time)
 
             # Record supplier occupancy
             self.metrics.record_supply_time(self.env.now - supply_start)
+            self.trace_event(
+                -1,
+                eventTrace.RESUPPLY,
+                supply_start,
+                resupply_time,
+                eventTrace.MATERIALS.index(material_type),
+            )
 
             # Resupply with more dynamic component generation
             if material_type in ["cpus", "gpus"]:
                 self.generate_components(material_type)
             else:
                 # Add some randomness to resupply quantities
-                resupply_amount = random.randint(20, 30)
+                resupply_amount = self.supply_rng.randint(20, 30)
                 self.materials[material_type] = resupply_amount
 
     def generate_components(self, component_type):
         """Generate new batch of components with more varied distribution"""
         if component_type == "cpus":
-            intel_count = random.randint(10, 15)
+            intel_count = self.supply_rng.randint(10, 15)
             self.materials["cpus"] = {"intel": intel_count, "amd": 25 - intel_count}
         elif component_type == "gpus":
-            nvidia_count = random.randint(7, 10)
-            amd_count = random.randint(7, 10)
+            nvidia_count = self.supply_rng.randint(7, 10)
+            amd_count = self.supply_rng.randint(7, 10)
             intel_count = 25 - nvidia_count - amd_count
             self.materials["gpus"] = {
                 "nvidia": nvidia_count,
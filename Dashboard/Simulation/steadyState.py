@@ -0,0 +1,213 @@
+# steadyState.py
+from typing import Dict, List, Tuple
+
+import numpy as np
+import simpy
+
+from aggregation import MetricsAggregator
+from metrics import SNAPSHOT_FIELDS, MetricsCollector
+from resultsStore import METRIC_NAMES, flatten_run_metrics
+
+# Simulated time between counter snapshots
+SNAPSHOT_INTERVAL = 50
+
+# MSER-5: the production-time series is averaged over batches of this many
+# snapshot intervals before the truncation point is searched
+MSER_BATCH = 5
+
+# Metrics that grow with the length of the window; they are rescaled to a
+# common horizon so truncated and full-length results stay comparable
+EXTENSIVE_METRICS = ["Total Production", "Faulty Products"] + [
+    f"Station {i} Downtime" for i in range(1, 7)
+]
+
+_FIELD = {name: i for i, name in enumerate(SNAPSHOT_FIELDS)}
+
+
+class SnapshotRecorder:
+    """Snapshot a collector's cumulative counters every interval of sim time
+
+    Runs as its own SimPy process and draws no random numbers, so the model
+    behaves exactly as it would without it. The collector must keep its
+    samples (keep_samples=True) for window percentiles to be computed.
+    """
+
+    def __init__(
+        self,
+        env: simpy.Environment,
+        collector: MetricsCollector,
+        interval: float = SNAPSHOT_INTERVAL,
+    ):
+        self.env = env
+        self.collector = collector
+        self.interval = interval
+        self.rows: List[List[float]] = [collector.snapshot(env.now)]
+        env.process(self.record())
+
+    def record(self):
+        while True:
+            yield self.env.timeout(self.interval)
+            self.rows.append(self.collector.snapshot(self.env.now))
+
+    def table(self) -> np.ndarray:
+        """All snapshots plus the current state, one row per snapshot"""
+        rows = self.rows
+        if rows[-1][0] < self.env.now:
+            rows = rows + [self.collector.snapshot(self.env.now)]
+        return np.array(rows, dtype=float)
+
+
+def mser(batch_means: np.ndarray) -> int:
+    """MSER truncation point: how many leading batches to discard
+
+    Picks the d minimizing the variance of the remaining batch means divided
+    by their count, sum((Y_i - mean_d)^2) / (k - d)^2. Only the first half of
+    the series is searched, so at least half of it is always kept.
+    """
+    k = len(batch_means)
+    if k < 2:
+        return 0
+    # Sums over every tail Y_d..Y_k-1 at once, with reversed cumulative sums
+    tail_n = np.arange(k, 0, -1)
+    tail_sum = np.cumsum(batch_means[::-1])[::-1]
+    tail_squares = np.cumsum((batch_means**2)[::-1])[::-1]
+    deviations = np.maximum(tail_squares - tail_sum**2 / tail_n, 0)
+    statistic = deviations / tail_n**2
+    return int(np.argmin(statistic[: k // 2]))
+
+
+def production_time_batches(table: np.ndarray, batch: int = MSER_BATCH) -> np.ndarray:
+    """Mean production time of each batch of snapshot intervals
+
+    Batches in which no laptop finished take the overall mean.
+    """
+    rows = table[::batch]
+    totals = np.diff(rows[:, _FIELD["production_time_total"]])
+    counts = np.diff(rows[:, _FIELD["production_time_count"]])
+    overall = totals.sum() / counts.sum() if counts.sum() else 0.0
+    return np.where(counts > 0, totals / np.maximum(counts, 1), overall)
+
+
+def warmup_row(table: np.ndarray, batch: int = MSER_BATCH) -> Tuple[int, int]:
+    """MSER-5 truncation: (snapshot row where steady state starts, batches cut)"""
+    deleted = mser(production_time_batches(table, batch))
+    return deleted * batch, deleted
+
+
+def window_metrics(
+    collector: MetricsCollector,
+    start: np.ndarray,
+    end: np.ndarray,
+    horizon: float = None,
+) -> Dict:
+    """get_metrics of the window between two snapshot rows
+
+    Counters are the differences of the snapshots; percentiles come from the
+    window's own samples. Material counts cover the whole run. With horizon,
+    extensive metrics (production counts, downtimes) are rescaled from the
+    window length to horizon.
+    """
+    delta = end - start
+    duration = delta[_FIELD["time"]]
+    window = MetricsCollector()
+    window.production_count = int(delta[_FIELD["production_count"]])
+    window.faulty_products = int(delta[_FIELD["faulty_products"]])
+    window.production_time_total = delta[_FIELD["production_time_total"]]
+    window.production_time_count = int(delta[_FIELD["production_time_count"]])
+    window.fixing_time_total = delta[_FIELD["fixing_time_total"]]
+    window.fixing_time_count = int(delta[_FIELD["fixing_time_count"]])
+    window.supplier_occupancy_time = delta[_FIELD["supplier_occupancy_time"]]
+    stations = _FIELD["station_work_time_0"]
+    window.station_work_times = delta[stations : stations + 6].tolist()
+    window.station_wait_times = delta[stations + 6 : stations + 12].tolist()
+    window.station_downtimes = delta[stations + 12 : stations + 18].tolist()
+    window.materials_used = collector.materials_used
+    window.resupply_counts = collector.resupply_counts
+
+    # Samples are appended in the same order the counters grow
+    for samples, sketch, field in (
+        (collector.production_times, window.production_time_sketch, "production"),
+        (collector.fixing_times, window.fixing_time_sketch, "fixing"),
+    ):
+        first = int(start[_FIELD[f"{field}_time_count"]])
+        last = int(end[_FIELD[f"{field}_time_count"]])
+        for value in samples[first:last]:
+            sketch.add(value)
+
+    metrics = window.get_metrics(duration)
+    if horizon is not None and duration > 0:
+        scale = horizon / duration
+        production = metrics["production"]
+        production["total"] *= scale
+        production["faulty"] *= scale
+        stations = metrics["station_metrics"]
+        stations["downtimes"] = [value * scale for value in stations["downtimes"]]
+    return metrics
+
+
+def truncated_metrics(
+    collector: MetricsCollector, recorder: SnapshotRecorder, sim_time: float
+) -> Dict:
+    """Metrics of a replication with its MSER-5 warm-up period removed
+
+    Extensive metrics are rescaled to sim_time, so they estimate what a run
+    of that length produces in steady state. The "warmup" entry reports the
+    truncation.
+    """
+    table = recorder.table()
+    row, deleted = warmup_row(table)
+    metrics = window_metrics(collector, table[row], table[-1], horizon=sim_time)
+    metrics["warmup"] = {"time": float(table[row, 0]), "batches_deleted": deleted}
+    return metrics
+
+
+def batch_means(
+    collector: MetricsCollector,
+    recorder: SnapshotRecorder,
+    batches: int = 20,
+    horizon: float = 5000,
+    warmup: bool = True,
+    confidence: float = 0.95,
+) -> Dict:
+    """Steady-state estimates from one long run by the method of batch means
+
+    After the MSER-5 warm-up (with warmup), the rest of the run is split into
+    batches of equal simulated time; each batch's metrics, with extensive
+    metrics rescaled to horizon, are one observation. Batches long enough to
+    be nearly independent give confidence intervals like those of as many
+    replications; the lag-1 autocorrelation of the batch means is reported
+    for every metric as a check (values near 0 are good).
+    """
+    table = recorder.table()
+    row, deleted = warmup_row(table) if warmup else (0, 0)
+    if len(table) - 1 - row < batches:
+        raise ValueError(
+            f"The run has {len(table) - 1 - row} snapshot intervals after the "
+            f"warm-up, fewer than the {batches} batches asked for"
+        )
+
+    boundaries = np.linspace(row, len(table) - 1, batches + 1).round().astype(int)
+    aggregator = MetricsAggregator()
+    observations = []
+    for first, last in zip(boundaries[:-1], boundaries[1:]):
+        metrics = window_metrics(collector, table[first], table[last], horizon)
+        observation = flatten_run_metrics(metrics)
+        aggregator.update_row(observation)
+        observations.append([observation[name] for name in METRIC_NAMES])
+
+    values = np.array(observations)
+    centered = values - values.mean(axis=0)
+    squares = (centered**2).sum(axis=0)
+    lag1 = (centered[1:] * centered[:-1]).sum(axis=0)
+    autocorrelation = {
+        name: float(lag1[i] / squares[i]) if squares[i] > 0 else 0.0
+        for i, name in enumerate(METRIC_NAMES)
+    }
+    return {
+        "batches": batches,
+        "batch_length": float(table[boundaries[1], 0] - table[boundaries[0], 0]),
+        "horizon": horizon,
+        "warmup": {"time": float(table[row, 0]), "batches_deleted": deleted},
+        "statistics": aggregator.summary(confidence),
+        "lag1_autocorrelation": autocorrelation,
+    }
@@ -0,0 +1,244 @@
+# sweep.py
+import argparse
+import copy
+import itertools
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from aggregation import MetricsAggregator
+from main import SimulationCancelled, replicate
+from resultCache import ResultCache
+from resultsStore import RESULTS_DB, SweepWriter
+from simulation import DEFAULT_CONFIG, factory_config
+
+# Parameters that only make sense as whole numbers
+INTEGER_PARAMS = {"station_capacities", "supply_devices"}
+
+# "failure_probs[3]" or "process_times[3][0]": a config key plus list indices
+PARAM_PATTERN = re.compile(r"^(\w+)((?:\[\d+\])*)$")
+
+
+def _parse_param(name: str) -> Tuple[str, List[int]]:
+    match = PARAM_PATTERN.match(name)
+    if match is None or match.group(1) not in DEFAULT_CONFIG:
+        raise ValueError(f"Unknown sweep parameter: {name}")
+    return match.group(1), [int(i) for i in re.findall(r"\d+", match.group(2))]
+
+
+def point_config(point: Dict[str, float]) -> Dict:
+    """Turn a design point into LaptopFactory config overrides
+
+    Raises ValueError for a parameter that does not name a single number of
+    the configuration, or a value that is not a number.
+    """
+    overrides = {}
+    for name, value in point.items():
+        key, indices = _parse_param(name)
+        current = DEFAULT_CONFIG[key]
+        try:
+            for index in indices:
+                current = current[index]
+        except (IndexError, TypeError):
+            raise ValueError(f"Unknown sweep parameter: {name}") from None
+        if isinstance(current, (list, tuple)):
+            raise ValueError(f"Sweep parameter {name} needs an index")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Sweep parameter {name} must be a number")
+
+        if key in INTEGER_PARAMS:
+            value = int(round(value))
+        if not indices:
+            overrides[key] = value
+            continue
+
+        # Lists and tuples are copied as lists so one entry can be replaced
+        target = overrides.setdefault(
+            key, copy.deepcopy(_as_lists(factory_config()[key]))
+        )
+        for index in indices[:-1]:
+            target = target[index]
+        target[indices[-1]] = value
+    return overrides
+
+
+def _as_lists(value):
+    if isinstance(value, (list, tuple)):
+        return [_as_lists(item) for item in value]
+    return value
+
+
+def grid_design(levels: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    """Every combination of the given parameter levels"""
+    names = list(levels)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(levels[name] for name in names))
+    ]
+
+
+def lhs_design(
+    ranges: Dict[str, Tuple[float, float]], points: int, seed: int = None
+) -> List[Dict[str, float]]:
+    """Latin hypercube sample of points over the given parameter ranges
+
+    Each parameter's range is cut into points equal strata and every stratum
+    is used exactly once, in an independent random order per parameter.
+    Integer parameters are rounded to whole numbers.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(ranges)
+    strata = np.stack([rng.permutation(points) for _ in names], axis=1)
+    unit = (strata + rng.random((points, len(names)))) / points
+    low = np.array([ranges[name][0] for name in names], dtype=float)
+    high = np.array([ranges[name][1] for name in names], dtype=float)
+    values = low + unit * (high - low)
+    for column, name in enumerate(names):
+        if _parse_param(name)[0] in INTEGER_PARAMS:
+            values[:, column] = np.round(values[:, column])
+    return [dict(zip(names, row.tolist())) for row in values]
+
+
+def run_sweep(
+    design: List[Dict[str, float]],
+    runs: int = 20,
+    sim_time: int = 5000,
+    workers: int = 1,
+    seed: int = None,
+    executor: Executor = None,
+    on_run: Callable[[int, Dict], None] = None,
+    should_stop: Callable[[], bool] = None,
+    results_path: str = RESULTS_DB,
+    cache_dir: str = None,
+) -> List[Dict]:
+    """Simulate runs replications of every design point
+
+    All (point, replication) tasks go to one process pool. Replication r uses
+    the same random stream at every point (common random numbers), so
+    differences between points are not masked by sampling noise. Each point's
+    aggregates are written to the sweep table as soon as its last run is in.
+    With cache_dir, replications shared with earlier sweeps or batches are
+    read from the result cache.
+    """
+    entropy = np.random.SeedSequence(seed).entropy
+    configs = [point_config(point) for point in design]
+    writer = SweepWriter(results_path)
+    cache = ResultCache(cache_dir) if cache_dir else None
+
+    owns_executor = executor is None and workers > 1
+    if owns_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    # Point-major task order, so points complete one after another
+    run_ids = [run for _ in design for run in range(runs)]
+    task_configs = [config for config in configs for _ in range(runs)]
+    results = replicate(
+        run_ids, task_configs, sim_time, entropy, executor, workers, cache=cache
+    )
+
+    points = []
+    aggregator = MetricsAggregator()
+    try:
+        for task, run_metrics in enumerate(results):
+            if should_stop is not None and should_stop():
+                raise SimulationCancelled(f"Cancelled after {task} runs")
+
+            aggregator.update(run_metrics)
+            if on_run is not None:
+                on_run(task + 1, run_metrics)
+
+            if aggregator.runs == runs:
+                point = len(points)
+                summary = aggregator.summary()
+                writer.append(point, design[point], runs, summary)
+                points.append(
+                    {
+                        "point": point,
+                        "params": design[point],
+                        "runs": runs,
+                        "metrics": {
+                            name: {"mean": stats["mean"], "ci95": stats["ci95"]}
+                            for name, stats in summary.items()
+                        },
+                    }
+                )
+                print(
+                    f"Point {point + 1}/{len(design)} {design[point]}: "
+                    f"{summary['Total Production']['mean']:.1f} laptops"
+                )
+                aggregator = MetricsAggregator()
+    finally:
+        writer.close()
+        results.close()
+        if cache is not None:
+            cache.close()
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+    return points
+
+
+def _parse_levels(spec: str) -> Tuple[str, List[float]]:
+    name, _, values = spec.partition("=")
+    return name, [float(value) for value in values.split(",")]
+
+
+def _parse_range(spec: str) -> Tuple[str, Tuple[float, float]]:
+    name, _, bounds = spec.partition("=")
+    low, _, high = bounds.partition(":")
+    return name, (float(low), float(high))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Parameter sweep over the factory configuration"
+    )
+    parser.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="PARAM=V1,V2,...",
+        help='grid levels, e.g. "failure_probs[3]=0.05,0.1,0.15"',
+    )
+    parser.add_argument(
+        "--range",
+        action="append",
+        default=[],
+        metavar="PARAM=LOW:HIGH",
+        help='Latin hypercube range, e.g. "supply_devices=2:5"',
+    )
+    parser.add_argument("--lhs", type=int, default=10, help="Latin hypercube points")
+    parser.add_argument("--runs", type=int, default=20, help="runs per point")
+    parser.add_argument("--sim-time", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--cache-dir", default=None, help="reuse replications cached here"
+    )
+    args = parser.parse_args()
+
+    if args.grid:
+        design = grid_design(dict(map(_parse_levels, args.grid)))
+    elif args.range:
+        design = lhs_design(dict(map(_parse_range, args.range)), args.lhs, args.seed)
+    else:
+        parser.error("give --grid levels or --range bounds")
+
+    points = run_sweep(
+        design,
+        runs=args.runs,
+        sim_time=args.sim_time,
+        workers=args.workers,
+        seed=args.seed,
+        cache_dir=args.cache_dir,
+    )
+
+    print("\nTotal Production by design point:")
+    for point in points:
+        stats = point["metrics"]["Total Production"]
+        ci = stats["ci95"]
+        half_width = f" ± {(ci[1] - ci[0]) / 2:.2f}" if ci else ""
+        print(f"{point['params']}: {stats['mean']:.2f}{half_width}")
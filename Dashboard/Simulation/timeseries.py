@@ -0,0 +1,140 @@
+# timeseries.py
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+import eventTrace
+from eventTrace import TraceReader
+
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+def _durations(records: np.ndarray) -> np.ndarray:
+    return records["end"] - records["start"]
+
+
+def production_time(records: np.ndarray) -> Series:
+    """Production time of every finished laptop, at its completion time"""
+    finished = np.isin(records["kind"], (eventTrace.LAPTOP, eventTrace.REJECTED))
+    laptops = records[finished]
+    return laptops["end"], _durations(laptops)
+
+
+def throughput(records: np.ndarray) -> Series:
+    """Cumulative number of good laptops over time"""
+    laptops = records[records["kind"] == eventTrace.LAPTOP]
+    return laptops["end"], np.arange(1, len(laptops) + 1, dtype=float)
+
+
+def wait_time(records: np.ndarray) -> Series:
+    """Time each station step waited for its station, at the step's start
+
+    A step's record starts when the station is granted, before any repair,
+    so start - request is the queue wait alone.
+    """
+    work = records[records["kind"] == eventTrace.WORK]
+    order = np.argsort(work["start"], kind="stable")
+    waits = np.maximum(0.0, work["start"] - work["request"])
+    return work["start"][order], waits[order]
+
+
+def repair_time(records: np.ndarray) -> Series:
+    """Duration of each station repair, at its end"""
+    repairs = records[records["kind"] == eventTrace.REPAIR]
+    return repairs["end"], _durations(repairs)
+
+
+def downtime(records: np.ndarray) -> Series:
+    """Cumulative repair time over time"""
+    repairs = records[records["kind"] == eventTrace.REPAIR]
+    return repairs["end"], np.cumsum(_durations(repairs))
+
+
+# Series that can be derived from an event trace
+METRICS: Dict[str, Callable[[np.ndarray], Series]] = {
+    "production_time": production_time,
+    "throughput": throughput,
+    "wait_time": wait_time,
+    "repair_time": repair_time,
+    "downtime": downtime,
+}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Series:
+    """Largest-Triangle-Three-Buckets downsampling to threshold points
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and the
+    mean of the next bucket. Each bucket is evaluated with array operations.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # Bucket boundaries over the interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Mean of every bucket, used as the third corner of the triangle
+    sums_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    means_x = np.append(sums_x / sizes, x[-1])
+    means_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        low, high = edges[bucket], edges[bucket + 1]
+        next_x, next_y = means_x[bucket + 1], means_y[bucket + 1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[low:high] - y[previous])
+            - (x[previous] - x[low:high]) * (next_y - y[previous])
+        )
+        previous = low + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
+
+
+def min_max(x: np.ndarray, y: np.ndarray, threshold: int) -> Series:
+    """Keep the minimum and maximum of threshold / 2 equal-count buckets
+
+    Spikes survive, which LTTB can smooth over. Points stay in time order.
+    """
+    n = len(x)
+    buckets = threshold // 2
+    if threshold >= n or buckets < 1:
+        return x, y
+
+    edges = np.linspace(0, n, buckets + 1).astype(int)[:-1]
+    sizes = np.diff(np.append(edges, n))
+    # Index of each bucket's min and max: sort by (bucket, value) once
+    bucket_of = np.repeat(np.arange(buckets), sizes)
+    order = np.lexsort((y, bucket_of))
+    lows = order[edges]
+    highs = order[edges + sizes - 1]
+    selected = np.unique(np.concatenate([lows, highs]))
+    return x[selected], y[selected]
+
+
+DOWNSAMPLERS = {"lttb": lttb, "minmax": min_max}
+
+
+def trace_series(
+    path: str,
+    metric: str,
+    points: int,
+    method: str = "lttb",
+    start: float = 0.0,
+    end: float = np.inf,
+    station: Optional[int] = None,
+) -> Series:
+    """Downsampled series of one metric from one run's trace file
+
+    Only the records that ended in [start, end) are read from the file.
+    """
+    records = TraceReader(path).between(start, end)
+    if station is not None:
+        records = records[records["station"] == station]
+    x, y = METRICS[metric](records)
+    return DOWNSAMPLERS[method](x, y, points)
@@ -0,0 +1,123 @@
+# variates.py
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+BLOCK_SIZE = 1024
+_BELOW_ONE = np.nextafter(1.0, 0.0)
+
+# Purposes that get their own synchronized substream; the position in this
+# tuple is part of each substream's seed, so only ever append to it
+PURPOSES = (
+    "calendar",
+    "arrivals",
+    "process",
+    "failures",
+    "repairs",
+    "quality",
+    "assembly",
+    "supply",
+)
+
+
+class VariateSupply:
+    """Seedable source of random variates drawn in large NumPy blocks
+
+    Each distribution (and parameter set) has its own block of pre-drawn
+    values that is handed out one at a time and refilled from a single
+    numpy Generator, so per-call cost is a list lookup instead of a scalar
+    RNG call plus clamping. The same seed and the same sequence of calls
+    always give the same values.
+
+    substream() derives an independent supply for one purpose (and index,
+    e.g. a station) from the same seed. With antithetic, every uniform u is
+    replaced by 1 - u and every standard normal z by -z, in this supply and
+    all of its substreams.
+    """
+
+    def __init__(
+        self, seed=None, block_size: int = BLOCK_SIZE, antithetic: bool = False
+    ):
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_seq = seed
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.antithetic = antithetic
+        self._uniforms = self._stream(self._uniform)
+        self._streams: Dict[Tuple, Iterator[float]] = {}
+
+    def substream(self, purpose: str, index: int = 0) -> "VariateSupply":
+        """Supply for one purpose, seeded by this supply's seed and the purpose
+
+        The values of a substream depend only on the seed, purpose and index,
+        never on how many draws other purposes made.
+        """
+        if purpose not in PURPOSES:
+            raise ValueError(f"Unknown random stream purpose: {purpose}")
+        seed_seq = np.random.SeedSequence(
+            self.seed_seq.entropy,
+            spawn_key=self.seed_seq.spawn_key + (PURPOSES.index(purpose), index),
+        )
+        return VariateSupply(seed_seq, self.block_size, self.antithetic)
+
+    def _uniform(self, size: int) -> np.ndarray:
+        values = self.generator.random(size)
+        if self.antithetic:
+            # Keep the [0, 1) range: u = 0 would otherwise map to exactly 1
+            return np.minimum(1.0 - values, _BELOW_ONE)
+        return values
+
+    def _normal(self, size: int) -> np.ndarray:
+        values = self.generator.standard_normal(size)
+        return -values if self.antithetic else values
+
+    def _stream(self, fill: Callable[[int], np.ndarray]) -> Iterator[float]:
+        # Python floats from .tolist() are much cheaper to hand out than
+        # indexing into the array one element at a time
+        while True:
+            yield from fill(self.block_size).tolist()
+
+    def _keyed(self, key: Tuple, fill: Callable[[int], np.ndarray]) -> float:
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = self._stream(fill)
+        return next(stream)
+
+    def random(self) -> float:
+        """Uniform value in [0, 1)"""
+        return next(self._uniforms)
+
+    def clamped_normal(self, mu: float, sigma: float, lower: float) -> float:
+        """Normal value clamped from below, i.e. max(lower, N(mu, sigma))"""
+        return self._keyed(
+            ("clamped_normal", mu, sigma, lower),
+            lambda size: np.maximum(lower, mu + sigma * self._normal(size)),
+        )
+
+    def expovariate(self, lambd: float) -> float:
+        """Exponential value with rate lambd (mean 1 / lambd)"""
+        return self._keyed(
+            ("expovariate", lambd),
+            lambda size: -np.log1p(-self._uniform(size)) / lambd,
+        )
+
+    def randint(self, a: int, b: int) -> int:
+        """Integer in [a, b], both ends included"""
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, population: Sequence, weights: Sequence[float]):
+        """Pick one element of population with the given relative weights"""
+        threshold = self.random() * sum(weights)
+        cumulative = 0.0
+        for item, weight in zip(population, weights):
+            cumulative += weight
+            if threshold < cumulative:
+                return item
+        return population[-1]
+
+    def shuffle(self, items: List):
+        """Shuffle a list in place (Fisher-Yates)"""
+        for i in range(len(items) - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            items[i], items[j] = items[j], items[i]
@@ -1,12 +1,150 @@
 from flask import Flask, request, jsonify, render_template, send_from_directory
 from flask_cors import CORS
-import subprocess
 import os
-import glob
-import pandas as pd
+import gzip
+import threading
+import zlib
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # responses fall back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # responses are gzip-compressed only
+    brotli = None
+
+from jobs import JobManager
+from aggregation import HISTOGRAM_BINS, matrix_summary
+from batchHistory import diff_batches, get_batch, list_batches
+from checkpoint import load_checkpoint
+from main import trace_path
+from resultsStore import METRIC_NAMES, batch_version, load_runs, load_sweep
+from sweep import grid_design, lhs_design, point_config
+from timeseries import DOWNSAMPLERS, METRICS, trace_series
+
+# Consolidated results table written by the simulation runner
+RESULTS_DB = os.path.join("Results", "results.db")
+
+# Every batch run so far, with its parameters and aggregates, used by /batches
+HISTORY_DB = os.path.join("Results", "history.db")
+
+# Progress manifest of the running batch, from which an interrupted batch
+# is resumed
+CHECKPOINT_PATH = os.path.join("Results", "checkpoint.json")
+
+# Per-run event traces of the latest SimPy batch, used by /timeseries
+TRACE_DIR = os.path.join("Results", "traces")
+
+# Replications already computed are reused by identical batches and sweeps
+CACHE_DIR = os.path.join("Results", "cache")
+
+# Seed of batches, sweeps and comparisons queued without one. Fresh entropy
+# would give every request new cache keys, so repeated runs would never hit
+DEFAULT_SEED = 1
+
+# /timeseries point budget: about this many points per pixel of chart width
+# are shared by all requested runs, with a floor per run
+POINTS_PER_PIXEL = 4
+MIN_POINTS_PER_RUN = 32
+MAX_TIMESERIES_RUNS = 100
+
+# Upper bound on /statistics histogram bins
+MAX_HISTOGRAM_BINS = 200
+
+# /get-simulation-results pages hold this many runs unless page_size is given
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 100000
+
+# Serialized bodies kept per batch version (one per distinct query)
+MAX_CACHED_QUERIES = 32
+
+# JSON bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+# /get-simulation-results?format=columns: binary Float64 columns (see
+# build_columns), decoded by dataProcessor.js
+COLUMNS_MIMETYPE = "application/octet-stream"
+COLUMNS_MAGIC = b"LFC1"
+RESULT_FORMATS = ("json", "columns")
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["ETag"])
+
+# Latest batch version as a matrix with its statistics, and the serialized
+# /get-simulation-results bodies built from it, by query
+results_cache = {"version": None, "batch": None, "bodies": {}}
+# Serialized /statistics bodies of the latest batch version, by query
+statistics_cache = {"version": None, "bodies": {}}
+results_cache_lock = threading.Lock()
+
+# Compressed bodies of cacheable (ETag-carrying) responses, by ETag and encoding
+compressed_cache = {}
+compressed_cache_lock = threading.Lock()
+
+# Simulation engines of main.run_simulation
+ENGINES = ("simpy", "numpy")
+
+# Simulation batches run in the background, one at a time, on warm workers
+job_manager = JobManager(max_workers=1)
+
+
+def dumps_json(payload) -> bytes:
+    """Serialize a response payload, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return app.json.dumps(payload).encode()
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON and column bodies for clients that accept brotli or gzip"""
+    if (
+        response.mimetype not in ("application/json", COLUMNS_MIMETYPE)
+        or response.status_code != 200
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_BYTES:
+        return response
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        encoding = "br"
+    elif accepted["gzip"]:
+        encoding = "gzip"
+    else:
+        return response
+
+    # Cached results are compressed once per version and encoding
+    etag, _ = response.get_etag()
+    compressed = compressed_cache.get((etag, encoding)) if etag else None
+    if compressed is None:
+        compressed = _compress(body, encoding)
+        if etag:
+            with compressed_cache_lock:
+                if len(compressed_cache) >= MAX_CACHED_QUERIES:
+                    compressed_cache.clear()
+                compressed_cache[(etag, encoding)] = compressed
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        # Both encodings are the same resource version; If-None-Match uses
+        # weak comparison, so revalidation still answers 304
+        response.set_etag(etag, weak=True)
+    return response
 
 
 @app.route("/")
@@ -20,104 +158,634 @@ def static_files(path):
     return send_from_directory("Dashboard", path)
 
 
+def _int_option(body, name, default=None, minimum=1):
+    """body[name] as an integer >= minimum; ValueError names the bad option"""
+    value = body.get(name)
+    if value is None:
+        return default
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ValueError(f"{name} must be an integer >= {minimum}")
+    return value
+
+
+def _metrics_option(body, name):
+    """body[name] as a list of metric names; ValueError names the bad option"""
+    names = body.get(name)
+    if names is None:
+        return None
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        raise ValueError(f"{name} must be a list of metric names")
+    unknown = [n for n in names if n not in METRIC_NAMES]
+    if unknown:
+        raise ValueError(f"Unknown {name}: {', '.join(unknown)}")
+    return names
+
+
 @app.route("/run-simulation", methods=["POST"])
 def run_simulation():
     try:
-        # Execute main.py script in the Simulation folder
-        result = subprocess.run(
-            ["python", "Simulation/main.py"], capture_output=True, text=True
+        body = request.get_json(silent=True) or {}
+
+        # Bad options are reported now rather than failing inside the worker
+        try:
+            if body.get("workers") is not None:
+                raise ValueError("workers is set by the server's process pool")
+            runs = _int_option(body, "runs", 100)
+            sim_time = _int_option(body, "sim_time")
+            seed = _int_option(body, "seed", DEFAULT_SEED, minimum=0)
+            precision = body.get("precision")
+            if precision is not None and not (
+                isinstance(precision, (int, float)) and 0 < precision < 1
+            ):
+                raise ValueError("precision must be a number between 0 and 1")
+            precision_metrics = _metrics_option(body, "precision_metrics")
+            engine = body.get("engine", "simpy")
+            if engine not in ENGINES:
+                raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+            if body.get("antithetic") and runs % 2 and not body.get("resume"):
+                raise ValueError("Antithetic runs come in pairs; runs must be even")
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        # Batch parameters forwarded to main.run_simulation
+        params = {"runs": runs, "seed": seed, "cache_dir": CACHE_DIR}
+        # Continues the interrupted batch; its own parameters are used
+        if body.get("resume"):
+            manifest = load_checkpoint(CHECKPOINT_PATH)
+            if manifest is None:
+                return (
+                    jsonify(
+                        {"success": False, "error": "No interrupted batch to resume"}
+                    ),
+                    404,
+                )
+            params["resume"] = True
+            params["runs"] = manifest["params"]["runs"]
+        if sim_time is not None:
+            params["sim_time"] = sim_time
+        params["engine"] = engine
+        # SimPy batches can be resumed from their checkpoint if interrupted
+        if engine == "simpy":
+            params["checkpoint_path"] = CHECKPOINT_PATH
+        # Sequential sampling: runs becomes a cap
+        if precision is not None:
+            params["precision"] = float(precision)
+            if precision_metrics:
+                params["precision_metrics"] = precision_metrics
+        if body.get("antithetic"):
+            params["antithetic"] = True
+        # Cuts each run's MSER-5 warm-up period from its metrics
+        if body.get("warmup"):
+            params["warmup"] = True
+        # Adds a "profile" report to the job result
+        if body.get("profile"):
+            params["profile"] = True
+        # Event traces feed /timeseries; they are cheap, so on unless disabled
+        if body.get("trace", True):
+            params["trace_dir"] = TRACE_DIR
+
+        # Queue the batch and return right away; clients poll the job
+        job = job_manager.submit(params)
+        return (
+            jsonify({"success": True, "job_id": job.id, "job": job.to_dict()}),
+            202,
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/run-sweep", methods=["POST"])
+def run_sweep():
+    """Queue a parameter sweep
+
+    Body: either "grid" ({param: [levels]}) or "lhs" ({"ranges": {param:
+    [low, high]}, "points": n}), plus optional runs (per point), sim_time and
+    seed. Parameters name simulation.DEFAULT_CONFIG entries, e.g.
+    "failure_probs[3]" or "supply_devices".
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+
+        try:
+            runs = _int_option(body, "runs", 20)
+            sim_time = _int_option(body, "sim_time")
+            seed = _int_option(body, "seed", DEFAULT_SEED, minimum=0)
+            if body.get("grid"):
+                design = grid_design(body["grid"])
+            elif body.get("lhs"):
+                lhs = body["lhs"]
+                design = lhs_design(
+                    {name: tuple(bounds) for name, bounds in lhs["ranges"].items()},
+                    _int_option(lhs, "points", 10),
+                    seed,
+                )
+            else:
+                raise ValueError("Give a grid or lhs design")
+            for point in design:
+                point_config(point)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        params = {"design": design, "runs": runs, "seed": seed, "cache_dir": CACHE_DIR}
+        if sim_time is not None:
+            params["sim_time"] = sim_time
+
+        job = job_manager.submit(params, kind="sweep")
+        return (
+            jsonify({"success": True, "job_id": job.id, "job": job.to_dict()}),
+            202,
         )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
 
-        if result.returncode != 0:
-            return (
-                jsonify(
-                    {"success": False, "output": result.stdout, "error": result.stderr}
-                ),
-                500,
+
+@app.route("/run-comparison", methods=["POST"])
+def run_comparison():
+    """Queue a paired comparison of two scenarios
+
+    Body: "baseline" and "alternative" settings ({param: value}, sweep
+    parameter names; {} or omitted is the default factory), plus optional
+    runs (per scenario), sim_time, seed and antithetic. The finished job's
+    result holds the mean difference of every metric with its 95% CI.
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        baseline = body.get("baseline") or {}
+        alternative = body.get("alternative") or {}
+        try:
+            point_config(baseline)
+            point_config(alternative)
+            runs = _int_option(body, "runs", 20)
+            sim_time = _int_option(body, "sim_time")
+            seed = _int_option(body, "seed", DEFAULT_SEED, minimum=0)
+            antithetic = bool(body.get("antithetic", False))
+            if antithetic and runs % 2:
+                raise ValueError("Antithetic runs come in pairs; runs must be even")
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        params = {
+            "baseline": baseline,
+            "alternative": alternative,
+            "runs": runs,
+            "antithetic": antithetic,
+            "seed": seed,
+            "cache_dir": CACHE_DIR,
+        }
+        if sim_time is not None:
+            params["sim_time"] = sim_time
+
+        job = job_manager.submit(params, kind="comparison")
+        return (
+            jsonify({"success": True, "job_id": job.id, "job": job.to_dict()}),
+            202,
+        )
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/sweep-results", methods=["GET"])
+def get_sweep_results():
+    """Per-point aggregates of the latest sweep (points appear as they finish)"""
+    try:
+        points = load_sweep(RESULTS_DB) if os.path.exists(RESULTS_DB) else []
+        return jsonify({"success": True, "points": points})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/batches", methods=["GET"])
+def get_batches():
+    """Recorded batches, newest first
+
+    Query: limit (default 50, at most 500), offset and status (completed,
+    cancelled, failed or running).
+    """
+    try:
+        limit = max(1, min(request.args.get("limit", 50, type=int), 500))
+        offset = max(0, request.args.get("offset", 0, type=int))
+        status = request.args.get("status", None)
+        history = list_batches(HISTORY_DB, limit, offset, status)
+        return jsonify({"success": True, **history})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/batches/<batch_id>", methods=["GET"])
+def get_history_batch(batch_id):
+    """One recorded batch with its per-metric aggregates
+
+    Query: runs=true to include its per-run metrics, and metrics, a comma
+    separated list of metric names to restrict both to.
+    """
+    try:
+        include_runs = request.args.get("runs", "false").lower() == "true"
+        batch = get_batch(batch_id, HISTORY_DB, include_runs, _list_arg("metrics"))
+        if batch is None:
+            return jsonify({"success": False, "error": "Batch not found"}), 404
+        return jsonify({"success": True, "batch": batch})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/batches/<first_id>/diff/<second_id>", methods=["GET"])
+def diff_history_batches(first_id, second_id):
+    """Per-metric difference of two recorded batches (second - first)"""
+    try:
+        diff = diff_batches(first_id, second_id, HISTORY_DB)
+        if diff is None:
+            return jsonify({"success": False, "error": "Batch not found"}), 404
+        return jsonify({"success": True, **diff})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route("/jobs", methods=["GET"])
+def list_jobs():
+    return jsonify(
+        {"success": True, "jobs": [job.to_dict() for job in job_manager.list()]}
+    )
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": job.to_dict()})
+
+
+@app.route("/jobs/<job_id>/stream", methods=["GET"])
+def stream_job(job_id):
+    """Server-Sent Events: one "run" event per finished replication, then "done" """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    # Event ids count the runs sent so far, not run numbers: resumed batches,
+    # sweeps and comparisons do not number their runs from 1. A reconnecting
+    # EventSource sends the last id back and resumes right after it
+    try:
+        start = max(0, int(request.headers.get("Last-Event-ID", 0)))
+    except ValueError:
+        start = 0
+
+    def events():
+        sent = start
+        while True:
+            runs, done = job.wait_for_runs(sent, timeout=15)
+            for run in runs:
+                sent += 1
+                yield f"id: {sent}\nevent: run\ndata: {app.json.dumps(run)}\n\n"
+
+            if done:
+                yield f"event: done\ndata: {app.json.dumps(job.to_dict())}\n\n"
+                return
+            if not runs:
+                # Comment line keeps idle connections open through proxies
+                yield ": keep-alive\n\n"
+
+    return app.response_class(
+        events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, "job": job.to_dict()})
+
+
+@app.route("/timeseries", methods=["GET"])
+def get_timeseries():
+    """Downsampled per-run series of one trace metric
+
+    Query: metric, run_start/run_end (1-based, inclusive), width (chart width
+    in pixels), method (lttb or minmax), optional start/end simulation times
+    and station. The payload size depends on width, not on sim_time.
+    """
+    try:
+        metric = request.args.get("metric", "production_time")
+        method = request.args.get("method", "lttb")
+        if metric not in METRICS:
+            return jsonify({"success": False, "error": f"Unknown metric {metric}"}), 400
+        if method not in DOWNSAMPLERS:
+            return jsonify({"success": False, "error": f"Unknown method {method}"}), 400
+
+        run_start = request.args.get("run_start", 1, type=int)
+        run_end = request.args.get("run_end", run_start, type=int)
+        if run_start < 1:
+            return jsonify({"success": False, "error": "run_start must be >= 1"}), 400
+        if run_end < run_start:
+            error = "run_end must be >= run_start"
+            return jsonify({"success": False, "error": error}), 400
+        run_end = min(run_end, run_start + MAX_TIMESERIES_RUNS - 1)
+        width = max(1, min(request.args.get("width", 700, type=int), 4000))
+        start = request.args.get("start", 0.0, type=float)
+        end = request.args.get("end", float("inf"), type=float)
+        station = request.args.get("station", None, type=int)
+
+        runs = range(run_start, run_end + 1)
+        points = min(
+            width, max(MIN_POINTS_PER_RUN, POINTS_PER_PIXEL * width // len(runs))
+        )
+
+        series = []
+        for run in runs:
+            path = trace_path(TRACE_DIR, run - 1)
+            if not os.path.exists(path):
+                continue
+            t, v = trace_series(path, metric, points, method, start, end, station)
+            series.append(
+                {
+                    "run": run,
+                    "t": t.round(3).tolist(),
+                    "v": v.round(4).tolist(),
+                }
             )
 
+        if not series:
+            return (
+                jsonify({"success": False, "error": "No event traces for these runs"}),
+                404,
+            )
         return jsonify(
-            {"success": True, "output": result.stdout, "error": result.stderr}
+            {"success": True, "metric": metric, "method": method, "series": series}
         )
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+def results_version():
+    """Version of the stored results; changes whenever a batch writes a run"""
+    if os.path.exists(RESULTS_DB):
+        return batch_version(RESULTS_DB)
+    return "none"
+
+
+def load_results_matrix():
+    """Stored runs as run numbers, metric columns and a runs x metrics matrix"""
+    # Load the whole batch from the columnar results store in one read
+    if os.path.exists(RESULTS_DB):
+        run_ids, columns, values = load_runs(RESULTS_DB)
+        if len(run_ids):
+            return run_ids.tolist(), columns, values
+
+    # If no batch has been stored yet, create dummy data for testing
+    print("No stored results were found. Utilizing test data.")
+    runs_data = [
+        {
+            "run": 1,
+            "metrics": {
+                "Total Production": 165,
+                "Faulty Products": 8,
+                "Faulty Rate": 0.05,
+                "Station 1 Occupancy Rate": 0.14,
+                "Station 2 Occupancy Rate": 0.14,
+                "Station 3 Occupancy Rate": 0.14,
+                "Station 4 Occupancy Rate": 0.14,
+                "Station 5 Occupancy Rate": 0.14,
+                "Station 6 Occupancy Rate": 0.14,
+                "Station 1 Wait Time": 0.0,
+                "Station 2 Wait Time": 0.0,
+                "Station 3 Wait Time": 0.0,
+                "Station 4 Wait Time": 0.0,
+                "Station 5 Wait Time": 0.0,
+                "Station 6 Wait Time": 0.0,
+                "Station 1 Downtime": 1.5,
+                "Station 2 Downtime": 1.0,
+                "Station 3 Downtime": 5.0,
+                "Station 4 Downtime": 14.0,
+                "Station 5 Downtime": 7.5,
+                "Station 6 Downtime": 5.0,
+                "Production Time": 24.7,
+                "Fixing Time": 2.8,
+                "Supplier Occupancy": 0.013,
+                "Production Time P50": 24.5,
+                "Production Time P95": 33.0,
+                "Production Time P99": 36.6,
+                "Fixing Time P50": 2.1,
+                "Fixing Time P95": 6.2,
+                "Fixing Time P99": 6.2,
+            },
+        }
+    ]
+
+    columns = sorted({name for run in runs_data for name in run["metrics"]})
+    values = np.array(
+        [[run["metrics"].get(name, 0) for name in columns] for run in runs_data],
+        dtype=float,
+    ).reshape(len(runs_data), len(columns))
+    return [run["run"] for run in runs_data], columns, values
+
+
+def load_batch():
+    """Stored runs as a matrix, with the statistics of every metric"""
+    run_ids, columns, values = load_results_matrix()
+    # Mean, std, extremes, quantiles and histogram of every metric in one
+    # vectorized pass over the matrix
+    return np.asarray(run_ids), columns, values, matrix_summary(columns, values)
+
+
+def current_batch(version):
+    """load_batch() of this version, loaded once; call with results_cache_lock"""
+    if results_cache["version"] != version:
+        results_cache["batch"] = load_batch()
+        results_cache["bodies"] = {}
+        results_cache["version"] = version
+    return results_cache["batch"]
+
+
+def _list_arg(name):
+    return [item for item in request.args.get(name, "").split(",") if item]
+
+
+def _select_runs(batch, metrics, run_start, run_end, page, page_size, statistics):
+    """Selected metric names, row indices and the response fields around them
+
+    run_start/run_end select run numbers (inclusive) and page (1-based) pages
+    through the selected runs. The summary and statistics always describe the
+    whole batch, for the requested metrics that it has.
+    """
+    run_ids, columns, values, batch_statistics = batch
+    # Metrics the stored runs lack (e.g. in tables of older versions) are skipped
+    names = [name for name in metrics if name in columns] if metrics else columns
+
+    mask = np.ones(len(run_ids), dtype=bool)
+    if run_start is not None:
+        mask &= run_ids >= run_start
+    if run_end is not None:
+        mask &= run_ids <= run_end
+    rows = np.flatnonzero(mask)
+    total_runs = len(rows)
+    if page is not None:
+        rows = rows[(page - 1) * page_size : page * page_size]
+
+    fields = {
+        "success": True,
+        "total_runs": total_runs,
+        "summary": {name: batch_statistics[name]["mean"] for name in names},
+    }
+    if statistics:
+        fields["statistics"] = {name: batch_statistics[name] for name in names}
+    if page is not None:
+        fields["page"] = page
+        fields["page_size"] = page_size
+        fields["pages"] = -(-total_runs // page_size)
+    return names, rows, fields
+
+
+def build_simulation_results(
+    batch,
+    metrics=None,
+    run_start=None,
+    run_end=None,
+    page=None,
+    page_size=DEFAULT_PAGE_SIZE,
+    statistics=True,
+):
+    """Runs of the batch restricted to the requested metrics and runs"""
+    run_ids, columns, values, _ = batch
+    names, rows, result = _select_runs(
+        batch, metrics, run_start, run_end, page, page_size, statistics
+    )
+    selected = [columns.index(name) for name in names]
+    result["runs"] = [
+        {"run": run, "metrics": dict(zip(names, row))}
+        for run, row in zip(
+            run_ids[rows].tolist(), values[np.ix_(rows, selected)].tolist()
+        )
+    ]
+    return result
+
+
+def build_columns(
+    batch,
+    metrics=None,
+    run_start=None,
+    run_end=None,
+    page=None,
+    page_size=DEFAULT_PAGE_SIZE,
+    statistics=True,
+) -> bytes:
+    """The same selection as build_simulation_results, as Float64 columns
+
+    Layout: the magic COLUMNS_MAGIC, a little-endian uint32 header length, a
+    UTF-8 JSON header (the usual response fields plus "runs", the number of
+    runs, and "columns", their names) padded with spaces to a multiple of 8
+    bytes, then one little-endian Float64 array of "runs" values per column.
+    The first column is the run number. Every column starts 8-byte aligned,
+    so browsers can view it as a Float64Array without copying.
+    """
+    run_ids, columns, values, _ = batch
+    names, rows, header = _select_runs(
+        batch, metrics, run_start, run_end, page, page_size, statistics
+    )
+    selected = [columns.index(name) for name in names]
+    header["runs"] = len(rows)
+    header["columns"] = ["run"] + names
+
+    table = np.empty((len(names) + 1, len(rows)), dtype="<f8")
+    table[0] = run_ids[rows]
+    table[1:] = values[np.ix_(rows, selected)].T
+
+    encoded = dumps_json(header)
+    prefix = len(COLUMNS_MAGIC) + 4
+    encoded += b" " * (-(prefix + len(encoded)) % 8)
+    return b"".join(
+        [
+            COLUMNS_MAGIC,
+            len(encoded).to_bytes(4, "little"),
+            encoded,
+            table.tobytes(),
+        ]
+    )
+
+
+def build_statistics(batch, bins, metrics=None):
+    """Summary statistics and histograms only, without the per-run data"""
+    run_ids, columns, values, batch_statistics = batch
+    if metrics:
+        selected = [columns.index(name) for name in metrics if name in columns]
+        columns = [columns[i] for i in selected]
+        values = values[:, selected]
+    if bins == HISTOGRAM_BINS:
+        statistics = {name: batch_statistics[name] for name in columns}
+    else:
+        statistics = matrix_summary(columns, values, bins)
+    return {
+        "success": True,
+        "runs": len(run_ids),
+        "bins": bins,
+        "statistics": statistics,
+    }
+
+
 @app.route("/get-simulation-results", methods=["GET"])
 def get_simulation_results():
+    """Per-run metrics of the stored batch with its summary statistics
+
+    Query (all optional): metrics, a comma separated list of metric names;
+    run_start/run_end (run numbers, inclusive); page (1-based) and page_size;
+    statistics=false to leave out the per-metric statistics; format=columns
+    for binary Float64 columns instead of JSON (see build_columns). Payload
+    size and serialization time follow the selection, each distinct query is
+    cached per batch version, and bodies are brotli or gzip compressed when
+    the client accepts it.
+    """
     try:
-        # Route to the results folder
-        results_folder = "Results"
-
-        # Obtain all CSV files in the results folder
-        csv_files = glob.glob(os.path.join(results_folder, "single_run_*.csv"))
-
-        # Process each CSV file and extract run data
-        runs_data = []
-        for csv_file in csv_files:
-            try:
-                run_number = os.path.basename(csv_file).split("_")[2].split(".")[0]
-                df = pd.read_csv(csv_file)
-                # Convert DataFrame to dictionary
-                run_data = {
-                    "run": int(run_number),
-                    "metrics": df.set_index("Metric")["Value"].to_dict(),
-                }
-                runs_data.append(run_data)
-            except Exception as e:
-                print(f"Error procesando {csv_file}: {e}")
-
-        # If there are no individual runs, create dummy data for testing
-        if not runs_data:
-            print(
-                "Individual run files were not found. Utilizing test data."
-            )
-            runs_data = [
-                {
-                    "run": 1,
-                    "metrics": {
-                        "Total Production": 165,
-                        "Faulty Products": 8,
-                        "Faulty Rate": 0.05,
-                        "Station 1 Occupancy Rate": 0.14,
-                        "Station 2 Occupancy Rate": 0.14,
-                        "Station 3 Occupancy Rate": 0.14,
-                        "Station 4 Occupancy Rate": 0.14,
-                        "Station 5 Occupancy Rate": 0.14,
-                        "Station 6 Occupancy Rate": 0.14,
-                        "Station 1 Wait Time": 0.0,
-                        "Station 2 Wait Time": 0.0,
-                        "Station 3 Wait Time": 0.0,
-                        "Station 4 Wait Time": 0.0,
-                        "Station 5 Wait Time": 0.0,
-                        "Station 6 Wait Time": 0.0,
-                        "Station 1 Downtime": 1.5,
-                        "Station 2 Downtime": 1.0,
-                        "Station 3 Downtime": 5.0,
-                        "Station 4 Downtime": 14.0,
-                        "Station 5 Downtime": 7.5,
-                        "Station 6 Downtime": 5.0,
-                        "Production Time": 24.7,
-                        "Fixing Time": 2.8,
-                        "Supplier Occupancy": 0.013,
-                    },
-                }
-            ]
-
-        # Calculate summary as average of all runs
-        summary_data = {}
-        if runs_data:
-            # Obtain all unique metrics from runs
-            all_metrics = set()
-            for run in runs_data:
-                all_metrics.update(run["metrics"].keys())
-
-            # Calculate average for each metric
-            for metric in all_metrics:
-                values = [run["metrics"].get(metric, 0) for run in runs_data]
-                summary_data[metric] = sum(values) / len(values) if values else 0
-
-        return jsonify({"success": True, "runs": runs_data, "summary": summary_data})
+        metrics = _list_arg("metrics")
+        run_start = request.args.get("run_start", None, type=int)
+        run_end = request.args.get("run_end", None, type=int)
+        page = request.args.get("page", None, type=int)
+        page_size = request.args.get("page_size", DEFAULT_PAGE_SIZE, type=int)
+        statistics = request.args.get("statistics", "true").lower() != "false"
+        result_format = request.args.get("format", "json")
+        if page is not None and page < 1:
+            return jsonify({"success": False, "error": "page must be >= 1"}), 400
+        if not 1 <= page_size <= MAX_PAGE_SIZE:
+            error = f"page_size must be between 1 and {MAX_PAGE_SIZE}"
+            return jsonify({"success": False, "error": error}), 400
+        if result_format not in RESULT_FORMATS:
+            error = f"format must be one of {', '.join(RESULT_FORMATS)}"
+            return jsonify({"success": False, "error": error}), 400
+        if page is None:
+            page_size = DEFAULT_PAGE_SIZE
+
+        version = results_version()
+        selection = (tuple(metrics), run_start, run_end, page, page_size, statistics)
+        query = (result_format,) + selection
+
+        # Rebuild a response only when the batch has changed since last time
+        with results_cache_lock:
+            batch = current_batch(version)
+            bodies = results_cache["bodies"]
+            body = bodies.get(query)
+            if body is None:
+                if result_format == "columns":
+                    body = build_columns(batch, *selection)
+                else:
+                    body = dumps_json(build_simulation_results(batch, *selection))
+                if len(bodies) >= MAX_CACHED_QUERIES:
+                    bodies.clear()
+                bodies[query] = body
+
+        # Clients revalidate with If-None-Match and get a 304 when unchanged
+        response = app.response_class(
+            body,
+            mimetype=COLUMNS_MIMETYPE
+            if result_format == "columns"
+            else "application/json",
+        )
+        response.set_etag(f"{version}-{zlib.crc32(repr(query).encode()):x}")
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
     except Exception as e:
         import traceback
 
@@ -125,5 +793,45 @@ def get_simulation_results():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route("/statistics", methods=["GET"])
+def get_statistics():
+    """Per-metric statistics and pre-binned histograms of the stored batch
+
+    Query: bins (default 20, at most MAX_HISTOGRAM_BINS) and metrics, a comma
+    separated list of metric names (default: all). Responses are cached per
+    batch version and query, and support conditional GET like
+    /get-simulation-results.
+    """
+    try:
+        bins = request.args.get("bins", HISTOGRAM_BINS, type=int)
+        if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+            error = f"bins must be between 1 and {MAX_HISTOGRAM_BINS}"
+            return jsonify({"success": False, "error": error}), 400
+        metrics = _list_arg("metrics")
+
+        version = results_version()
+        key = (bins, tuple(metrics))
+        with results_cache_lock:
+            batch = current_batch(version)
+            if statistics_cache["version"] != version:
+                statistics_cache["version"] = version
+                statistics_cache["bodies"] = {}
+            bodies = statistics_cache["bodies"]
+            if key not in bodies:
+                if len(bodies) >= MAX_CACHED_QUERIES:
+                    bodies.clear()
+                bodies[key] = dumps_json(build_statistics(batch, bins, metrics))
+            body = bodies[key]
+
+        response = app.response_class(body, mimetype="application/json")
+        selection = zlib.crc32(",".join(metrics).encode())
+        response.set_etag(f"{version}-b{bins}-{selection:x}")
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 if __name__ == "__main__":
+    job_manager.warm_up()
     app.run(debug=True, port=5000)
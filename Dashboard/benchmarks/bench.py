@@ -0,0 +1,325 @@
+# bench.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import simpy
+
+# Make the dashboard and simulation modules importable from here
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIMULATION_DIR = os.path.join(DASHBOARD_DIR, "Simulation")
+for path in (DASHBOARD_DIR, SIMULATION_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fastEngine import simulate_batch
+from instrumentation import InstrumentedEnvironment
+from main import replication_rng, run_simulation
+from metrics import MetricsCollector
+from resultsStore import ResultsWriter
+from simulation import LaptopFactory
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(BENCH_DIR, "results.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# A measurement this much worse than the baseline counts as a regression
+THRESHOLD = 0.15
+
+SUITES = ("replication", "batch", "endpoint")
+
+# One metric of every run without statistics, as a single chart would ask
+PROJECTED_QUERY = "/get-simulation-results?metrics=Total Production&statistics=false"
+
+
+def _measurement(value: float, unit: str, better: str = "lower") -> Dict:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _median_time(function: Callable[[], None], repeat: int) -> float:
+    """Median wall time of repeat calls, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_replication(sim_times: List[int], replications: int) -> Dict:
+    """Wall time and SimPy events per second of single replications"""
+    # One untimed replication fills caches and lazy imports first
+    env = InstrumentedEnvironment(time_methods=False)
+    LaptopFactory(env, MetricsCollector())
+    env.run(until=100)
+
+    results = {}
+    for sim_time in sim_times:
+        walls = []
+        events = 0
+        for run in range(replications):
+            env = InstrumentedEnvironment(time_methods=False)
+            LaptopFactory(env, MetricsCollector(), rng=replication_rng(0, run))
+            start = time.perf_counter()
+            env.run(until=sim_time)
+            walls.append(time.perf_counter() - start)
+            events += env.events_processed
+
+        prefix = f"replication.sim_time_{sim_time}"
+        results[f"{prefix}.wall_ms"] = _measurement(
+            statistics.median(walls) * 1000, "ms"
+        )
+        results[f"{prefix}.events_per_second"] = _measurement(
+            events / sum(walls), "events/s", better="higher"
+        )
+    return results
+
+
+def bench_batch(
+    worker_counts: List[int], runs: int, sim_time: int, repeat: int
+) -> Dict:
+    """run_simulation wall time for each worker count (pool startup included)"""
+    results_path = os.path.join("Results", "batch.db")
+    results = {}
+    for workers in worker_counts:
+
+        def batch():
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_simulation(
+                    sim_time=sim_time,
+                    runs=runs,
+                    workers=workers,
+                    seed=0,
+                    results_path=results_path,
+                )
+
+        wall = _median_time(batch, repeat)
+        prefix = f"batch.workers_{workers}"
+        results[f"{prefix}.wall_s"] = _measurement(wall, "s")
+        results[f"{prefix}.runs_per_second"] = _measurement(
+            runs / wall, "runs/s", better="higher"
+        )
+    return results
+
+
+def bench_endpoint(run_counts: List[int], repeat: int) -> Dict:
+    """/get-simulation-results latency and memory for stored batches of each size
+
+    Batches are generated with the NumPy engine. "cold" rebuilds the response
+    from the database, "warm" serves the cached body, "revalidate" is a
+    conditional request answered with 304 and "projected_cold" rebuilds a
+    single-metric response.
+    """
+    import app
+
+    client = app.app.test_client()
+    all_metrics = simulate_batch(max(run_counts), 5000, seed=0)
+
+    results = {}
+    for runs in run_counts:
+        if os.path.exists(app.RESULTS_DB):
+            os.remove(app.RESULTS_DB)
+        with ResultsWriter(app.RESULTS_DB) as writer:
+            for run, run_metrics in enumerate(all_metrics[:runs]):
+                writer.append(run + 1, run_metrics)
+
+        client.get("/get-simulation-results")
+
+        def cold():
+            app.results_cache["version"] = None
+            client.get("/get-simulation-results")
+
+        def warm():
+            client.get("/get-simulation-results")
+
+        def projected():
+            app.results_cache["version"] = None
+            client.get(PROJECTED_QUERY)
+
+        cold_wall = _median_time(cold, repeat)
+        warm_wall = _median_time(warm, repeat)
+        projected_wall = _median_time(projected, repeat)
+        compressed = client.get(
+            "/get-simulation-results", headers={"Accept-Encoding": "gzip"}
+        )
+        response = client.get("/get-simulation-results")
+        etag = response.headers["ETag"]
+        revalidate_wall = _median_time(
+            lambda: client.get(
+                "/get-simulation-results", headers={"If-None-Match": etag}
+            ),
+            repeat,
+        )
+
+        # Python-level allocations of one cold request (NumPy included)
+        app.results_cache["version"] = None
+        tracemalloc.start()
+        client.get("/get-simulation-results")
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        prefix = f"endpoint.runs_{runs}"
+        results[f"{prefix}.cold_ms"] = _measurement(cold_wall * 1000, "ms")
+        results[f"{prefix}.warm_ms"] = _measurement(warm_wall * 1000, "ms")
+        results[f"{prefix}.revalidate_ms"] = _measurement(
+            revalidate_wall * 1000, "ms"
+        )
+        results[f"{prefix}.peak_memory_mb"] = _measurement(peak / 2**20, "MB")
+        results[f"{prefix}.response_kb"] = _measurement(
+            len(response.data) / 1024, "KB"
+        )
+        results[f"{prefix}.projected_cold_ms"] = _measurement(
+            projected_wall * 1000, "ms"
+        )
+        results[f"{prefix}.gzip_response_kb"] = _measurement(
+            len(compressed.data) / 1024, "KB"
+        )
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_benchmarks(suites: List[str], quick: bool = False, repeat: int = 3) -> Dict:
+    """Run the selected suites and return the machine-readable report"""
+    if quick:
+        repeat = 1
+    max_workers = os.cpu_count() or 1
+    worker_counts = sorted(
+        {1, max_workers} | {n for n in (2, 4, 8, 16) if n < max_workers}
+    )
+
+    # Batches and the app write to ./Results, so work in a scratch directory
+    measurements = {}
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "Results"))
+        os.chdir(workdir)
+        try:
+            if "replication" in suites:
+                measurements.update(
+                    bench_replication(
+                        [1000, 5000] if quick else [1000, 5000, 20000],
+                        3 if quick else 10,
+                    )
+                )
+            if "batch" in suites:
+                measurements.update(
+                    bench_batch(worker_counts, 8 if quick else 40, 5000, repeat)
+                )
+            if "endpoint" in suites:
+                measurements.update(
+                    bench_endpoint([100, 1000] if quick else [100, 1000, 10000], repeat)
+                )
+        finally:
+            os.chdir(previous_dir)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "simpy": simpy.__version__,
+            "platform": platform.platform(),
+            "cpu_count": max_workers,
+            "quick": quick,
+        },
+        "measurements": measurements,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = THRESHOLD) -> List[str]:
+    """Print each measurement next to its baseline and return the regressions
+
+    A measurement regresses when it is worse than the baseline by more than
+    threshold (a fraction), in its own direction of better.
+    """
+    regressions = []
+    print(f"\n{'measurement':45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in report["measurements"].items():
+        previous = baseline["measurements"].get(name)
+        if previous is None or not previous["value"]:
+            print(f"{name:45} {'-':>12} {current['value']:12.3f}")
+            continue
+
+        change = current["value"] / previous["value"] - 1
+        worse = -change if current["better"] == "higher" else change
+        flag = ""
+        if worse > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"{name:45} {previous['value']:12.3f} {current['value']:12.3f} "
+            f"{change:+8.1%}{flag}"
+        )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Simulation throughput and dashboard endpoint benchmarks"
+    )
+    parser.add_argument(
+        "--suite",
+        action="append",
+        choices=SUITES,
+        default=None,
+        help="suite to run (repeatable; default: all)",
+    )
+    parser.add_argument("--quick", action="store_true", help="smaller, single runs")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats")
+    parser.add_argument("--output", default=RESULTS_PATH, help="JSON report path")
+    parser.add_argument(
+        "--baseline", default=BASELINE_PATH, help="baseline report to compare with"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store this report as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=THRESHOLD,
+        help="relative slowdown counted as a regression",
+    )
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.suite or list(SUITES), args.quick, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Benchmark report written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+    else:
+        for name, measurement in report["measurements"].items():
+            print(f"{name:45} {measurement['value']:12.3f} {measurement['unit']}")
@@ -0,0 +1,214 @@
+# jobs.py
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Make the simulation modules importable from the dashboard server
+SIMULATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Simulation")
+if SIMULATION_DIR not in sys.path:
+    sys.path.insert(0, SIMULATION_DIR)
+
+from compare import compare_scenarios
+from main import SimulationCancelled, run_simulation
+from resultsStore import flatten_run_metrics
+from sweep import run_sweep
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Batch runners by job kind; each takes the same progress and pool arguments
+RUNNERS = {
+    "simulation": run_simulation,
+    "sweep": run_sweep,
+    "comparison": compare_scenarios,
+}
+
+
+def _warm_worker():
+    """Import the simulation stack once when a worker process starts"""
+    import main  # noqa: F401  (pulls in LaptopFactory and MetricsCollector)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class Job:
+    def __init__(self, params: Dict, total_runs: int, kind: str = "simulation"):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.total_runs = total_runs
+        self.completed_runs = 0
+        self.output = []
+        self.error = ""
+        self.result = None
+        # Flattened metrics of each finished run, in run order
+        self.runs = []
+        self.changed = threading.Condition()
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+        self.future = None
+        self.cancel_requested = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in (COMPLETED, FAILED, CANCELLED)
+
+    def record_run(self, run: int, run_metrics: Dict):
+        """Progress callback invoked as each replication finishes"""
+        # Warm-up truncation rescales counts, which are then fractional
+        production = run_metrics["production"]
+        self.output.append(
+            f"Run {run} completed: Produced {production['total']:.0f} "
+            f"laptops ({production['faulty']:.0f} faulty)\n"
+        )
+        with self.changed:
+            self.runs.append(
+                {"run": run, "metrics": flatten_run_metrics(run_metrics)}
+            )
+            self.completed_runs = run
+            self.changed.notify_all()
+
+    def finish(self, status: str):
+        with self.changed:
+            self.status = status
+            self.finished_at = time.time()
+            self.changed.notify_all()
+
+    def wait_for_runs(self, start: int, timeout: float) -> Tuple[List[Dict], bool]:
+        """Block until runs past index start exist or the job ends
+
+        Returns the new runs and whether the job has finished.
+        """
+        with self.changed:
+            self.changed.wait_for(
+                lambda: len(self.runs) > start or self.done, timeout
+            )
+            return self.runs[start:], self.done
+
+    def to_dict(self) -> Dict:
+        """Return a JSON-serializable snapshot of the job"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "progress": {
+                "completed_runs": self.completed_runs,
+                "total_runs": self.total_runs,
+                "fraction": (
+                    self.completed_runs / self.total_runs if self.total_runs else 0
+                ),
+            },
+            "output": "".join(self.output),
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Run simulation batches in the background on a pool of warm workers
+
+    Batches are scheduled by a small thread pool; their replications are fed
+    to long-lived worker processes that imported the simulation stack once, so
+    a new batch pays no interpreter startup or import cost.
+    """
+
+    def __init__(self, max_workers: int = 1, processes: Optional[int] = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="simulation-job"
+        )
+        self.pool = None
+
+    def warm_up(self):
+        """Start the worker processes ahead of the first batch"""
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.processes, initializer=_warm_worker
+                )
+            pool = self.pool
+        # One task per worker makes the pool spawn all of its processes now
+        for future in [pool.submit(_ping) for _ in range(self.processes)]:
+            future.result()
+
+    def submit(self, params: Dict, kind: str = "simulation") -> Job:
+        """Queue a batch, sweep or comparison and return its job immediately"""
+        total_runs = params.get("runs", 100)
+        if kind == "sweep":
+            total_runs = params.get("runs", 20) * len(params["design"])
+        elif kind == "comparison":
+            # Both scenarios run every replication
+            total_runs = params.get("runs", 20) * 2
+        job = Job(params, total_runs, kind)
+        with self.lock:
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self.lock:
+            return sorted(self.jobs.values(), key=lambda job: job.created_at)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are left untouched"""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return job
+
+        with self.lock:
+            job.cancel_requested = True
+            # Jobs still waiting in the executor never start
+            if job.future is not None and job.future.cancel():
+                job.finish(CANCELLED)
+        return job
+
+    def _run(self, job: Job):
+        with self.lock:
+            if job.cancel_requested:
+                job.finish(CANCELLED)
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        status = FAILED
+        try:
+            if self.pool is None:
+                self.warm_up()
+
+            job.result = RUNNERS[job.kind](
+                **job.params,
+                workers=self.processes,
+                executor=self.pool,
+                on_run=job.record_run,
+                should_stop=lambda: job.cancel_requested,
+            )
+            status = COMPLETED
+        except SimulationCancelled:
+            status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.finish(status)
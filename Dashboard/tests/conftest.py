@@ -0,0 +1,62 @@
+# conftest.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Make the dashboard and simulation modules importable, as the app does
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIMULATION_DIR = os.path.join(DASHBOARD_DIR, "Simulation")
+for path in (DASHBOARD_DIR, SIMULATION_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from main import run_simulation
+from resultsStore import load_runs
+
+# Short replications keep the suite fast; no invariant depends on run length
+SIM_TIME = 300
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """An empty working folder, so the relative Results paths stay out of the repo"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Results").mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def batch(workdir):
+    """Run a seeded batch into its own results table
+
+    Returns the summary without its (random) batch id, and the stored runs
+    as (run numbers, metric names, runs x metrics matrix).
+    """
+
+    def run(name: str = "results", **options):
+        path = os.path.join("Results", f"{name}.db")
+        options = {"sim_time": SIM_TIME, "runs": 6, "seed": 7, **options}
+        results = run_simulation(results_path=path, history_path=None, **options)
+        results.pop("batch_id")
+        return results, load_runs(path)
+
+    return run
+
+
+def assert_same_runs(first, second):
+    run_ids, columns, values = first
+    assert np.array_equal(run_ids, second[0])
+    assert columns == second[1]
+    assert np.array_equal(values, second[2])
+
+
+@pytest.fixture
+def client(workdir):
+    """Test client of the dashboard server, with its response caches emptied"""
+    import app
+
+    app.results_cache.update(version=None, batch=None, bodies={})
+    app.compressed_cache.clear()
+    return app.app.test_client()
@@ -0,0 +1,45 @@
+# test_antithetic.py
+import numpy as np
+import pytest
+
+from aggregation import t_critical
+from main import replication_rng
+from variates import PURPOSES
+
+
+@pytest.mark.parametrize("purpose", PURPOSES)
+def test_second_run_of_a_pair_mirrors_every_uniform(purpose):
+    first = replication_rng(12345, 4, antithetic=True).substream(purpose, 2)
+    second = replication_rng(12345, 5, antithetic=True).substream(purpose, 2)
+    u = np.array([first.random() for _ in range(1000)])
+    v = np.array([second.random() for _ in range(1000)])
+    assert np.allclose(u + v, 1.0)
+
+
+def test_pairs_do_not_share_streams():
+    first = replication_rng(12345, 0, antithetic=True)
+    next_pair = replication_rng(12345, 2, antithetic=True)
+    assert [first.random() for _ in range(5)] != [
+        next_pair.random() for _ in range(5)
+    ]
+
+
+def test_statistics_are_built_from_pair_averages(batch):
+    results, (_, columns, values) = batch(runs=8, antithetic=True)
+    pairs = results["antithetic"]
+    assert pairs["pairs"] == 4
+
+    column = columns.index("Total Production")
+    averages = values[:, column].reshape(4, 2).mean(axis=1)
+    stats = pairs["statistics"]["Total Production"]
+    assert stats["mean"] == pytest.approx(averages.mean())
+    # Four pair averages are the observations, so the CI has 3 degrees of freedom
+    half_width = t_critical(3) * averages.std(ddof=1) / 2
+    assert stats["ci95"] == pytest.approx(
+        [averages.mean() - half_width, averages.mean() + half_width]
+    )
+
+
+def test_antithetic_runs_come_in_pairs(batch):
+    with pytest.raises(ValueError):
+        batch(runs=5, antithetic=True)
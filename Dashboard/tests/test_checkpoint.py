@@ -0,0 +1,117 @@
+# test_checkpoint.py
+import json
+import os
+
+import pytest
+
+from aggregation import MetricsAggregator
+from batchHistory import get_batch
+from checkpoint import load_checkpoint
+from conftest import SIM_TIME, assert_same_runs
+from main import SimulationCancelled, run_simulation
+from resultsStore import load_runs
+
+CHECKPOINT = os.path.join("Results", "checkpoint.json")
+HISTORY = os.path.join("Results", "history.db")
+
+BATCHES = {
+    "plain": {"runs": 10},
+    "antithetic": {"runs": 10, "antithetic": True},
+    # Converge at the end of the interrupted wave and of a later one
+    "precision": {"runs": 30, "precision": 0.2, "min_runs": 4, "wave_size": 6},
+    "precision-later": {
+        "runs": 30,
+        "precision": 0.1,
+        "min_runs": 4,
+        "wave_size": 6,
+    },
+}
+
+
+def interrupted(error_after: int = None, cancel_after: int = None, **options):
+    """Start a checkpointed batch and stop it after some runs"""
+    finished = []
+
+    def on_run(run, metrics):
+        finished.append(run)
+        if run == error_after:
+            raise RuntimeError("worker lost")
+
+    options = {"sim_time": SIM_TIME, "seed": 7, **options}
+    with pytest.raises((SimulationCancelled, RuntimeError)):
+        run_simulation(
+            results_path=os.path.join("Results", "resumed.db"),
+            history_path=HISTORY,
+            checkpoint_path=CHECKPOINT,
+            on_run=on_run,
+            should_stop=lambda: len(finished) == cancel_after,
+            **options,
+        )
+
+
+def resume():
+    results = run_simulation(
+        results_path=os.path.join("Results", "resumed.db"),
+        history_path=HISTORY,
+        checkpoint_path=CHECKPOINT,
+        resume=True,
+    )
+    return results, load_runs(os.path.join("Results", "resumed.db"))
+
+
+@pytest.mark.parametrize("name", BATCHES)
+def test_resumed_batch_matches_an_uninterrupted_one(batch, name):
+    expected, expected_runs = batch("expected", **BATCHES[name])
+    interrupted(cancel_after=5, **BATCHES[name])
+    assert load_checkpoint(CHECKPOINT)["completed"] == 5
+
+    results, runs = resume()
+    batch_id = results.pop("batch_id")
+    assert results == expected
+    assert_same_runs(runs, expected_runs)
+    assert not os.path.exists(CHECKPOINT)
+
+    record = get_batch(batch_id, HISTORY)
+    assert record["status"] == "completed"
+    assert record["runs"] == len(expected_runs[0])
+
+
+def test_runs_stored_after_the_last_checkpoint_are_redone(batch):
+    expected, expected_runs = batch("expected", runs=10)
+    # A crash between manifest writes: runs 2-4 are stored but not checkpointed
+    interrupted(error_after=4, runs=10)
+    assert load_checkpoint(CHECKPOINT)["completed"] == 1
+    assert len(load_runs(os.path.join("Results", "resumed.db"))[0]) == 4
+
+    results, runs = resume()
+    results.pop("batch_id")
+    assert results == expected
+    assert_same_runs(runs, expected_runs)
+
+
+def test_batch_replaced_since_is_not_resumed(batch):
+    interrupted(cancel_after=5, runs=10)
+    # A later batch takes over the results table
+    _, later_runs = batch("resumed", runs=10, engine="numpy")
+
+    with pytest.raises(ValueError):
+        resume()
+    assert not os.path.exists(CHECKPOINT)
+    assert_same_runs(load_runs(os.path.join("Results", "resumed.db")), later_runs)
+
+
+def test_resume_needs_a_checkpoint(workdir):
+    with pytest.raises(ValueError):
+        run_simulation(checkpoint_path=CHECKPOINT, resume=True)
+
+
+def test_aggregator_state_survives_json(batch):
+    aggregator = MetricsAggregator()
+    _, (_, columns, values) = batch()
+    for row in values:
+        aggregator.update_row(dict(zip(columns, row.tolist())))
+
+    restored = MetricsAggregator.from_state(
+        json.loads(json.dumps(aggregator.state()))
+    )
+    assert restored.summary() == aggregator.summary()
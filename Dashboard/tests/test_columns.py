@@ -0,0 +1,81 @@
+# test_columns.py
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from conftest import DASHBOARD_DIR
+
+URL = "/get-simulation-results?format=columns"
+DATA_PROCESSOR = os.path.join(DASHBOARD_DIR, "Dashboard", "js", "dataProcessor.js")
+
+# Runs the dashboard's decodeColumns on a file and prints what it decoded
+DECODE_SCRIPT = """
+const fs = require('fs');
+const vm = require('vm');
+const context = { TextDecoder, console };
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(process.argv[1], 'utf8'), context);
+const bytes = fs.readFileSync(process.argv[2]);
+const buffer = bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.length);
+const data = context.decodeColumns(buffer);
+// Metrics are getters on the prototype; read them by name, as the charts do
+const names = Object.keys(data.columns);
+console.log(JSON.stringify(data.runs.map(run => ({
+    run: run.run,
+    metrics: Object.fromEntries(names.slice(1).map(name => [name, run.metrics[name]]))
+}))));
+"""
+
+
+def parse_columns(body: bytes):
+    """Header and columns of a format=columns body, read by the documented layout"""
+    assert body[:4] == b"LFC1"
+    length = int.from_bytes(body[4:8], "little")
+    header = json.loads(body[8 : 8 + length])
+    offset = 8 + length
+    columns = {}
+    for name in header["columns"]:
+        assert offset % 8 == 0
+        columns[name] = np.frombuffer(body, "<f8", header["runs"], offset)
+        offset += 8 * header["runs"]
+    assert offset == len(body)
+    return header, columns
+
+
+def test_columns_hold_the_json_values(batch, client):
+    batch()
+    header, columns = parse_columns(client.get(URL).data)
+    runs = client.get("/get-simulation-results").get_json()["runs"]
+
+    assert header["success"]
+    assert header["columns"][0] == "run"
+    assert columns["run"].tolist() == [run["run"] for run in runs]
+    for name in header["columns"][1:]:
+        assert columns[name].tolist() == [run["metrics"][name] for run in runs]
+
+
+def test_columns_follow_the_selection(batch, client):
+    batch(runs=10)
+    body = client.get(f"{URL}&metrics=Total Production&run_start=3&run_end=6").data
+    header, columns = parse_columns(body)
+    assert header["columns"] == ["run", "Total Production"]
+    assert columns["run"].tolist() == [3, 4, 5, 6]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_dashboard_decoder_reads_the_columns(batch, client, tmp_path):
+    batch()
+    path = tmp_path / "columns.bin"
+    path.write_bytes(client.get(URL).data)
+    decoded = subprocess.run(
+        ["node", "-e", DECODE_SCRIPT, DATA_PROCESSOR, str(path)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    runs = client.get("/get-simulation-results").get_json()["runs"]
+    assert json.loads(decoded.stdout) == runs
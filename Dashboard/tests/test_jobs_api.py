@@ -0,0 +1,166 @@
+# test_jobs_api.py
+import json
+
+import pytest
+
+import app
+from jobs import COMPLETED, Job
+
+
+@pytest.fixture
+def submitted(client, monkeypatch):
+    """Parameters of the jobs queued by the endpoints; none is run"""
+    queued = []
+
+    def submit(params, kind="simulation"):
+        queued.append(params)
+        return Job(params, params.get("runs", 0), kind)
+
+    monkeypatch.setattr(app.job_manager, "submit", submit)
+    return queued
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"runs": 0},
+        {"runs": -5},
+        {"runs": 2.5},
+        {"runs": "ten"},
+        {"sim_time": 0},
+        {"seed": -1},
+        {"workers": 4},
+        {"precision": 0},
+        {"runs": 5, "antithetic": True},
+        {"engine": "fortran"},
+        {"precision": 0.05, "precision_metrics": ["Nope"]},
+        {"precision": 0.05, "precision_metrics": "Total Production"},
+    ],
+)
+def test_bad_batch_options_are_rejected(client, submitted, body):
+    response = client.post("/run-simulation", json=body)
+    assert response.status_code == 400
+    assert not response.get_json()["success"]
+    assert submitted == []
+
+
+def test_batch_options_are_forwarded(client, submitted):
+    body = {"runs": 10, "sim_time": 500, "seed": 0, "antithetic": True}
+    response = client.post("/run-simulation", json=body)
+    assert response.status_code == 202
+    (params,) = submitted
+    assert (params["runs"], params["sim_time"], params["seed"]) == (10, 500, 0)
+    assert params["antithetic"]
+
+
+@pytest.mark.parametrize(
+    "url, body",
+    [
+        ("/run-simulation", {}),
+        ("/run-sweep", {"grid": {"supply_devices": [2, 3]}}),
+        ("/run-comparison", {}),
+    ],
+)
+def test_unseeded_requests_use_the_default_seed(client, submitted, url, body):
+    # Repeated requests then share their result cache entries
+    assert client.post(url, json=body).status_code == 202
+    assert client.post(url, json=body).status_code == 202
+    assert [params["seed"] for params in submitted] == [app.DEFAULT_SEED] * 2
+
+
+def test_precision_metrics_are_forwarded(client, submitted):
+    metrics = ["Total Production", "Station 3 Downtime"]
+    body = {"precision": 0.05, "precision_metrics": metrics}
+    assert client.post("/run-simulation", json=body).status_code == 202
+    assert submitted[0]["precision_metrics"] == metrics
+
+
+GRID = {"supply_devices": [2, 3]}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"grid": GRID, "runs": "abc"},
+        {"grid": GRID, "runs": -3},
+        {"grid": GRID, "sim_time": 0},
+        {"grid": GRID, "seed": -1},
+        {"grid": {"failure_probs[9]": [0.1]}},
+        {"grid": {"failure_probs": [0.1]}},
+        {"grid": {"supply_devices[0]": [2]}},
+        {"lhs": {"ranges": {"repair_mean": [1, 5]}, "points": 0}},
+        {},
+    ],
+)
+def test_bad_sweeps_are_rejected(client, submitted, body):
+    response = client.post("/run-sweep", json=body)
+    assert response.status_code == 400
+    assert not response.get_json()["success"]
+    assert submitted == []
+
+
+def test_sweep_options_are_forwarded(client, submitted):
+    body = {"grid": GRID, "runs": 4, "sim_time": 500, "seed": 0}
+    assert client.post("/run-sweep", json=body).status_code == 202
+    (params,) = submitted
+    assert params["design"] == [{"supply_devices": 2}, {"supply_devices": 3}]
+    assert (params["runs"], params["sim_time"], params["seed"]) == (4, 500, 0)
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"runs": 0},
+        {"runs": "abc"},
+        {"sim_time": -1},
+        {"seed": 1.5},
+        {"runs": 5, "antithetic": True},
+        {"alternative": {"failure_probs[9]": 0.1}},
+    ],
+)
+def test_bad_comparisons_are_rejected(client, submitted, body):
+    response = client.post("/run-comparison", json=body)
+    assert response.status_code == 400
+    assert not response.get_json()["success"]
+    assert submitted == []
+
+
+def test_comparison_options_are_forwarded(client, submitted):
+    body = {"alternative": {"supply_devices": 4}, "runs": 6, "seed": 3}
+    assert client.post("/run-comparison", json=body).status_code == 202
+    (params,) = submitted
+    assert (params["runs"], params["seed"]) == (6, 3)
+    assert params["alternative"] == {"supply_devices": 4}
+
+
+@pytest.mark.parametrize(
+    "query", ["run_start=5&run_end=2", "run_start=0", "run_start=-3&run_end=1"]
+)
+def test_bad_timeseries_ranges_are_rejected(client, query):
+    response = client.get(f"/timeseries?metric=production_time&{query}")
+    assert response.status_code == 400
+    assert not response.get_json()["success"]
+
+
+def stream_ids(client, job, last_event_id=None):
+    """Event ids and run numbers sent by the job's event stream"""
+    headers = {} if last_event_id is None else {"Last-Event-ID": last_event_id}
+    body = client.get(f"/jobs/{job.id}/stream", headers=headers).get_data(True)
+    events = [event for event in body.split("\n\n") if event.startswith("id:")]
+    ids = [int(event.split("\n")[0][len("id: "):]) for event in events]
+    runs = [json.loads(event.split("data: ", 1)[1])["run"] for event in events]
+    return ids, runs
+
+
+def test_stream_ids_count_sent_runs(client, monkeypatch):
+    # A resumed batch whose runs are numbered from 8
+    job = Job({}, 3)
+    job.runs = [{"run": run} for run in (8, 9, 10)]
+    job.status = COMPLETED
+    monkeypatch.setitem(app.job_manager.jobs, job.id, job)
+
+    assert stream_ids(client, job) == ([1, 2, 3], [8, 9, 10])
+    assert stream_ids(client, job, "2") == ([3], [10])
+    # Malformed or negative ids replay the whole stream
+    assert stream_ids(client, job, "abc") == ([1, 2, 3], [8, 9, 10])
+    assert stream_ids(client, job, "-4") == ([1, 2, 3], [8, 9, 10])
@@ -0,0 +1,20 @@
+# test_replication.py
+from conftest import assert_same_runs
+
+
+def test_results_do_not_depend_on_worker_count(batch):
+    serial, serial_runs = batch("serial", runs=8, workers=1)
+    parallel, parallel_runs = batch("parallel", runs=8, workers=4)
+
+    assert serial == parallel
+    assert_same_runs(serial_runs, parallel_runs)
+
+
+def test_seed_fixes_the_batch(batch):
+    first, first_runs = batch("first")
+    again, again_runs = batch("again")
+    other, _ = batch("other", seed=8)
+
+    assert first == again
+    assert_same_runs(first_runs, again_runs)
+    assert other["statistics"] != first["statistics"]
@@ -0,0 +1,56 @@
+# test_results_api.py
+import gzip
+
+from conftest import SIM_TIME
+from sweep import run_sweep
+
+URL = "/get-simulation-results"
+
+
+def test_unchanged_results_revalidate_with_304(batch, client):
+    batch()
+    first = client.get(URL)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.get_json()["success"]
+
+    again = client.get(URL, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_new_batch_changes_the_etag(batch, client):
+    batch()
+    etag = client.get(URL).headers["ETag"]
+    batch(seed=8)
+
+    response = client.get(URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_each_query_has_its_own_etag(batch, client):
+    batch()
+    whole = client.get(URL).headers["ETag"]
+    projected = client.get(f"{URL}?metrics=Total Production").headers["ETag"]
+    assert whole != projected
+
+
+def test_compressed_body_matches_plain_body(batch, client):
+    batch()
+    plain = client.get(URL)
+    compressed = client.get(URL, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(compressed.data) == plain.data
+
+
+def test_sweep_alone_is_not_a_batch(client):
+    # The sweep shares the results database but writes no batch tables
+    run_sweep([{"supply_devices": 3}], runs=2, sim_time=SIM_TIME, seed=1)
+
+    for url in (URL, "/statistics"):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.get_json()["success"]
+    assert len(client.get("/sweep-results").get_json()["points"]) == 1
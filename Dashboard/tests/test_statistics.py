@@ -0,0 +1,36 @@
+# test_statistics.py
+import math
+
+import pytest
+
+from aggregation import RunningStats, t_critical
+
+# Two-sided critical values from standard t tables
+T_TABLE = [
+    (1, 0.95, 12.7062),
+    (2, 0.95, 4.3027),
+    (3, 0.95, 3.1824),
+    (4, 0.99, 4.6041),
+    (9, 0.90, 1.8331),
+    (19, 0.95, 2.0930),
+    (30, 0.95, 2.0423),
+    (60, 0.99, 2.6603),
+    (120, 0.95, 1.9799),
+]
+
+
+@pytest.mark.parametrize("df, confidence, expected", T_TABLE)
+def test_t_critical_matches_tables(df, confidence, expected):
+    assert t_critical(df, confidence) == pytest.approx(expected, abs=5e-5)
+
+
+def test_t_critical_without_degrees_of_freedom():
+    assert t_critical(0) == math.inf
+
+
+def test_confidence_interval_of_two_values():
+    stats = RunningStats()
+    for value in (1.0, 3.0):
+        stats.update(value)
+    # mean 2, sample std sqrt(2), so the half-width is t(1) * sqrt(2) / sqrt(2)
+    assert stats.ci_half_width() == pytest.approx(12.7062, abs=5e-4)
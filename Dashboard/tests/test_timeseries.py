@@ -0,0 +1,47 @@
+# test_timeseries.py
+import os
+
+import numpy as np
+import simpy
+
+import eventTrace
+from conftest import SIM_TIME
+from eventTrace import TraceReader, TraceWriter
+from main import replication_rng
+from metrics import MetricsCollector
+from simulation import LaptopFactory
+from timeseries import wait_time
+
+
+class WaitLog(MetricsCollector):
+    """Also keeps every recorded wait, with its station and grant time"""
+
+    __slots__ = ("env", "waits")
+
+    def record_waiting_time(self, station_id, time):
+        self.waits.append((station_id, self.env.now, time))
+        super().record_waiting_time(station_id, time)
+
+
+def test_trace_waits_match_the_collected_waits(workdir):
+    path = os.path.join("Results", "run.trace")
+    env = simpy.Environment()
+    metrics = WaitLog()
+    metrics.env, metrics.waits = env, []
+    trace = TraceWriter(path)
+    LaptopFactory(env, metrics, rng=replication_rng(7, 0), trace=trace)
+    env.run(until=SIM_TIME * 10)
+    trace.close()
+
+    records = np.array(TraceReader(path).records)
+    # Repairs inside a station step must not count as waiting
+    assert (records["kind"] == eventTrace.REPAIR).any()
+    for station in range(6):
+        starts, waits = wait_time(records[records["station"] == station])
+        expected = {(start, wait) for s, start, wait in metrics.waits if s == station}
+        assert len(starts) > 0
+        for start, wait in zip(starts.tolist(), waits.tolist()):
+            assert any(
+                start == granted and np.isclose(wait, waited)
+                for granted, waited in expected
+            )